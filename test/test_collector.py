@@ -5,6 +5,7 @@
 
 import argparse
 import sys
+from functools import partial
 
 import numpy as np
 import pytest
@@ -31,18 +32,18 @@ from torchrl.collectors.collectors import (
     MultiSyncDataCollector,
     RandomPolicy,
 )
-from torchrl.collectors.utils import split_trajectories
+from torchrl.collectors.utils import _CapturedPolicyStep, split_trajectories
 from torchrl.data import CompositeSpec, UnboundedContinuousTensorSpec
 from torchrl.envs import EnvBase, EnvCreator, ParallelEnv, SerialEnv, StepCounter
 from torchrl.envs.libs.gym import _has_gym, GymEnv
 from torchrl.envs.transforms import TransformedEnv, VecNorm
+from torchrl.envs.utils import step_mdp
 from torchrl.modules import Actor, LSTMNet, OrnsteinUhlenbeckProcessWrapper, SafeModule
 
 # torch.set_default_dtype(torch.double)
 _os_is_windows = sys.platform == "win32"
 _python_is_3_10 = sys.version_info.major == 3 and sys.version_info.minor == 10
 _python_is_3_7 = sys.version_info.major == 3 and sys.version_info.minor == 7
-_os_is_osx = sys.platform == "darwin"
 
 
 class WrappablePolicy(nn.Module):
@@ -1236,7 +1237,6 @@ def weight_reset(m):
         m.reset_parameters()
 
 
-@pytest.mark.skipif(_os_is_osx, reason="Queue.qsize does not work on osx.")
 class TestPreemptiveThreshold:
     @pytest.mark.parametrize("env_name", ["conv", "vec"])
     def test_sync_collector_interruptor_mechanism(self, env_name, seed=100):
@@ -1313,6 +1313,16 @@ def test_maxframes_error():
         )
 
 
+def test_collector_restores_trusted_step():
+    env = CountingEnv()
+    collector = SyncDataCollector(
+        env, RandomPolicy(env.action_spec), total_frames=100, frames_per_batch=10
+    )
+    assert env.trusted_step
+    collector.shutdown()
+    assert not env.trusted_step
+
+
 def test_reset_heterogeneous_envs():
     env1 = lambda: TransformedEnv(CountingEnv(), StepCounter(2))
     env2 = lambda: TransformedEnv(CountingEnv(), StepCounter(3))
@@ -1332,6 +1342,172 @@ def test_reset_heterogeneous_envs():
     ).all()
 
 
+def _make_counting_env(max_steps):
+    return CountingEnv(max_steps=max_steps)
+
+
+def _increment_policy(tensordict):
+    return tensordict.set("action", torch.ones(*tensordict.shape, 1, dtype=torch.int))
+
+
+class TestMultiSyncBuffer:
+    @pytest.mark.parametrize("return_same_td", [True, False])
+    def test_multisync_shared_buffer(self, return_same_td):
+        collector = MultiSyncDataCollector(
+            [partial(_make_counting_env, max_steps) for max_steps in (2, 3)],
+            _increment_policy,
+            frames_per_batch=20,
+            total_frames=80,
+            return_same_td=return_same_td,
+        )
+        prev_data = prev_data_copy = None
+        for data in collector:
+            assert data.shape == torch.Size([20])
+            traj_ids = data["collector", "traj_ids"].view(2, 10)
+            done = data["next", "done"].view(2, 10)
+            for i in range(2):
+                assert (traj_ids[i, 1:] != traj_ids[i, :-1]).tolist() == done[
+                    i, :-1
+                ].tolist()
+            # trajectory ids are never shared across workers
+            assert not set(traj_ids[0].tolist()) & set(traj_ids[1].tolist())
+            if prev_data is not None:
+                # the workers have written a new batch
+                assert (
+                    data["collector", "traj_ids"]
+                    != prev_data_copy["collector", "traj_ids"]
+                ).any()
+                assert (data is prev_data) is return_same_td
+                if not return_same_td:
+                    assert (prev_data == prev_data_copy).all()
+            prev_data = data
+            prev_data_copy = data.clone()
+        collector.shutdown()
+
+
+class TestAsyncStep:
+    def test_parallel_env_step_send_recv(self):
+        env = ParallelEnv(3, partial(_make_counting_env, 10))
+        td = _increment_policy(env.reset())
+        env.step_send(td)
+        out, env_ids = env.step_recv(2)
+        assert out.shape == torch.Size([2])
+        assert (out["next", "observation"] == 1).all()
+        (pending_id,) = {0, 1, 2} - set(env_ids.tolist())
+        with pytest.raises(RuntimeError, match="has a pending step"):
+            env.step_send(td[:1], env_ids=[pending_id])
+        with pytest.raises(RuntimeError, match="asynchronous steps are pending"):
+            env.step(td)
+        # only the idle workers are stepped again
+        env.step_send(_increment_policy(step_mdp(out)), env_ids)
+        out0, env_ids0 = env.step_recv(1)
+        out1, env_ids1 = env.step_recv()
+        out = torch.cat([out0, out1])
+        env_ids = torch.cat([env_ids0, env_ids1])
+        assert sorted(env_ids.tolist()) == [0, 1, 2]
+        obs = out["next", "observation"].squeeze(-1)
+        assert (obs == (env_ids != pending_id).int() + 1).all()
+        env.close()
+
+    @pytest.mark.parametrize("async_batch_size", [1, 2, 3])
+    def test_collector_async_batch_size(self, async_batch_size):
+        env_fns = [partial(_make_counting_env, max_steps) for max_steps in (2, 3, 4)]
+        collector = SyncDataCollector(
+            ParallelEnv(3, env_fns),
+            _increment_policy,
+            total_frames=300,
+            frames_per_batch=150,
+            async_batch_size=async_batch_size,
+        )
+        for data in collector:
+            assert data.shape == torch.Size([3, 50])
+            for i, max_steps in enumerate((2, 3, 4)):
+                # every env fills its own row with its own trajectories
+                period = max_steps + 1
+                obs = data[i]["next", "observation"].squeeze(-1)
+                assert (obs[1:] == obs[:-1] % period + 1).all()
+                traj_ids = data[i]["collector", "traj_ids"]
+                done = data[i]["next", "done"].squeeze(-1)
+                assert (traj_ids[1:] != traj_ids[:-1]).tolist() == done[:-1].tolist()
+            # trajectory ids are never shared across environments
+            traj_ids = data["collector", "traj_ids"]
+            assert not set(traj_ids[0].tolist()) & set(traj_ids[1:].flatten().tolist())
+            assert not set(traj_ids[1].tolist()) & set(traj_ids[2].tolist())
+        collector.shutdown()
+
+    def test_collector_async_batch_size_errors(self):
+        with pytest.raises(ValueError, match="can only be used with a ParallelEnv"):
+            SyncDataCollector(
+                SerialEnv(2, partial(_make_counting_env, 2)),
+                _increment_policy,
+                total_frames=300,
+                frames_per_batch=150,
+                async_batch_size=1,
+            )
+
+
+class TestCapturedStep:
+    @staticmethod
+    def _make_collector(**kwargs):
+        env = CountingBatchedEnv(max_steps=torch.tensor([3, 5]), batch_size=[2])
+        policy = TensorDictModule(
+            lambda obs: (obs * 0 + 1).int(),
+            in_keys=["observation"],
+            out_keys=["action"],
+        )
+        return SyncDataCollector(
+            env,
+            policy,
+            total_frames=40,
+            frames_per_batch=20,
+            **kwargs,
+        )
+
+    @pytest.mark.filterwarnings("ignore:torch.compile is not available")
+    def test_capture_compile(self):
+        collector_eager = self._make_collector()
+        collector = self._make_collector(capture_mode="compile")
+        calls = []
+        flat_step = collector._captured_step._flat_step
+
+        def _flat_step(*tensors):
+            calls.append(None)
+            return flat_step(*tensors)
+
+        collector._captured_step._flat_step = _flat_step
+        for data_eager, data in zip(collector_eager, collector):
+            assert_allclose_td(data_eager, data)
+        # all the steps (20 steps of 2 envs) but the first one went through
+        # the captured function
+        assert len(calls) == 19
+        assert ("next", "observation") in collector._captured_step._out_keys
+        assert "observation" not in collector._captured_step._out_keys
+        collector.shutdown()
+        collector_eager.shutdown()
+
+    @pytest.mark.filterwarnings("ignore:torch.compile is not available")
+    def test_capture_inplace_outputs(self):
+        env = CountingEnv()
+
+        def policy(tensordict):
+            tensordict.get("counter").add_(1)
+            return tensordict.set("action", torch.ones(1, dtype=torch.int))
+
+        captured_step = _CapturedPolicyStep(policy, env, mode="compile")
+        tensordict = env.reset()
+        tensordict.set("counter", torch.zeros(1))
+        captured_step(tensordict)
+        # entries written in-place are outputs too
+        assert "counter" in captured_step._out_keys
+        assert "observation" not in captured_step._out_keys
+
+    def test_capture_errors(self):
+        with pytest.raises(ValueError, match="requires an environment placed"):
+            self._make_collector(capture_mode="cudagraph")
+        with pytest.raises(ValueError, match="Unknown capture mode"):
+            self._make_collector(capture_mode="jit")
+
+
 @pytest.mark.skipif(not torch.cuda.device_count(), reason="No casting if no cuda")
 class TestUpdateParams:
     class DummyEnv(EnvBase):
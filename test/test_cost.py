@@ -95,15 +95,23 @@ from torchrl.objectives.utils import (
     SoftUpdate,
     ValueEstimators,
 )
-from torchrl.objectives.value.advantages import GAE, TD1Estimator, TDLambdaEstimator
+from torchrl.objectives.value.advantages import (
+    GAE,
+    TD1Estimator,
+    TDLambdaEstimator,
+    VTrace,
+)
 from torchrl.objectives.value.functional import (
     generalized_advantage_estimate,
+    scan_generalized_advantage_estimate,
+    scan_td_lambda_advantage_estimate,
     td0_advantage_estimate,
     td1_advantage_estimate,
     td_lambda_advantage_estimate,
     vec_generalized_advantage_estimate,
     vec_td1_advantage_estimate,
     vec_td_lambda_advantage_estimate,
+    vtrace_advantage_estimate,
 )
 from torchrl.objectives.value.utils import _custom_conv1d, _make_gammas_tensor
 
@@ -122,6 +130,12 @@ class _check_td_steady:
         ).all(), "Some keys have been modified in the tensordict!"
 
 
+# V-Trace requires the log-probability of the actions under the behaviour policy
+_VALUE_ESTIMATORS_NO_VTRACE = [
+    value_type for value_type in ValueEstimators if value_type != ValueEstimators.VTrace
+]
+
+
 def get_devices():
     devices = [torch.device("cpu")]
     for i in range(torch.cuda.device_count()):
@@ -305,10 +319,17 @@ class TestDQN:
         )
         return td
 
+    def test_dqn_vtrace(self):
+        actor = self._create_mock_actor(action_spec_type="one_hot")
+        loss_fn = DQNLoss(actor, loss_function="l2")
+        # losses without an actor network do not support V-trace
+        with pytest.raises(NotImplementedError, match="not implemented for loss"):
+            loss_fn.make_value_estimator(ValueEstimators.VTrace)
+
     @pytest.mark.parametrize("delay_value", (False, True))
     @pytest.mark.parametrize("device", get_available_devices())
     @pytest.mark.parametrize("action_spec_type", ("one_hot", "categorical"))
-    @pytest.mark.parametrize("td_est", list(ValueEstimators) + [None])
+    @pytest.mark.parametrize("td_est", _VALUE_ESTIMATORS_NO_VTRACE + [None])
     def test_dqn(self, delay_value, device, action_spec_type, td_est):
         torch.manual_seed(self.seed)
         actor = self._create_mock_actor(
@@ -406,7 +427,7 @@ class TestDQN:
     @pytest.mark.parametrize(
         "action_spec_type", ("mult_one_hot", "one_hot", "categorical")
     )
-    @pytest.mark.parametrize("td_est", list(ValueEstimators) + [None])
+    @pytest.mark.parametrize("td_est", _VALUE_ESTIMATORS_NO_VTRACE + [None])
     def test_distributional_dqn(
         self, atoms, delay_value, device, action_spec_type, td_est, gamma=0.9
     ):
@@ -555,7 +576,7 @@ class TestDDPG:
     )
     @pytest.mark.parametrize("device", get_available_devices())
     @pytest.mark.parametrize("delay_actor,delay_value", [(False, False), (True, True)])
-    @pytest.mark.parametrize("td_est", list(ValueEstimators) + [None])
+    @pytest.mark.parametrize("td_est", _VALUE_ESTIMATORS_NO_VTRACE + [None])
     def test_ddpg(self, delay_actor, delay_value, device, td_est):
         torch.manual_seed(self.seed)
         actor = self._create_mock_actor(device=device)
@@ -795,7 +816,7 @@ class TestTD3:
     )
     @pytest.mark.parametrize("policy_noise", [0.1, 1.0])
     @pytest.mark.parametrize("noise_clip", [0.1, 1.0])
-    @pytest.mark.parametrize("td_est", list(ValueEstimators) + [None])
+    @pytest.mark.parametrize("td_est", _VALUE_ESTIMATORS_NO_VTRACE + [None])
     def test_td3(
         self,
         delay_actor,
@@ -1081,7 +1102,7 @@ class TestSAC:
     @pytest.mark.parametrize("delay_qvalue", (True, False))
     @pytest.mark.parametrize("num_qvalue", [1, 2, 4, 8])
     @pytest.mark.parametrize("device", get_available_devices())
-    @pytest.mark.parametrize("td_est", list(ValueEstimators) + [None])
+    @pytest.mark.parametrize("td_est", _VALUE_ESTIMATORS_NO_VTRACE + [None])
     def test_sac(
         self,
         delay_value,
@@ -1498,7 +1519,7 @@ class TestDiscreteSAC:
     @pytest.mark.parametrize("device", get_available_devices())
     @pytest.mark.parametrize("target_entropy_weight", [0.01, 0.5, 0.99])
     @pytest.mark.parametrize("target_entropy", ["auto", 1.0, 0.1, 0.0])
-    @pytest.mark.parametrize("td_est", list(ValueEstimators) + [None])
+    @pytest.mark.parametrize("td_est", _VALUE_ESTIMATORS_NO_VTRACE + [None])
     def test_discrete_sac(
         self,
         delay_qvalue,
@@ -1854,7 +1875,7 @@ class TestREDQ:
     @pytest.mark.parametrize("delay_qvalue", (True, False))
     @pytest.mark.parametrize("num_qvalue", [1, 2, 4, 8])
     @pytest.mark.parametrize("device", get_available_devices())
-    @pytest.mark.parametrize("td_est", list(ValueEstimators) + [None])
+    @pytest.mark.parametrize("td_est", _VALUE_ESTIMATORS_NO_VTRACE + [None])
     def test_redq(self, delay_qvalue, num_qvalue, device, td_est):
 
         torch.manual_seed(self.seed)
@@ -2048,7 +2069,7 @@ class TestREDQ:
     @pytest.mark.parametrize("delay_qvalue", (True, False))
     @pytest.mark.parametrize("num_qvalue", [1, 2, 4, 8])
     @pytest.mark.parametrize("device", get_available_devices())
-    @pytest.mark.parametrize("td_est", list(ValueEstimators) + [None])
+    @pytest.mark.parametrize("td_est", _VALUE_ESTIMATORS_NO_VTRACE + [None])
     def test_redq_batched(self, delay_qvalue, num_qvalue, device, td_est):
 
         torch.manual_seed(self.seed)
@@ -2828,7 +2849,7 @@ class TestReinforce:
     @pytest.mark.parametrize("delay_value", [True, False])
     @pytest.mark.parametrize("gradient_mode", [True, False])
     @pytest.mark.parametrize("advantage", ["gae", "td", "td_lambda", None])
-    @pytest.mark.parametrize("td_est", list(ValueEstimators) + [None])
+    @pytest.mark.parametrize("td_est", _VALUE_ESTIMATORS_NO_VTRACE + [None])
     def test_reinforce_value_net(self, advantage, gradient_mode, delay_value, td_est):
         n_obs = 3
         n_act = 5
@@ -3248,7 +3269,7 @@ class TestDreamer:
 
     @pytest.mark.parametrize("imagination_horizon", [3, 5])
     @pytest.mark.parametrize("discount_loss", [True, False])
-    @pytest.mark.parametrize("td_est", list(ValueEstimators) + [None])
+    @pytest.mark.parametrize("td_est", _VALUE_ESTIMATORS_NO_VTRACE + [None])
     def test_dreamer_actor(self, device, imagination_horizon, discount_loss, td_est):
         tensordict = self._create_actor_data(2, 3, 10, 5).to(device)
         mb_env = self._create_mb_env(10, 5).to(device)
@@ -3430,7 +3451,7 @@ class TestIQL:
     @pytest.mark.parametrize("device", get_available_devices())
     @pytest.mark.parametrize("temperature", [0.0, 0.1, 1.0, 10.0])
     @pytest.mark.parametrize("expectile", [0.1, 0.5, 1.0])
-    @pytest.mark.parametrize("td_est", list(ValueEstimators) + [None])
+    @pytest.mark.parametrize("td_est", _VALUE_ESTIMATORS_NO_VTRACE + [None])
     def test_iql(
         self,
         num_qvalue,
@@ -4203,6 +4224,122 @@ class TestValues:
         torch.testing.assert_close(r1, r3, rtol=1e-4, atol=1e-4)
         torch.testing.assert_close(r1, r2, rtol=1e-4, atol=1e-4)
 
+    @pytest.mark.parametrize("device", get_available_devices())
+    @pytest.mark.parametrize("gamma", [0.99, 0.5])
+    @pytest.mark.parametrize("lmbda", [0.99, 0.5])
+    @pytest.mark.parametrize("N", [(3,), (7, 3)])
+    @pytest.mark.parametrize("T", [200, 7, 1])
+    @pytest.mark.parametrize("feature_dim", [[1], [2, 5]])
+    @pytest.mark.parametrize("random_gamma", [True, False])
+    def test_scan_estimators(
+        self, device, gamma, lmbda, N, T, feature_dim, random_gamma
+    ):
+        torch.manual_seed(0)
+        D = feature_dim
+        time_dim = -1 - len(D)
+        done = torch.zeros(*N, T, *D, device=device, dtype=torch.bool).bernoulli_(0.1)
+        reward = torch.randn(*N, T, *D, device=device)
+        state_value = torch.randn(*N, T, *D, device=device)
+        next_state_value = torch.randn(*N, T, *D, device=device)
+
+        r1 = scan_generalized_advantage_estimate(
+            gamma,
+            lmbda,
+            state_value,
+            next_state_value,
+            reward,
+            done,
+            time_dim=time_dim,
+        )
+        r2 = generalized_advantage_estimate(
+            gamma,
+            lmbda,
+            state_value,
+            next_state_value,
+            reward,
+            done,
+            time_dim=time_dim,
+        )
+        torch.testing.assert_close(r1, r2, rtol=1e-4, atol=1e-4)
+
+        if random_gamma:
+            gamma = torch.rand_like(reward) * gamma
+        r1 = scan_td_lambda_advantage_estimate(
+            gamma,
+            lmbda,
+            state_value,
+            next_state_value,
+            reward,
+            done,
+            time_dim=time_dim,
+        )
+        r2 = td_lambda_advantage_estimate(
+            gamma,
+            lmbda,
+            state_value,
+            next_state_value,
+            reward,
+            done,
+            time_dim=time_dim,
+        )
+        torch.testing.assert_close(r1, r2, rtol=1e-4, atol=1e-4)
+
+    @pytest.mark.parametrize("device", get_available_devices())
+    @pytest.mark.parametrize("gamma", [0.99, 0.5])
+    @pytest.mark.parametrize("N", [(3,), (7, 3)])
+    @pytest.mark.parametrize("T", [100, 3, 1])
+    @pytest.mark.parametrize("thresh", [1.0, 0.5])
+    def test_vtrace(self, device, gamma, N, T, thresh):
+        torch.manual_seed(0)
+        done = torch.zeros(*N, T, 1, device=device, dtype=torch.bool).bernoulli_(0.1)
+        reward = torch.randn(*N, T, 1, device=device)
+        state_value = torch.randn(*N, T, 1, device=device)
+        next_state_value = torch.randn(*N, T, 1, device=device)
+        log_pi = -torch.rand(*N, T, 1, device=device)
+        log_mu = -torch.rand(*N, T, 1, device=device)
+
+        adv, value_target = vtrace_advantage_estimate(
+            gamma,
+            log_pi,
+            log_mu,
+            state_value,
+            next_state_value,
+            reward,
+            done,
+            rho_thresh=thresh,
+            c_thresh=thresh,
+        )
+
+        # reference implementation
+        not_done = (~done).float()
+        ratio = (log_pi - log_mu).exp().clamp_max(thresh)
+        vs = torch.empty_like(state_value)
+        vs_next = next_state_value[..., -1, :]
+        v_next = next_state_value[..., -1, :]
+        adv_ref = torch.empty_like(state_value)
+        for t in reversed(range(T)):
+            discount = gamma * not_done[..., t, :]
+            if t < T - 1:
+                vs_next = vs[..., t + 1, :]
+                v_next = state_value[..., t + 1, :]
+            delta = ratio[..., t, :] * (
+                reward[..., t, :]
+                + discount * next_state_value[..., t, :]
+                - state_value[..., t, :]
+            )
+            vs[..., t, :] = (
+                state_value[..., t, :]
+                + delta
+                + discount * ratio[..., t, :] * (vs_next - v_next)
+            )
+            adv_ref[..., t, :] = ratio[..., t, :] * (
+                reward[..., t, :]
+                + discount * (next_state_value[..., t, :] + vs_next - v_next)
+                - state_value[..., t, :]
+            )
+        torch.testing.assert_close(value_target, vs, rtol=1e-4, atol=1e-4)
+        torch.testing.assert_close(adv, adv_ref, rtol=1e-4, atol=1e-4)
+
     @pytest.mark.parametrize("device", get_available_devices())
     @pytest.mark.parametrize("gamma", [0.5, 0.99, 0.1])
     @pytest.mark.parametrize("lmbda", [0.1, 0.5, 0.99])
@@ -5039,6 +5176,56 @@ class TestAdv:
         assert (td["state_value"] == exp_val).all()
         # assert (td["next", "state_value"] == exp_val).all()
 
+    @pytest.mark.parametrize("adv", [GAE, TDLambdaEstimator])
+    def test_scan(self, adv):
+        value_net = TensorDictModule(
+            nn.Linear(3, 1), in_keys=["obs"], out_keys=["state_value"]
+        )
+        td = TensorDict(
+            {
+                "obs": torch.randn(4, 100, 3),
+                "next": {
+                    "obs": torch.randn(4, 100, 3),
+                    "reward": torch.randn(4, 100, 1),
+                    "done": torch.zeros(4, 100, 1, dtype=torch.bool).bernoulli_(0.1),
+                },
+            },
+            [4, 100],
+        )
+        kwargs = {"gamma": 0.98, "lmbda": 0.95, "value_network": value_net}
+        td_vec = adv(vectorized=True, **kwargs)(td.clone())
+        td_scan = adv(vectorized="scan", **kwargs)(td.clone())
+        torch.testing.assert_close(td_vec["advantage"], td_scan["advantage"])
+        torch.testing.assert_close(td_vec["value_target"], td_scan["value_target"])
+
+    def test_vtrace_on_policy(self):
+        # with identical behaviour and target policies, V-Trace is TD(1)
+        value_net = TensorDictModule(
+            nn.Linear(3, 1), in_keys=["obs"], out_keys=["state_value"]
+        )
+        log_prob = -torch.rand(4, 100)
+        obs = torch.randn(4, 101, 3)
+        td = TensorDict(
+            {
+                "obs": obs[:, :-1],
+                "log_prob": log_prob,
+                "sample_log_prob": log_prob.clone(),
+                "next": {
+                    "obs": obs[:, 1:],
+                    "reward": torch.randn(4, 100, 1),
+                    "done": torch.zeros(4, 100, 1, dtype=torch.bool).bernoulli_(0.1),
+                },
+            },
+            [4, 100],
+        )
+        vtrace = VTrace(gamma=0.98, value_network=value_net)
+        td1 = TD1Estimator(gamma=0.98, value_network=value_net)
+        torch.testing.assert_close(
+            vtrace.value_estimate(td.clone()), td1.value_estimate(td.clone())
+        )
+        td_out = vtrace(td.clone())
+        assert td_out["advantage"].shape == td["next", "reward"].shape
+
 
 class TestBase:
     @pytest.mark.parametrize("expand_dim", [None, 2])
@@ -5087,6 +5274,45 @@ class TestBase:
             loss_module.module_b_params.flatten_keys()[key].requires_grad
 
 
+@pytest.mark.parametrize("mode", ["hard", "soft"])
+def test_updater_step_multi(mode):
+    torch.manual_seed(0)
+    dqn = DQNLoss(torch.nn.Linear(3, 4), delay_value=True, action_space="one_hot")
+    if mode == "hard":
+        upd = HardUpdate(dqn, value_network_update_interval=0)
+    else:
+        upd = SoftUpdate(dqn, eps=0.9)
+    sources = [
+        torch.randn(3, 4),
+        torch.randn(5, dtype=torch.float64),
+        torch.randint(10, (2,)),
+    ]
+    targets = [torch.randn(3, 4), torch.randn(5).double(), torch.randint(10, (2,))]
+    targets_multi = [target.clone() for target in targets]
+    # the fused update matches the per-tensor one
+    upd._step_multi(sources, targets_multi)
+    for source, target in zip(sources, targets):
+        upd._step(source, target)
+    for target, target_multi in zip(targets, targets_multi):
+        torch.testing.assert_close(target_multi, target)
+
+
+def test_updater_leaves_cache():
+    dqn = DQNLoss(torch.nn.Linear(3, 4), delay_value=True, action_space="one_hot")
+    upd = SoftUpdate(dqn, eps=0.5)
+    leaves = upd._leaves()
+    assert upd._leaves() is leaves
+    # casting the loss module re-creates the target buffers
+    dqn.to(torch.double)
+    leaves = upd._leaves()
+    assert all(target.dtype is torch.double for target in leaves[1])
+    for target in leaves[1]:
+        target.zero_()
+    upd.step()
+    for _, target in dqn.target_value_network_params.items(True, True):
+        assert (target != 0).any()
+
+
 @pytest.mark.parametrize("updater", [HardUpdate, SoftUpdate])
 def test_updater_warning(updater):
     with warnings.catch_warnings():
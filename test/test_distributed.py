@@ -332,6 +332,100 @@ class TestDistributedCollector(DistributedCollectorBase):
     def _start_worker(cls):
         pass
 
+    @classmethod
+    def _test_distributed_collector_broadcast(cls, queue, sync, weight_sync_dtype):
+        frames_per_batch = 50
+        total_frames = 300
+        env = CountingEnv()
+        policy = CountingPolicy()
+        collector = cls.distributed_class()(
+            [env] * 2,
+            policy,
+            total_frames=total_frames,
+            frames_per_batch=frames_per_batch,
+            sync=sync,
+            weight_sync="broadcast",
+            weight_sync_dtype=weight_sync_dtype,
+            **cls.distributed_kwargs(),
+        )
+        total = 0
+        first_batch = None
+        last_batch = None
+        for i, data in enumerate(collector):
+            total += data.numel()
+            if i == 0:
+                first_batch = data
+            if i < 2:
+                # two versions are published before the workers pull them
+                policy.weight.data += 1
+                collector.update_policy_weights_()
+            elif total == total_frames - frames_per_batch:
+                last_batch = data
+        assert collector._weight_broadcaster.version == 2
+        assert (first_batch["action"] == 1).all(), first_batch["action"]
+        assert (last_batch["action"] == 3).all(), last_batch["action"]
+        collector.shutdown()
+        assert total == total_frames
+        queue.put("passed")
+
+    @classmethod
+    def _test_distributed_collector_seed(cls, queue):
+        env = ContinuousActionVecMockEnv()
+        policy = RandomPolicy(env.action_spec)
+        collector = cls.distributed_class()(
+            [env] * 2,
+            policy,
+            total_frames=200,
+            frames_per_batch=50,
+            **cls.distributed_kwargs(),
+        )
+        new_seed = collector.set_seed(0)
+        assert isinstance(new_seed, int)
+        total = 0
+        for data in collector:
+            total += data.numel()
+        collector.shutdown()
+        assert total == 200
+        queue.put("passed")
+
+    def test_distributed_collector_seed(self):
+        """Testing the seeding command of the control channel."""
+        queue = mp.Queue(1)
+
+        proc = mp.Process(
+            target=self._test_distributed_collector_seed,
+            args=(queue,),
+        )
+        proc.start()
+        try:
+            out = queue.get(timeout=TIMEOUT)
+            assert out == "passed"
+        finally:
+            proc.join(10)
+            if proc.is_alive():
+                proc.terminate()
+            queue.close()
+
+    @pytest.mark.parametrize("sync", [False, True])
+    @pytest.mark.parametrize("weight_sync_dtype", [None, torch.float16])
+    def test_distributed_collector_broadcast(self, sync, weight_sync_dtype):
+        """Testing versioned weight broadcasting."""
+        queue = mp.Queue(1)
+
+        proc = mp.Process(
+            target=self._test_distributed_collector_broadcast,
+            args=(queue, sync, weight_sync_dtype),
+        )
+        proc.start()
+        try:
+            out = queue.get(timeout=TIMEOUT)
+            assert out == "passed"
+        finally:
+            proc.join(10)
+            if proc.is_alive():
+                proc.terminate()
+            queue.close()
+
 
 class TestRPCCollector(DistributedCollectorBase):
     @classmethod
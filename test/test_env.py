@@ -45,7 +45,12 @@ from torchrl.envs.gym_like import default_info_dict_reader
 from torchrl.envs.libs.dm_control import _has_dmc, DMControlEnv
 from torchrl.envs.libs.gym import _has_gym, GymEnv, GymWrapper
 from torchrl.envs.transforms import Compose, StepCounter, TransformedEnv
-from torchrl.envs.utils import check_env_specs, make_composite_from_td, step_mdp
+from torchrl.envs.utils import (
+    _StepMDP,
+    check_env_specs,
+    make_composite_from_td,
+    step_mdp,
+)
 from torchrl.modules import Actor, ActorCriticOperator, MLP, SafeModule, ValueOperator
 from torchrl.modules.tensordict_module import WorldModelWrapper
 
@@ -203,6 +208,41 @@ def test_rollout_predictability(device):
     ).all()
 
 
+@pytest.mark.parametrize("device", get_available_devices())
+@pytest.mark.parametrize("batch_size", [[], [3]])
+@pytest.mark.parametrize("break_when_any_done", [True, False])
+def test_rollout_preallocate(device, batch_size, break_when_any_done):
+    def make_env():
+        return TransformedEnv(MockSerialEnv(device=device), StepCounter(max_steps=20))
+
+    if batch_size:
+        env = SerialEnv(batch_size[0], make_env)
+    else:
+        env = make_env()
+    policy = Actor(torch.nn.Linear(1, 1, bias=False)).to(device)
+    for p in policy.parameters():
+        p.data.fill_(1.0)
+
+    with torch.no_grad():
+        env.set_seed(100)
+        td_ref = env.rollout(
+            policy=policy, max_steps=50, break_when_any_done=break_when_any_done
+        )
+        env.set_seed(100)
+        td_out = env.rollout(
+            policy=policy,
+            max_steps=50,
+            break_when_any_done=break_when_any_done,
+            preallocate=True,
+        )
+    expected_steps = 20 if break_when_any_done else 50
+    assert td_out.shape == torch.Size([*batch_size, expected_steps])
+    assert td_out.names[-1] == "time"
+    assert_allclose_td(td_ref, td_out)
+    # early-stopped rollouts are copied out of the preallocated buffer
+    assert td_out.get("action")._base is None
+
+
 @pytest.mark.skipif(not _has_gym, reason="no gym")
 @pytest.mark.parametrize(
     "env_name",
@@ -636,6 +676,43 @@ class TestParallel:
         assert not env.is_closed
         env.close()
 
+    @pytest.mark.skipif(not _has_gym, reason="no gym")
+    def test_parallel_env_zero_copy(self):
+        env_make = EnvCreator(lambda: GymEnv(PENDULUM_VERSIONED))
+        env = ParallelEnv(3, env_make)
+        env_zero_copy = ParallelEnv(3, env_make, zero_copy=True)
+
+        env.set_seed(0)
+        torch.manual_seed(0)
+        td = env.rollout(max_steps=20)
+        env_zero_copy.set_seed(0)
+        torch.manual_seed(0)
+        td_zero_copy = env_zero_copy.rollout(max_steps=20)
+        assert_allclose_td(td, td_zero_copy)
+
+        # step outputs are views on the two shared buffers used alternately
+        td = env_zero_copy.rand_step(env_zero_copy.reset())
+        obs0 = td.get(("next", "observation"))
+        td = env_zero_copy.rand_step(step_mdp(td))
+        obs1 = td.get(("next", "observation"))
+        td = env_zero_copy.rand_step(step_mdp(td))
+        obs2 = td.get(("next", "observation"))
+        assert obs0.data_ptr() != obs1.data_ptr()
+        assert obs0.data_ptr() == obs2.data_ptr()
+        assert obs2.data_ptr() == (
+            env_zero_copy.shared_tensordict_parent.get(
+                ("next", "observation")
+            ).data_ptr()
+        )
+
+        # commands other than step still go through the pipes
+        assert env_zero_copy.state_dict().keys() == {"worker0", "worker1", "worker2"}
+        env_zero_copy.close()
+        env.close()
+
+        with pytest.raises(ValueError, match="zero_copy requires"):
+            ParallelEnv(3, env_make, shared_memory=False, zero_copy=True)
+
     @pytest.mark.parametrize("parallel", [True, False])
     def test_parallel_env_custom_method(self, parallel):
         # define env
@@ -1030,6 +1107,98 @@ def test_steptensordict(
         assert out is next_tensordict
 
 
+@pytest.mark.parametrize("keep_other", [True, False])
+@pytest.mark.parametrize("exclude_reward", [True, False])
+@pytest.mark.parametrize("exclude_done", [True, False])
+@pytest.mark.parametrize("exclude_action", [True, False])
+def test_steptensordict_cached(
+    keep_other, exclude_reward, exclude_done, exclude_action
+):
+    def make_tensordict(with_extra):
+        tensordict = TensorDict(
+            {
+                "ledzep": torch.randn(4, 2),
+                "nested": {"pinkfloyd": torch.randn(4, 1)},
+                "next": {
+                    "ledzep": torch.randn(4, 2),
+                    "nested": {"doors": torch.randn(4, 1)},
+                    "reward": torch.randn(4, 1),
+                    "done": torch.zeros(4, 1, dtype=torch.bool),
+                },
+                "beatles": torch.randn(4, 1),
+                "action": torch.randn(4, 2),
+            },
+            [4],
+        )
+        if with_extra:
+            tensordict["next", "queen"] = torch.randn(4, 3)
+        return tensordict
+
+    step_mdp_cached = _StepMDP(
+        keep_other=keep_other,
+        exclude_reward=exclude_reward,
+        exclude_done=exclude_done,
+        exclude_action=exclude_action,
+    )
+    # the structure changes at the third call
+    for with_extra in (False, False, True, False):
+        tensordict = make_tensordict(with_extra)
+        out = step_mdp_cached(tensordict)
+        expected = step_mdp(
+            tensordict.clone(False),
+            keep_other=keep_other,
+            exclude_reward=exclude_reward,
+            exclude_done=exclude_done,
+            exclude_action=exclude_action,
+        )
+        assert set(out.keys(True, True)) == set(expected.keys(True, True))
+        for key in out.keys(True, True):
+            assert out.get(key) is expected.get(key)
+        # nested entries are merged in a new tensordict
+        if keep_other:
+            assert out["nested"] is not tensordict["nested"]
+            assert "doors" not in tensordict["nested"].keys()
+    assert len(step_mdp_cached._plans) == 2
+
+
+@pytest.mark.parametrize("device", get_available_devices())
+def test_trusted_step(device):
+    env_trusted = MockBatchedLockedEnv(device)
+    env_trusted.set_seed(1)
+    env = MockBatchedLockedEnv(device)
+    env.set_seed(1)
+    env_trusted.trusted_step = True
+    assert env_trusted.trusted_step
+
+    calls = []
+    assert_tensordict_shape = env_trusted._assert_tensordict_shape
+
+    def _assert_tensordict_shape(tensordict):
+        calls.append(None)
+        return assert_tensordict_shape(tensordict)
+
+    env_trusted._assert_tensordict_shape = _assert_tensordict_shape
+    td_trusted = env_trusted.reset()
+    td = env.reset()
+    for _ in range(3):
+        action = env.action_spec.rand()
+        td_trusted = env_trusted.step(td_trusted.set("action", action))
+        td = env.step(td.set("action", action))
+        assert_allclose_td(td_trusted, td)
+        td_trusted = step_mdp(td_trusted)
+        td = step_mdp(td)
+    # only the first step was validated
+    assert len(calls) == 1
+    # setting the attribute again triggers a new validation
+    env_trusted.trusted_step = True
+    env_trusted.step(td_trusted.set("action", env.action_spec.rand()))
+    assert len(calls) == 2
+    env_trusted.trusted_step = False
+    env_trusted.step(step_mdp(td_trusted).set("action", env.action_spec.rand()))
+    env_trusted.step(step_mdp(td_trusted).set("action", env.action_spec.rand()))
+    assert len(calls) == 4
+
+
 @pytest.mark.parametrize("device", get_available_devices())
 def test_batch_locked(device):
     env = MockBatchedLockedEnv(device)
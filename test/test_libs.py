@@ -1369,6 +1369,28 @@ class TestD4RL:
         assert len(data) // i == batch_size
         print(f"completed test after {time.time()-t0}s")
 
+    @pytest.mark.parametrize("task", ["walker2d-medium-replay-v2"])
+    def test_d4rl_cache(self, task, tmpdir, monkeypatch):
+        data = D4RLExperienceReplay(
+            task, split_trajs=True, from_env=True, batch_size=2, cache_dir=tmpdir
+        )
+
+        def _get_dataset_from_env(*args, **kwargs):
+            raise AssertionError("The dataset should be loaded from the cache.")
+
+        monkeypatch.setattr(
+            D4RLExperienceReplay, "_get_dataset_from_env", _get_dataset_from_env
+        )
+        data_cached = D4RLExperienceReplay(
+            task, split_trajs=True, from_env=True, batch_size=2, cache_dir=tmpdir
+        )
+        assert len(data_cached) == len(data)
+        assert_allclose_td(data_cached._storage._storage, data._storage._storage)
+        # the cached storage is memory-mapped from the cache directory
+        assert data_cached._storage.scratch_dir.startswith(str(tmpdir))
+        assert data_cached.specs == data.specs
+        data_cached.sample()
+
 
 @pytest.mark.skipif(not _has_sklearn, reason="Scikit-learn not found")
 @pytest.mark.parametrize(
@@ -1408,6 +1430,30 @@ class TestOpenML:
             continue
         assert len(data) // 2048 in (i, i - 1)
 
+    def test_data_cache(self, dataset, tmpdir, monkeypatch):
+        data = OpenMLExperienceReplay(dataset, batch_size=2048, cache_dir=tmpdir)
+
+        def _get_data(*args, **kwargs):
+            raise AssertionError("The dataset should be loaded from the cache.")
+
+        monkeypatch.setattr(OpenMLExperienceReplay, "_get_data", _get_data)
+        data_cached = OpenMLExperienceReplay(dataset, batch_size=2048, cache_dir=tmpdir)
+        assert len(data_cached) == len(data)
+        assert data_cached.max_outcome_val == data.max_outcome_val
+        assert_allclose_td(data_cached._storage._storage, data._storage._storage)
+        for i, _ in enumerate(data_cached):  # noqa: B007
+            continue
+        assert len(data_cached) // 2048 in (i, i - 1)
+        # writing to a cached buffer does not modify the cache
+        index = torch.arange(10)
+        zeros = data_cached._storage.get(index).apply(torch.zeros_like)
+        data_cached._storage.set(index, zeros)
+        assert (data_cached._storage.get(index) == 0).all()
+        data_reloaded = OpenMLExperienceReplay(
+            dataset, batch_size=2048, cache_dir=tmpdir
+        )
+        assert_allclose_td(data_reloaded._storage._storage, data._storage._storage)
+
 
 if __name__ == "__main__":
     args, unknown = argparse.ArgumentParser().parse_known_args()
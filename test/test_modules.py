@@ -379,6 +379,64 @@ class TestPlanner:
             if key != "action":
                 assert torch.allclose(td[key], td_copy[key])
 
+    def test_CEM_warm_start(self, device, batch_size, seed=1):
+        env = MockBatchedUnLockedEnv(device=device)
+        torch.manual_seed(seed)
+        planner = CEMPlanner(
+            env,
+            planning_horizon=10,
+            optim_steps=2,
+            num_candidates=100,
+            top_k=2,
+            warm_start=True,
+        )
+        td = env.reset(TensorDict({}, batch_size=batch_size).to(device))
+        planner(td.clone())
+        prev_means = planner._warm_start_means.clone()
+        assert prev_means.shape[:2] == torch.Size([batch_size, 1])
+        # without optimization steps, the plan is the previous one shifted in time
+        planner.optim_steps = 0
+        action = planner(td.clone()).get("action")
+        torch.testing.assert_close(action, prev_means[:, 0, 1])
+        torch.testing.assert_close(
+            planner._warm_start_means[:, :, :-1], prev_means[:, :, 1:]
+        )
+        assert (planner._warm_start_means[:, :, -1] == 0).all()
+
+    def test_MPPI_warm_start(self, device, batch_size, seed=1):
+        torch.manual_seed(seed)
+        env = MockBatchedUnLockedEnv(device=device)
+        value_net = nn.LazyLinear(1, device=device)
+        value_net = ValueOperator(value_net, in_keys=["observation"])
+        advantage_module = TDLambdaEstimator(
+            gamma=0.99,
+            lmbda=0.95,
+            value_network=value_net,
+        )
+        value_net(env.reset())
+        planner = MPPIPlanner(
+            env,
+            advantage_module,
+            temperature=1.0,
+            planning_horizon=10,
+            optim_steps=2,
+            num_candidates=100,
+            top_k=2,
+            warm_start=True,
+        )
+        td = env.reset(TensorDict({}, batch_size=batch_size).to(device))
+        planner(td.clone())
+        prev_means = planner._warm_start_means.clone()
+        assert prev_means.shape[:2] == torch.Size([batch_size, 1])
+        # without optimization steps, the plan is the previous one shifted in time
+        planner.optim_steps = 0
+        action = planner(td.clone()).get("action")
+        torch.testing.assert_close(action, prev_means[:, 0, 1])
+        torch.testing.assert_close(
+            planner._warm_start_means[:, :, :-1], prev_means[:, :, 1:]
+        )
+        assert (planner._warm_start_means[:, :, -1] == 0).all()
+
 
 @pytest.mark.parametrize("device", get_available_devices())
 @pytest.mark.parametrize("batch_size", [[], [3], [5]])
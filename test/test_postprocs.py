@@ -320,6 +320,32 @@ class TestSplits:
             == split_trajs.get(("collector", "traj_ids")).max() + 1
         )
 
+    def test_splits_padding(self):
+        traj_ids = torch.tensor([0, 0, 0, 1, 2, 2])
+        done = torch.tensor([0, 0, 1, 1, 0, 1], dtype=torch.bool).unsqueeze(-1)
+        obs = torch.arange(1, 7, dtype=torch.float).unsqueeze(-1)
+        trajs = TensorDict(
+            {
+                "obs": obs,
+                ("collector", "traj_ids"): traj_ids,
+                ("next", "done"): done,
+            },
+            [6],
+        )
+        split_trajs = split_trajectories(trajs, prefix="collector")
+        assert split_trajs.shape == torch.Size([3, 3])
+        torch.testing.assert_close(
+            split_trajs.get("obs").squeeze(-1),
+            torch.tensor([[1.0, 2.0, 3.0], [4.0, 0.0, 0.0], [5.0, 6.0, 0.0]]),
+        )
+        assert (
+            split_trajs.get(("collector", "mask"))
+            == torch.tensor(
+                [[True, True, True], [True, False, False], [True, True, False]]
+            )
+        ).all()
+        assert (split_trajs.get(("next", "done")).sum(1) == 1).all()
+
 
 if __name__ == "__main__":
     args, unknown = argparse.ArgumentParser().parse_known_args()
@@ -6,6 +6,7 @@
 import argparse
 import importlib
 import sys
+import threading
 from functools import partial
 from unittest import mock
 
@@ -15,10 +16,13 @@ import torch
 from _utils_internal import get_available_devices, make_tc
 from tensordict import is_tensorclass, tensorclass
 from tensordict.tensordict import assert_allclose_td, TensorDict, TensorDictBase
+from torch import multiprocessing as mp
 from torchrl.data import (
     PrioritizedReplayBuffer,
     RemoteTensorDictReplayBuffer,
     ReplayBuffer,
+    ShardedReplayBuffer,
+    SharedTensorDictReplayBuffer,
     TensorDictPrioritizedReplayBuffer,
     TensorDictReplayBuffer,
 )
@@ -27,6 +31,7 @@ from torchrl.data.replay_buffers.samplers import (
     PrioritizedSampler,
     RandomSampler,
     SamplerWithoutReplacement,
+    SliceSampler,
 )
 
 from torchrl.data.replay_buffers.storages import (
@@ -323,6 +328,7 @@ def test_prototype_prb(priority_key, contiguous, device):
     rb = TensorDictReplayBuffer(
         sampler=samplers.PrioritizedSampler(5, alpha=0.7, beta=0.9),
         priority_key=priority_key,
+        storage=ListStorage(5),
         batch_size=5,
     )
     td1 = TensorDict(
@@ -746,6 +752,39 @@ def test_rb_trajectories(stack, reduction):
     sampled_td_filtered.batch_size = [3, 4]
 
 
+@pytest.mark.parametrize("dtype", [torch.float, torch.double])
+def test_prioritized_sampler_stratified(dtype):
+    torch.manual_seed(0)
+    n = 16
+    sampler = PrioritizedSampler(max_capacity=n, alpha=1.0, beta=0.5, dtype=dtype)
+    rb = ReplayBuffer(storage=LazyTensorStorage(n), sampler=sampler, batch_size=8)
+    index = rb.extend(torch.arange(n))
+    priority = torch.arange(1, n + 1, dtype=dtype)
+    rb.update_priority(torch.as_tensor(index), priority)
+
+    # sum and min trees are updated together
+    priority = priority + sampler._eps
+    torch.testing.assert_close(
+        torch.tensor(sampler._sum_tree.query(0, n), dtype=dtype), priority.sum()
+    )
+    torch.testing.assert_close(
+        torch.tensor(sampler._min_tree.query(0, n), dtype=dtype), priority.min()
+    )
+
+    data, info = rb.sample(return_info=True)
+    idx = info["index"]
+    assert isinstance(idx, torch.Tensor) and idx.dtype == torch.long
+    assert isinstance(info["_weight"], torch.Tensor)
+    assert info["_weight"].dtype == dtype
+    # one index per stratum: indices are sorted and cover the whole range
+    assert (idx[1:] >= idx[:-1]).all()
+    assert idx[0] < n // 2 and idx[-1] >= n // 2
+    assert (data == idx).all()
+    torch.testing.assert_close(
+        info["_weight"], (priority[idx] / priority.min()).pow(-0.5)
+    )
+
+
 def test_shared_storage_prioritized_sampler():
     n = 100
 
@@ -774,6 +813,212 @@ def test_shared_storage_prioritized_sampler():
     assert rb1._sampler._sum_tree.query(0, 70) == 50
 
 
+@pytest.mark.parametrize("storage_type", [LazyTensorStorage, LazyMemmapStorage])
+@pytest.mark.parametrize("prefetch", [None, 2])
+def test_pinned_staging(storage_type, prefetch):
+    torch.manual_seed(0)
+    rb = TensorDictReplayBuffer(
+        storage=storage_type(20),
+        batch_size=4,
+        prefetch=prefetch,
+        pinned_staging=True,
+        prefetch_device="cpu",
+    )
+    td = TensorDict(
+        {"a": torch.randn(10, 3), ("b", "c"): torch.randn(10, 3, 2)}, [10, 3]
+    )
+    rb.extend(td)
+    ring_size = (prefetch or 0) + 2
+    buffers = []
+    for _ in range(2 * ring_size):
+        sample = rb.sample()
+        assert sample.batch_size == torch.Size([4, 3])
+        index = sample.get("index")[:, 0].long()
+        assert (sample.exclude("index") == td[index]).all()
+        buffers.append(sample.get("a").data_ptr())
+    # the batches are gathered in a ring of preallocated buffers
+    assert len(rb._staging_ring) == ring_size
+    assert len(set(buffers)) == ring_size
+
+
+def test_prefetch_device_list():
+    rb = ReplayBuffer(
+        storage=ListStorage(10),
+        collate_fn=lambda x: x,
+        batch_size=3,
+        prefetch_device="cpu",
+    )
+    rb.extend(["a", 1, None])
+    # batches that cannot be moved to a device are returned as is
+    sample = rb.sample()
+    assert isinstance(sample, list)
+    assert len(sample) == 3
+
+
+@pytest.mark.parametrize("storage_type", [LazyTensorStorage, LazyMemmapStorage])
+@pytest.mark.parametrize("td", [True, False])
+def test_storage_get_out(storage_type, td):
+    storage = storage_type(10)
+    if td:
+        data = TensorDict({"a": torch.randn(10, 3), ("b", "c"): torch.randn(10)}, [10])
+    else:
+        data = torch.randn(10, 3)
+    storage.set(range(10), data)
+    index = torch.tensor([3, 1, 1, 7])
+    out = storage._empty_batch(4)
+    result = storage.get(index, out=out)
+    assert (result == storage.get(index)).all()
+    # the result shares its memory with the preallocated batch
+    if td:
+        assert result.get("a").data_ptr() == out.get("a").data_ptr()
+    else:
+        assert result.data_ptr() == out.data_ptr()
+
+
+@pytest.mark.parametrize("prefetch", [None, 2])
+def test_reuse_output(prefetch):
+    torch.manual_seed(0)
+    rb = ReplayBuffer(
+        storage=LazyTensorStorage(20),
+        batch_size=4,
+        prefetch=prefetch,
+        reuse_output=True,
+    )
+    data = torch.randn(20, 3)
+    rb.extend(data)
+    ring_size = (prefetch or 0) + 1
+    buffers = []
+    for _ in range(2 * ring_size):
+        sample, info = rb.sample(return_info=True)
+        assert (sample == data[info["index"]]).all()
+        buffers.append(sample.data_ptr())
+    assert len(set(buffers)) == ring_size
+
+
+def _extend_shared_rb(rb):
+    rb.extend(TensorDict({"obs": torch.ones(10, 3)}, [10]))
+
+
+@pytest.mark.parametrize("storage_type", [LazyTensorStorage, LazyMemmapStorage])
+def test_shared_tensordict_replay_buffer(storage_type):
+    rb = SharedTensorDictReplayBuffer(storage=storage_type(100), batch_size=20)
+    with pytest.raises(RuntimeError, match="must be initialized"):
+        mp.Process(target=_extend_shared_rb, args=(rb,)).start()
+    rb.extend(TensorDict({"obs": torch.zeros(10, 3)}, [10]))
+    proc = mp.Process(target=_extend_shared_rb, args=(rb,))
+    proc.start()
+    proc.join()
+    assert proc.exitcode == 0
+    # writer cursor and storage length are shared with the other process
+    assert len(rb) == 20
+    assert rb._writer._cursor == 20
+    sample = rb.sample()
+    # data written by the other processes is visible from the main process
+    assert (sample["obs"] == (sample["index"] >= 10).float().unsqueeze(-1)).all()
+
+
+def test_shared_tensordict_replay_buffer_overwrite():
+    rb = SharedTensorDictReplayBuffer(storage=LazyTensorStorage(10), batch_size=4)
+    rb.extend(TensorDict({"obs": torch.zeros(10, 3)}, [10]))
+    written = rb._pull_meta()
+    assert written == 10
+    assert not rb._overwritten(torch.arange(10), written)
+    # a write that happens during a gather is detected if it hits a sampled item
+    rb.extend(TensorDict({"obs": torch.ones(3, 3)}, [3]))
+    assert not rb._overwritten(torch.arange(3, 10), written)
+    assert rb._overwritten(torch.tensor([5, 2]), written)
+    # sampled data is never partially overwritten
+    sample = rb.sample()
+    assert (sample["obs"] == (sample["index"] < 3).float().unsqueeze(-1)).all()
+
+
+class TestShardedReplayBuffer:
+    def test_extend_sample(self):
+        torch.manual_seed(0)
+        rb = ShardedReplayBuffer(
+            storages=[LazyTensorStorage(10), LazyTensorStorage(30)], batch_size=4000
+        )
+        index0 = rb.extend(torch.zeros(10))
+        index1 = rb.extend(torch.ones(30))
+        assert len(rb) == 40
+        assert (torch.as_tensor(index0) == torch.arange(10)).all()
+        assert (torch.as_tensor(index1) == torch.arange(10, 40)).all()
+        sample, info = rb.sample(return_info=True)
+        assert sample.shape == torch.Size([4000])
+        # shards are sampled in proportion to their size
+        assert abs(sample.mean() - 0.75) < 0.05
+        assert (sample == (info["index"] >= 10).float()).all()
+
+    def test_getitem(self):
+        rb = ShardedReplayBuffer(
+            storages=[LazyTensorStorage(10), LazyTensorStorage(30)], batch_size=4
+        )
+        rb.extend(torch.arange(10))
+        rb.extend(torch.arange(100, 130))
+        assert rb[3] == 3
+        assert rb[12] == 102
+        # the order of the index is preserved across shards
+        index = torch.tensor([35, 2, 10, 9, 0])
+        assert (rb[index] == torch.tensor([125, 2, 100, 9, 0])).all()
+
+    def test_prioritized(self):
+        torch.manual_seed(0)
+        rb = ShardedReplayBuffer(
+            storages=[LazyTensorStorage(10) for _ in range(2)],
+            samplers=[
+                PrioritizedSampler(10, alpha=1.0, beta=0.5, eps=0.0) for _ in range(2)
+            ],
+            batch_size=4000,
+        )
+        rb.extend(torch.zeros(10))
+        rb.extend(torch.ones(10))
+        priority = torch.ones(20)
+        priority[10:] = 3.0
+        rb.update_priority(torch.arange(20), priority)
+        sample, info = rb.sample(return_info=True)
+        # shards are sampled in proportion to their total priority
+        assert abs(sample.mean() - 0.75) < 0.05
+        # importance weights are normalized by the global minimum priority
+        torch.testing.assert_close(info["_weight"], priority[info["index"]].pow(-0.5))
+
+    def test_concurrent_writes_and_samples(self):
+        rb = ShardedReplayBuffer(
+            storages=[LazyTensorStorage(1000) for _ in range(4)],
+            batch_size=16,
+            prefetch=4,
+        )
+        rb.extend(torch.zeros(10))
+
+        def write(i):
+            for _ in range(10):
+                rb.extend(torch.full((10,), float(i)))
+
+        def sample():
+            for _ in range(10):
+                assert rb.sample().shape == torch.Size([16])
+
+        threads = [threading.Thread(target=write, args=(i,)) for i in range(4)]
+        threads += [threading.Thread(target=sample) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(rb) == 410
+
+    def test_state_dict(self):
+        rb = ShardedReplayBuffer(
+            storages=[LazyTensorStorage(10) for _ in range(2)], batch_size=3
+        )
+        rb.extend(torch.arange(5))
+        rb.extend(torch.arange(7))
+        rb2 = ShardedReplayBuffer(
+            storages=[LazyTensorStorage(10) for _ in range(2)], batch_size=3
+        )
+        rb2.load_state_dict(rb.state_dict())
+        assert len(rb2) == 12
+        assert (rb2._storages[1][torch.arange(7)] == torch.arange(7)).all()
+
+
 def test_append_transform():
     rb = ReplayBuffer(collate_fn=lambda x: torch.stack(x, 0), batch_size=1)
     td = TensorDict(
@@ -946,6 +1191,96 @@ def test_samplerwithoutrep(size, samples, drop_last):
         assert not visited
 
 
+class TestSliceSampler:
+    @staticmethod
+    def _make_data(traj_len, use_traj_ids):
+        # trajectories of various lengths, stored one after the other
+        traj_ids = torch.cat(
+            [torch.full((length,), i) for i, length in enumerate(traj_len)]
+        )
+        done = torch.zeros(traj_ids.numel(), 1, dtype=torch.bool)
+        done[torch.tensor(traj_len).cumsum(0) - 1] = True
+        data = TensorDict({"obs": traj_ids.clone()}, [traj_ids.numel()])
+        if use_traj_ids:
+            data["collector", "traj_ids"] = traj_ids
+        else:
+            data["next", "done"] = done
+        return data
+
+    @pytest.mark.parametrize("use_traj_ids", [True, False])
+    @pytest.mark.parametrize("storage_type", [LazyTensorStorage, LazyMemmapStorage])
+    def test_slice_sampler(self, use_traj_ids, storage_type):
+        torch.manual_seed(0)
+        rb = TensorDictReplayBuffer(
+            storage=storage_type(100),
+            sampler=SliceSampler(slice_len=5),
+            batch_size=50,
+        )
+        rb.extend(self._make_data([3, 10, 7, 1], use_traj_ids))
+        sample = rb.sample()
+        assert sample.shape == torch.Size([50, 5])
+        mask = sample.get("mask")
+        # a slice never crosses the end of its trajectory
+        assert (sample["obs"] == sample["obs"][:, :1]).all()
+        assert mask[:, 0].all()
+        assert not mask.all()
+        # masked elements are always at the end of the slice
+        assert (mask.cumprod(-1) == mask).all()
+        index = sample.get("index")
+        assert ((index[:, 1:] - index[:, :-1])[mask[:, 1:]] == 1).all()
+
+    def test_strict_length(self):
+        torch.manual_seed(0)
+        rb = TensorDictReplayBuffer(
+            storage=LazyTensorStorage(100),
+            sampler=SliceSampler(slice_len=5, strict_length=True),
+            batch_size=50,
+        )
+        rb.extend(self._make_data([3, 2], use_traj_ids=True))
+        with pytest.raises(RuntimeError, match="No trajectory of length 5"):
+            rb.sample()
+        rb.extend(self._make_data([3, 10, 7, 1], use_traj_ids=True))
+        sample = rb.sample()
+        assert sample.get("mask").all()
+        assert (sample["obs"] == sample["obs"][:, :1]).all()
+        assert set(sample["obs"][:, 0].tolist()) == {1, 2}
+
+    def test_incremental_update(self):
+        torch.manual_seed(0)
+        sampler = SliceSampler(slice_len=4)
+        rb = TensorDictReplayBuffer(
+            storage=LazyTensorStorage(20), sampler=sampler, batch_size=200
+        )
+        data = self._make_data([6, 14], use_traj_ids=True)
+        rb.extend(data[:10])
+        index = rb.sample().get("index")
+        # the last item written ends its trajectory until more data comes in
+        assert index.max() == 9
+        assert (sampler._ends == torch.tensor([5, 9])).all()
+        rb.extend(data[10:])
+        rb.sample()
+        assert (sampler._ends == torch.tensor([5, 19])).all()
+        # overwriting the first items splits the trajectory at the write cursor
+        rb.extend(self._make_data([3], use_traj_ids=True))
+        rb.sample()
+        assert (sampler._ends == torch.tensor([2, 5, 19])).all()
+
+    def test_load_state_dict(self):
+        storage = LazyTensorStorage(20)
+        sampler = SliceSampler(slice_len=4)
+        rb = TensorDictReplayBuffer(storage=storage, sampler=sampler, batch_size=10)
+        rb.extend(self._make_data([6, 8], use_traj_ids=True))
+        rb.sample()
+        state_dict = rb.state_dict()
+        sampler2 = SliceSampler(slice_len=4)
+        rb2 = TensorDictReplayBuffer(
+            storage=LazyTensorStorage(20), sampler=sampler2, batch_size=10
+        )
+        rb2.load_state_dict(state_dict)
+        rb2.sample()
+        assert (sampler2._ends == sampler._ends).all()
+
+
 @pytest.mark.parametrize("size", [10, 15, 20])
 @pytest.mark.parametrize("drop_last", [True, False])
 def test_replay_buffer_iter(size, drop_last):
@@ -365,6 +365,40 @@ def test_multi_discrete_conversion(ns, shape, device):
     assert one_hot.is_in(categorical.to_one_hot(categorical.rand(shape)))
 
 
+def test_encode_zero_copy():
+    spec = UnboundedContinuousTensorSpec((3, 4), dtype=torch.float32)
+    val = np.random.randn(3, 4).astype(np.float32)
+    # arrays are copied by default
+    encoded = spec.encode(val)
+    assert encoded.data_ptr() != val.__array_interface__["data"][0]
+    assert (encoded == torch.from_numpy(val)).all()
+    encoded = spec.encode(val, copy=False)
+    assert encoded.data_ptr() == val.__array_interface__["data"][0]
+    # a dtype mismatch requires a copy
+    encoded = spec.encode(val.astype(np.float64), copy=False)
+    assert encoded.dtype == torch.float32
+    assert (encoded == torch.from_numpy(val)).all()
+    # negative strides and read-only arrays are copied
+    encoded = spec.encode(val[::-1], copy=False)
+    assert (encoded == torch.from_numpy(val[::-1].copy())).all()
+    val.flags.writeable = False
+    encoded = spec.encode(val, copy=False)
+    assert encoded.data_ptr() != val.__array_interface__["data"][0]
+    assert (encoded == torch.from_numpy(val.copy())).all()
+
+
+def test_encode_out():
+    spec = BoundedTensorSpec(0, 255, (3, 21, 16), dtype=torch.uint8)
+    val = np.random.randint(0, 256, (3, 21, 16), dtype=np.uint8)
+    out = spec.zero()
+    assert spec.encode(val, out=out) is out
+    assert (out == torch.from_numpy(val)).all()
+    # the dtype conversion happens during the copy
+    out = torch.zeros(3, 21, 16, dtype=torch.float32)
+    spec.encode(val, out=out)
+    assert (out == torch.from_numpy(val).float()).all()
+
+
 @pytest.mark.parametrize("is_complete", [True, False])
 @pytest.mark.parametrize("device", get_available_devices())
 @pytest.mark.parametrize("dtype", [torch.float32, torch.float16, torch.float64, None])
@@ -441,6 +475,22 @@ class TestComposite:
                 assert encoded_vals["act"].dtype == dtype
                 assert (encoded_vals["act"] == r["act"]).all()
 
+    def test_encode_out(self, is_complete, device, dtype):
+        ts = self._composite_spec(is_complete, device, dtype)
+        r = ts.rand()
+        raw_vals = {"obs": r["obs"].cpu().numpy()}
+        if is_complete:
+            raw_vals["act"] = r["act"].cpu().numpy()
+        out = ts.zero()
+        obs = out["obs"]
+        encoded_vals = ts.encode(raw_vals, out=out)
+        assert encoded_vals is out
+        # the values are written in place
+        assert encoded_vals["obs"] is obs
+        assert (encoded_vals["obs"] == r["obs"]).all()
+        if is_complete:
+            assert (encoded_vals["act"] == r["act"]).all()
+
     def test_is_in(self, is_complete, device, dtype):
         ts = self._composite_spec(is_complete, device, dtype)
         for _ in range(100):
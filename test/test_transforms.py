@@ -27,9 +27,10 @@ from mocking_classes import (
     MockBatchedLockedEnv,
     MockBatchedUnLockedEnv,
 )
-from tensordict.tensordict import TensorDict, TensorDictBase
+from tensordict.tensordict import assert_allclose_td, TensorDict, TensorDictBase
 from torch import multiprocessing as mp, nn, Tensor
 from torchrl._utils import prod
+from torchrl.collectors import SyncDataCollector
 from torchrl.data import (
     BoundedTensorSpec,
     CompositeSpec,
@@ -613,6 +614,34 @@ class TestCatFrames(TransformBase):
         _ = cat_frames._call(tdc)
         assert (buffer != 0).all()
 
+    @pytest.mark.parametrize("dim", [-2, -1])
+    @pytest.mark.parametrize("N", [3, 4])
+    @pytest.mark.parametrize("padding", ["same", "zeros"])
+    def test_ring_buffer(self, dim, N, padding):
+        def make_env(ring_buffer):
+            # envs are done at different steps and reset independently
+            return TransformedEnv(
+                CountingBatchedEnv(max_steps=torch.tensor([3, 5]), batch_size=[2]),
+                Compose(
+                    UnsqueezeTransform(dim, in_keys=["observation"]),
+                    CatFrames(
+                        dim=dim,
+                        N=N,
+                        in_keys=["observation"],
+                        padding=padding,
+                        ring_buffer=ring_buffer,
+                    ),
+                ),
+            )
+
+        rollouts = []
+        for ring_buffer in (False, True):
+            env = make_env(ring_buffer)
+            env.set_seed(0)
+            torch.manual_seed(0)
+            rollouts.append(env.rollout(20, break_when_any_done=False))
+        assert_allclose_td(*rollouts)
+
     def test_transform_inverse(self):
         raise pytest.skip("No inverse for CatFrames")
 
@@ -3286,6 +3315,66 @@ class TestObservationNorm(TransformBase):
             [t_env.observation_spec["pixels"].shape[-3], 1, 1]
         )
 
+    @pytest.mark.parametrize("standard_normal", [True, False])
+    def test_observationnorm_update_stats(self, standard_normal):
+        torch.manual_seed(0)
+        data = torch.randn(100, 3, 4, 4) * torch.arange(1, 4).view(3, 1, 1) + 1
+        t = ObservationNorm(in_keys=["obs"], standard_normal=standard_normal)
+        for chunk in data.split(7):
+            t.update_stats(chunk, reduce_dim=(0, 2, 3), keep_dims=(2, 3))
+        ref = ObservationNorm(
+            loc=data.mean((0, 2, 3), keepdim=True).squeeze(0),
+            scale=data.std((0, 2, 3), keepdim=True).squeeze(0),
+            in_keys=["obs"],
+            standard_normal=True,
+        )
+        td = TensorDict({"obs": data}, [100])
+        torch.testing.assert_close(t(td.clone())["obs"], ref(td.clone())["obs"])
+
+        # the running stats are saved and restored
+        t2 = ObservationNorm(in_keys=["obs"], standard_normal=standard_normal)
+        t2.load_state_dict(t.state_dict())
+        torch.testing.assert_close(t2.loc, t.loc)
+        torch.testing.assert_close(t2.scale, t.scale)
+        t.update_stats(
+            TensorDict({"obs": data[:5]}, [5]), reduce_dim=(0, 2, 3), keep_dims=(2, 3)
+        )
+        t2.update_stats(data[:5], reduce_dim=(0, 2, 3), keep_dims=(2, 3))
+        torch.testing.assert_close(t2.loc, t.loc)
+        torch.testing.assert_close(t2.scale, t.scale)
+
+        # uninitialized transforms can be saved and loaded
+        t3 = ObservationNorm(in_keys=["obs"])
+        assert len(t3.state_dict()) == 1
+        t3.load_state_dict(ObservationNorm(in_keys=["obs"]).state_dict())
+        assert not t3.initialized
+
+    def test_observationnorm_init_stats_collector(self):
+        env = TransformedEnv(
+            ContinuousActionVecMockEnv(), ObservationNorm(in_keys=["observation"])
+        )
+        collector = SyncDataCollector(
+            ContinuousActionVecMockEnv(),
+            None,
+            frames_per_batch=10,
+            total_frames=-1,
+        )
+        env.transform.init_stats(num_iter=30, collector=collector)
+        collector.shutdown()
+        assert env.transform.initialized
+        assert env.transform._stats_count == 30
+        assert env.transform.loc.shape == env.observation_spec["observation"].shape
+
+        env.transform.reset_stats()
+        assert "_stats_count" not in env.transform.state_dict()
+
+        # rollouts of the parent env in bounded chunks
+        env = TransformedEnv(
+            ContinuousActionVecMockEnv(), ObservationNorm(in_keys=["observation"])
+        )
+        env.transform.init_stats(num_iter=30, chunk_size=4)
+        assert env.transform._stats_count >= 30
+
     def test_observationnorm_stats_already_initialized_error(self):
         transform = ObservationNorm(in_keys="next_observation", loc=0, scale=1)
 
@@ -6042,6 +6131,69 @@ class TestVecNorm:
         if not parallel_env.is_closed:
             parallel_env.close()
 
+    def test_vecnorm_slots(self):
+        torch.manual_seed(0)
+        data = [torch.randn(4, 3) * 3 + 1 for _ in range(10)]
+        t0 = VecNorm(in_keys=["observation"], decay=1.0, num_workers=2)
+        t0(TensorDict({"observation": data[0]}, [4]))
+        shared_td = t0._td.share_memory_()
+        t1 = VecNorm(
+            in_keys=["observation"],
+            decay=1.0,
+            num_workers=2,
+            shared_td=shared_td,
+            lock=t0.lock,
+        )
+        for i, obs in enumerate(data[1:]):
+            (t0 if i % 2 else t1)(TensorDict({"observation": obs}, [4]))
+        assert t0._slot != t1._slot
+        assert shared_td["_claimed"].all()
+        # the merged statistics are the ones of the whole dataset
+        data = torch.cat(data)
+        mean, var = t0._merged_stats("observation")
+        torch.testing.assert_close(mean, data.mean(0))
+        torch.testing.assert_close(var, data.var(0, unbiased=False))
+        obs_norm = t1.to_observation_norm()
+        torch.testing.assert_close(obs_norm.loc, data.mean(0))
+        with pytest.raises(RuntimeError, match="statistics slots have been claimed"):
+            VecNorm(
+                in_keys=["observation"],
+                num_workers=2,
+                shared_td=shared_td,
+                lock=t0.lock,
+            )(TensorDict({"observation": data[:4]}, [4]))
+
+    def test_vecnorm_slots_decay(self):
+        torch.manual_seed(0)
+        t = VecNorm(in_keys=["observation"], decay=0.9)
+        t_slots = VecNorm(in_keys=["observation"], decay=0.9, num_workers=1)
+        for _ in range(10):
+            obs = torch.randn(4, 3) * 3 + 1
+            torch.testing.assert_close(
+                t(TensorDict({"observation": obs.clone()}, [4]))["observation"],
+                t_slots(TensorDict({"observation": obs.clone()}, [4]))["observation"],
+            )
+
+    def test_parallelenv_vecnorm_slots(self):
+        # the shadow env of EnvCreator claims a slot too
+        make_env = EnvCreator(
+            lambda: TransformedEnv(
+                ContinuousActionVecMockEnv(), VecNorm(decay=1.0, num_workers=3)
+            )
+        )
+        parallel_env = ParallelEnv(2, make_env)
+        try:
+            td = parallel_env.state_dict()["worker0"]["_extra_state"]["td"]
+            count = td.get("observation_count").sum()
+            tensordict = parallel_env.reset()
+            for _ in range(10):
+                tensordict = parallel_env.rand_step(tensordict)
+            assert td.get("_claimed").all()
+            # 10 steps and one reset per worker
+            assert td.get("observation_count").sum() == count + 22
+        finally:
+            parallel_env.close()
+
     @retry(AssertionError, tries=10, delay=0)
     @pytest.mark.skipif(not _has_gym, reason="no gym library found")
     @pytest.mark.parametrize(
@@ -7,7 +7,6 @@ import abc
 import inspect
 import os
 import queue
-import sys
 import time
 import warnings
 from collections import OrderedDict
@@ -34,18 +33,18 @@ from torchrl._utils import (
     RL_WARNINGS,
     VERBOSE,
 )
-from torchrl.collectors.utils import split_trajectories
+from torchrl.collectors.utils import _CapturedPolicyStep, split_trajectories
 from torchrl.data.tensor_specs import TensorSpec
 from torchrl.data.utils import CloudpickleWrapper, DEVICE_TYPING
 from torchrl.envs.common import EnvBase
 from torchrl.envs.transforms import StepCounter, TransformedEnv
 from torchrl.envs.utils import (
     _convert_exploration_type,
+    _StepMDP,
     ExplorationType,
     set_exploration_type,
-    step_mdp,
 )
-from torchrl.envs.vec_env import _BatchedEnv
+from torchrl.envs.vec_env import _BatchedEnv, ParallelEnv
 
 _TIMEOUT = 1.0
 _MIN_TIMEOUT = 1e-3  # should be several orders of magnitude inferior wrt time spent collecting a trajectory
@@ -53,8 +52,6 @@ _MAX_IDLE_COUNT = int(os.environ.get("MAX_IDLE_COUNT", 1000))
 
 DEFAULT_EXPLORATION_TYPE: ExplorationType = ExplorationType.RANDOM
 
-_is_osx = sys.platform.startswith("darwin")
-
 
 class RandomPolicy:
     """A random policy for data collectors.
@@ -119,6 +116,47 @@ class _InterruptorManager(SyncManager):
 _InterruptorManager.register("_Interruptor", _Interruptor)
 
 
+class _TrajectoryPool:
+    """A counter handing out unique trajectory ids, possibly across processes.
+
+    Multiprocessed collectors share a single pool between their workers, such
+    that the trajectory ids of the collected batches never overlap and do not
+    need to be corrected by the main process.
+
+    Args:
+        lock (bool, optional): if ``True``, the counter is placed in shared
+            memory and protected by a lock, such that it can be sent to
+            other processes. Defaults to ``False``.
+    """
+
+    def __init__(self, lock: bool = False):
+        self._traj_id = torch.zeros((), dtype=torch.int64)
+        if lock:
+            self._traj_id.share_memory_()
+            self._lock = mp.Lock()
+        else:
+            self._lock = None
+
+    def get_traj_and_increment(self, n: int = 1, device=None) -> torch.Tensor:
+        """Returns ``n`` new trajectory ids."""
+        if self._lock is None:
+            traj_id = int(self._traj_id)
+            self._traj_id.fill_(traj_id + n)
+        else:
+            with self._lock:
+                traj_id = int(self._traj_id)
+                self._traj_id.fill_(traj_id + n)
+        return torch.arange(traj_id, traj_id + n, device=device)
+
+    def reset(self) -> None:
+        """Restarts the numbering of the trajectories from 0."""
+        if self._lock is None:
+            self._traj_id.zero_()
+        else:
+            with self._lock:
+                self._traj_id.zero_()
+
+
 def recursive_map_to_cpu(dictionary: OrderedDict) -> OrderedDict:
     """Maps the tensors to CPU through a nested dictionary."""
     return OrderedDict(
@@ -414,9 +452,35 @@ class SyncDataCollector(DataCollectorBase):
             The _Interruptor class has methods ´start_collection´ and ´stop_collection´, which allow to implement
             strategies such as preeptively stopping rollout collection.
             Default is ``False``.
+        traj_pool (_TrajectoryPool, optional): the pool the trajectory ids
+            are drawn from. Multiprocessed collectors share one pool between
+            their workers such that trajectory ids are unique across workers.
+            Defaults to a new pool.
         reset_when_done (bool, optional): if ``True`` (default), an environment
             that return a ``True`` value in its ``"done"`` or ``"truncated"``
             entry will be reset at the corresponding indices.
+        async_batch_size (int, optional): if provided, the environment must be
+            a :class:`~torchrl.envs.ParallelEnv` whose workers are stepped
+            asynchronously: the policy is executed on the first
+            ``async_batch_size`` environments that complete their step (see
+            :meth:`~torchrl.envs.ParallelEnv.step_recv`), and each environment
+            fills its own row of the output tensordict at its own pace.
+            This prevents slow environments from stalling the others at
+            every step. Defaults to ``None`` (synchronous steps).
+        capture_mode (str, optional): if ``"compile"``, the policy call and
+            environment step are executed by a function compiled with
+            :func:`torch.compile`. If ``"cudagraph"``, they are recorded as a
+            CUDA graph (the environment must live on a CUDA device) and
+            replayed at each frame. This is only beneficial for environments
+            that are fully implemented with torch operations (e.g. model-based
+            or vectorized simulators). The first frame is executed eagerly and
+            frames whose tensordict structure differs from it fall back on
+            eager execution. Resets and data writing are always executed
+            eagerly. Defaults to ``None`` (eager execution).
+        capture_kwargs (dict, optional): keyword arguments for
+            :func:`torch.compile` (``capture_mode="compile"``), or the number
+            of ``"warmup"`` iterations before recording a CUDA graph
+            (``capture_mode="cudagraph"``).
 
     Examples:
         >>> from torchrl.envs.libs.gym import GymEnv
@@ -499,6 +563,10 @@ class SyncDataCollector(DataCollectorBase):
         return_same_td: bool = False,
         reset_when_done: bool = True,
         interruptor=None,
+        async_batch_size: Optional[int] = None,
+        capture_mode: Optional[str] = None,
+        capture_kwargs: Optional[Dict[str, Any]] = None,
+        traj_pool: Optional[_TrajectoryPool] = None,
     ):
         self.closed = True
 
@@ -594,9 +662,18 @@ class SyncDataCollector(DataCollectorBase):
             exploration_type if exploration_type else DEFAULT_EXPLORATION_TYPE
         )
         self.return_same_td = return_same_td
-
+        self._step_mdp = _StepMDP()
+        # the first step taken by the collector is fully checked, the next
+        # ones skip the per-step validation. The env may belong to the user:
+        # the previous value is restored on shutdown.
+        self._env_trusted_step = self.env.trusted_step
+        self.env.trusted_step = True
+
+        self._traj_pool = traj_pool if traj_pool is not None else _TrajectoryPool()
         self._tensordict = env.reset()
-        traj_ids = torch.arange(self.n_env, device=env.device).view(self.env.batch_size)
+        traj_ids = self._traj_pool.get_traj_and_increment(
+            self.n_env, device=env.device
+        ).view(self.env.batch_size)
         self._tensordict.set(
             ("collector", "traj_ids"),
             traj_ids,
@@ -683,6 +760,43 @@ class SyncDataCollector(DataCollectorBase):
         self._exclude_private_keys = True
         self.interruptor = interruptor
 
+        if async_batch_size is not None:
+            if not isinstance(self.env, ParallelEnv):
+                raise ValueError(
+                    "async_batch_size can only be used with a ParallelEnv, "
+                    f"got {type(self.env)}. Note that max_frames_per_traj wraps "
+                    "the environment in a TransformedEnv."
+                )
+            if self.env.batch_size != torch.Size([self.n_env]):
+                raise ValueError(
+                    "async_batch_size requires the batch-size of the environment "
+                    f"to match its number of workers, got {self.env.batch_size}."
+                )
+            if not 0 < async_batch_size <= self.n_env:
+                raise ValueError(
+                    f"async_batch_size must be in [1, {self.n_env}], got {async_batch_size}."
+                )
+            # the data of the environments is gathered and written at arbitrary
+            # indices, which lazy stacks do not support
+            self._tensordict = self._tensordict.contiguous()
+        self.async_batch_size = async_batch_size
+        if capture_mode is not None:
+            if async_batch_size is not None:
+                raise ValueError("capture_mode cannot be used with async_batch_size.")
+            if (
+                capture_mode == "cudagraph"
+                and torch.device(self.env.device).type != "cuda"
+            ):
+                raise ValueError(
+                    "capture_mode='cudagraph' requires an environment placed "
+                    f"on a cuda device, got {self.env.device}."
+                )
+            self._captured_step = _CapturedPolicyStep(
+                self.policy, self.env, capture_mode, capture_kwargs
+            )
+        else:
+            self._captured_step = None
+
     # for RPC
     def next(self):
         return super().next()
@@ -765,7 +879,7 @@ class SyncDataCollector(DataCollectorBase):
         truncated = self._tensordict.get(("next", "truncated"), None)
         traj_ids = self._tensordict.get(("collector", "traj_ids"))
 
-        self._tensordict = step_mdp(self._tensordict)
+        self._tensordict = self._step_mdp(self._tensordict)
 
         if not self.reset_when_done:
             return
@@ -796,9 +910,10 @@ class SyncDataCollector(DataCollectorBase):
                 raise RuntimeError(
                     f"Env {self.env} was done after reset on specified '_reset' dimensions. This is (currently) not allowed."
                 )
-            traj_ids[traj_done_or_terminated] = traj_ids.max() + torch.arange(
-                1, traj_done_or_terminated.sum() + 1, device=traj_ids.device
+            new_traj_ids = self._traj_pool.get_traj_and_increment(
+                traj_done_or_terminated.sum().item(), device=traj_ids.device
             )
+            traj_ids[traj_done_or_terminated] = new_traj_ids
             self._tensordict.set_(
                 ("collector", "traj_ids"), traj_ids
             )  # no ops if they already match
@@ -817,10 +932,16 @@ class SyncDataCollector(DataCollectorBase):
         # self._tensordict.fill_(("collector", "step_count"), 0)
         self._tensordict_out.fill_(("collector", "traj_ids"), -1)
 
+        if self.async_batch_size is not None:
+            with set_exploration_type(self.exploration_type):
+                return self._rollout_async()
+
         with set_exploration_type(self.exploration_type):
             for j in range(self.frames_per_batch):
                 if self._frames < self.init_random_frames:
                     self.env.rand_step(self._tensordict)
+                elif self._captured_step is not None:
+                    self._captured_step(self._tensordict)
                 else:
                     self.policy(self._tensordict)
                     self.env.step(self._tensordict)
@@ -848,6 +969,80 @@ class SyncDataCollector(DataCollectorBase):
 
         return self._tensordict_out
 
+    def _act_and_send(self, tensordict: TensorDictBase, env_ids=None) -> None:
+        if self._frames < self.init_random_frames:
+            action = self.env.action_spec.rand()
+            if env_ids is not None:
+                action = action[env_ids]
+            tensordict.set("action", action)
+        else:
+            self.policy(tensordict)
+        self.env.step_send(tensordict, env_ids)
+
+    def _rollout_async(self) -> TensorDictBase:
+        # each env writes its frames in its own row of the output tensordict
+        row_cursor = torch.zeros(
+            self.n_env, dtype=torch.long, device=self._tensordict_out.device
+        )
+        self._act_and_send(self._tensordict)
+        pending = self.n_env
+        while pending:
+            out, env_ids = self.env.step_recv(min(self.async_batch_size, pending))
+            pending -= len(env_ids)
+            tensordict = self._tensordict[env_ids]
+            tensordict.update(out)
+            out_ids = env_ids.to(row_cursor.device)
+            self._tensordict_out[out_ids, row_cursor[out_ids]] = tensordict
+            row_cursor[out_ids] += 1
+
+            tensordict = self._step_and_maybe_reset_async(tensordict, env_ids)
+            self._tensordict[env_ids] = tensordict
+
+            # envs whose row is complete stay idle until the next rollout
+            active = row_cursor[out_ids] < self.frames_per_batch
+            if self.interruptor is not None and self.interruptor.collection_stopped():
+                active.zero_()
+            if active.any():
+                active = active.to(env_ids.device)
+                tensordict = tensordict[active]
+                env_ids = env_ids[active]
+                self._act_and_send(tensordict, env_ids)
+                self._tensordict[env_ids] = tensordict
+                pending += len(env_ids)
+        return self._tensordict_out
+
+    def _step_and_maybe_reset_async(
+        self, tensordict: TensorDictBase, env_ids: torch.Tensor
+    ) -> TensorDictBase:
+        done = tensordict.get(("next", "done"))
+        truncated = tensordict.get(("next", "truncated"), None)
+        tensordict = self._step_mdp(tensordict)
+        if not self.reset_when_done:
+            return tensordict
+        done_or_terminated = (done | truncated) if truncated is not None else done
+        traj_done_or_terminated = done_or_terminated.reshape(len(env_ids), -1).any(-1)
+        if traj_done_or_terminated.any():
+            # only the idle workers that are done are reset
+            _reset = torch.zeros(
+                self.env.done_spec.shape, dtype=torch.bool, device=self.env.device
+            )
+            _reset[env_ids[traj_done_or_terminated]] = True
+            td_reset = self.env.reset(
+                TensorDict(
+                    {"_reset": _reset}, self.env.batch_size, device=self.env.device
+                )
+            )
+            tensordict.get_sub_tensordict(traj_done_or_terminated).update(
+                td_reset[env_ids[traj_done_or_terminated]], inplace=True
+            )
+            traj_ids = tensordict.get(("collector", "traj_ids")).clone()
+            new_traj_ids = self._traj_pool.get_traj_and_increment(
+                traj_done_or_terminated.sum().item(), device=traj_ids.device
+            )
+            traj_ids[traj_done_or_terminated] = new_traj_ids
+            tensordict.set_(("collector", "traj_ids"), traj_ids)
+        return tensordict
+
     def reset(self, index=None, **kwargs) -> None:
         """Resets the environments to a new initial state."""
         # metadata
@@ -869,7 +1064,18 @@ class SyncDataCollector(DataCollectorBase):
             self._tensordict.zero_()
 
         self._tensordict.update(self.env.reset(**kwargs))
-        md["traj_ids"] = md["traj_ids"] - md["traj_ids"].min()
+        # the environments that have been reset start new trajectories
+        traj_ids = md.get("traj_ids")
+        if index is None:
+            traj_ids.copy_(
+                self._traj_pool.get_traj_and_increment(
+                    traj_ids.numel(), device=traj_ids.device
+                ).view_as(traj_ids)
+            )
+        else:
+            traj_ids[index] = self._traj_pool.get_traj_and_increment(
+                traj_ids[index].numel(), device=traj_ids.device
+            ).view_as(traj_ids[index])
         self._tensordict["collector"] = md
 
     def shutdown(self) -> None:
@@ -877,6 +1083,7 @@ class SyncDataCollector(DataCollectorBase):
         if not self.closed:
             self.closed = True
             del self._tensordict, self._tensordict_out
+            self.env.trusted_step = self._env_trusted_step
             if not self.env.is_closed:
                 self.env.close()
             del self.env
@@ -1019,6 +1226,10 @@ class _MultiDataCollector(DataCollectorBase):
             updated. This feature should be used cautiously: if the same
             tensordict is added to a replay buffer for instance,
             the whole content of the buffer will be identical.
+            The workers of a :class:`MultiSyncDataCollector` write their data
+            directly in this tensordict, which is otherwise cloned once per
+            batch. :class:`MultiaSyncDataCollector` always returns a copy, as its
+            workers keep collecting data in the meantime.
             Default is ``False``.
         reset_when_done (bool, optional): if ``True`` (default), an environment
             that return a ``True`` value in its ``"done"`` or ``"truncated"``
@@ -1052,6 +1263,7 @@ class _MultiDataCollector(DataCollectorBase):
         split_trajs: Optional[bool] = None,
         exploration_type: ExplorationType = DEFAULT_EXPLORATION_TYPE,
         exploration_mode=None,
+        return_same_td: bool = False,
         reset_when_done: bool = True,
         preemptive_threshold: float = None,
         update_at_each_batch: bool = False,
@@ -1200,12 +1412,11 @@ class _MultiDataCollector(DataCollectorBase):
         self.init_random_frames = init_random_frames
         self.update_at_each_batch = update_at_each_batch
         self.exploration_type = exploration_type
+        self.return_same_td = return_same_td
         self.frames_per_worker = np.inf
+        # trajectory ids are drawn from a pool shared by all the workers
+        self._traj_pool = _TrajectoryPool(lock=True)
         if preemptive_threshold is not None:
-            if _is_osx:
-                raise NotImplementedError(
-                    "Cannot use preemption on OSX due to Queue.qsize() not being implemented on this platform."
-                )
             self.preemptive_threshold = np.clip(preemptive_threshold, 0.0, 1.0)
             manager = _InterruptorManager()
             manager.start()
@@ -1266,6 +1477,7 @@ class _MultiDataCollector(DataCollectorBase):
                 "reset_when_done": self.reset_when_done,
                 "idx": i,
                 "interruptor": self.interruptor,
+                "traj_pool": self._traj_pool,
             }
             proc = mp.Process(target=_main_async_collector, kwargs=kwargs)
             # proc.daemon can't be set as daemonic processes may be launched by the process itself
@@ -1374,6 +1586,8 @@ also that the state dict is synchronised across processes if needed."""
 
         if reset_idx is None:
             reset_idx = [True for _ in range(self.num_workers)]
+            # all the trajectories start anew
+            self._traj_pool.reset()
         for idx in range(self.num_workers):
             if reset_idx[idx]:
                 self.pipes[idx].send((None, "reset"))
@@ -1578,40 +1792,26 @@ class MultiSyncDataCollector(_MultiDataCollector):
                 self.pipes[idx].send((None, msg))
 
             i += 1
-            max_traj_idx = None
 
+            # the queue blocks until a worker has filled its part of the batch
+            received = 0
             if self.interruptor is not None and self.preemptive_threshold < 1.0:
                 self.interruptor.start_collection()
-                while self.queue_out.qsize() < int(
-                    self.num_workers * self.preemptive_threshold
-                ):
-                    continue
+                for _ in range(int(self.num_workers * self.preemptive_threshold)):
+                    self._wait_for_worker(out_tensordicts_shared)
+                    received += 1
                 self.interruptor.stop_collection()
-                # Now wait for stragglers to return
-                while self.queue_out.qsize() < int(self.num_workers):
-                    continue
+            # Now wait for stragglers to return
+            for _ in range(received, self.num_workers):
+                self._wait_for_worker(out_tensordicts_shared)
 
-            for _ in range(self.num_workers):
-                new_data, j = self.queue_out.get()
-                if j == 0:
-                    data, idx = new_data
-                    out_tensordicts_shared[idx] = data
-                else:
-                    idx = new_data
+            for idx in range(self.num_workers):
                 workers_frames[idx] = (
                     workers_frames[idx] + out_tensordicts_shared[idx].numel()
                 )
-
                 if workers_frames[idx] >= self.total_frames:
                     dones[idx] = True
-            # we have to correct the traj_ids to make sure that they don't overlap
-            for idx in range(self.num_workers):
-                traj_ids = out_tensordicts_shared[idx].get(("collector", "traj_ids"))
-                if max_traj_idx is not None:
-                    traj_ids[traj_ids != -1] += max_traj_idx
-                    # out_tensordicts_shared[idx].set("traj_ids", traj_ids)
-                max_traj_idx = traj_ids.max().item() + 1
-                # out = out_tensordicts_shared[idx]
+
             if same_device is None:
                 prev_device = None
                 same_device = True
@@ -1621,11 +1821,13 @@ class MultiSyncDataCollector(_MultiDataCollector):
                     else:
                         same_device = same_device and (item.device == prev_device)
 
-            if same_device:
-                out_buffer = torch.cat(
-                    list(out_tensordicts_shared.values()), 0, out=out_buffer
-                )
-            else:
+            if out_buffer is None and same_device:
+                # the first batches are gathered in a shared buffer in which
+                # the workers will write the next batches directly
+                out_buffer = torch.cat(list(out_tensordicts_shared.values()), 0)
+                out_buffer.share_memory_()
+                self._set_workers_buffer(out_buffer, out_tensordicts_shared)
+            elif not same_device:
                 out_buffer = torch.cat(
                     [item.cpu() for item in out_tensordicts_shared.values()],
                     0,
@@ -1636,7 +1838,7 @@ class MultiSyncDataCollector(_MultiDataCollector):
                 out = split_trajectories(out_buffer, prefix="collector")
                 frames += out.get(("collector", "mask")).sum().item()
             else:
-                out = out_buffer.clone()
+                out = out_buffer if self.return_same_td else out_buffer.clone()
                 frames += prod(out.shape)
             if self.postprocs:
                 self.postprocs = self.postprocs.to(out.device)
@@ -1652,6 +1854,27 @@ class MultiSyncDataCollector(_MultiDataCollector):
         # We shall not call shutdown just yet as user may want to retrieve state_dict
         # self._shutdown_main()
 
+    def _wait_for_worker(self, out_tensordicts_shared) -> int:
+        new_data, j = self.queue_out.get()
+        if j == 0:
+            data, idx = new_data
+            out_tensordicts_shared[idx] = data
+        else:
+            idx = new_data
+        return idx
+
+    def _set_workers_buffer(self, out_buffer, out_tensordicts_shared) -> None:
+        start = 0
+        for idx in range(self.num_workers):
+            stop = start + out_tensordicts_shared[idx].shape[0]
+            out_tensordicts_shared[idx] = out_buffer[start:stop]
+            self.pipes[idx].send((out_tensordicts_shared[idx], "set_buffer"))
+            start = stop
+        for idx in range(self.num_workers):
+            _, msg = self.pipes[idx].recv()
+            if msg != "buffer_set":
+                raise RuntimeError(f"Expected msg='buffer_set', got {msg}")
+
 
 @accept_remote_rref_udf_invocation
 class MultiaSyncDataCollector(_MultiDataCollector):
@@ -1997,6 +2220,7 @@ def _main_async_collector(
     reset_when_done: bool = True,
     verbose: bool = VERBOSE,
     interruptor=None,
+    traj_pool: Optional[_TrajectoryPool] = None,
 ) -> None:
     pipe_parent.close()
     # init variables that will be cleared when closing
@@ -2027,6 +2251,7 @@ def _main_async_collector(
         reset_when_done=reset_when_done,
         return_same_td=True,
         interruptor=interruptor,
+        traj_pool=traj_pool,
     )
     if verbose:
         print("Sync data collector created")
@@ -2115,6 +2340,14 @@ def _main_async_collector(
                 has_timed_out = True
                 continue
 
+        elif msg == "set_buffer":
+            # the next batches are written directly in the slice of the
+            # buffer that main has allocated for this worker
+            tensordict = inner_collector._tensordict_out = data_in
+            pipe_child.send((j, "buffer_set"))
+            has_timed_out = False
+            continue
+
         elif msg == "update":
             inner_collector.update_policy_weights_()
             pipe_child.send((j, "updated"))
@@ -0,0 +1,84 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+r"""Point-to-point control channel for torch.distributed collectors."""
+import torch
+
+from torchrl.collectors.distributed.weight_sync import _new_process_group
+
+# trainer -> worker commands
+CONTINUE = 0
+UPDATE_WEIGHTS = 1
+SEED = 2
+SHUTDOWN = 3
+# worker -> trainer replies
+DONE = 4
+UPDATED = 5
+SEEDED = 6
+DOWN = 7
+
+
+def _new_control_group():
+    # control messages are small CPU tensors and replies are received from
+    # any source, which only gloo supports
+    return _new_process_group("gloo")
+
+
+class _ControlChannel:
+    """Exchanges ``(opcode, arg)`` messages between the trainer and the workers.
+
+    Each message is a 2-element int64 tensor sent with ``isend`` over a
+    dedicated gloo group. Receiving blocks inside ``torch.distributed.recv``,
+    so neither side spins while waiting. Messages received while waiting
+    for another opcode are kept until they are expected.
+
+    Args:
+        group (ProcessGroup): the control group, spanning every rank.
+    """
+
+    def __init__(self, group):
+        self._group = group
+        self._sends = []
+        self._pending = []
+
+    def send(self, ranks, opcode: int, arg: int = 0):
+        """Posts a command to a batch of ranks without waiting for delivery."""
+        self._sends = [
+            (work, msg) for (work, msg) in self._sends if not work.is_completed()
+        ]
+        for rank in ranks:
+            msg = torch.tensor([opcode, arg], dtype=torch.int64)
+            work = torch.distributed.isend(msg, dst=rank, group=self._group)
+            self._sends.append((work, msg))
+
+    def recv(self, src=None):
+        """Blocks until a message arrives and returns ``(rank, opcode, arg)``."""
+        msg = torch.empty(2, dtype=torch.int64)
+        rank = torch.distributed.recv(msg, src=src, group=self._group)
+        return rank, int(msg[0]), int(msg[1])
+
+    def expect(self, opcode: int, src=None):
+        """Blocks until ``opcode`` is received and returns ``(rank, arg)``.
+
+        Args:
+            opcode (int): the expected opcode.
+            src (int, optional): the sender rank. If ``None``, the first
+                matching message sent by any rank is returned.
+        """
+        for i, (rank, _opcode, arg) in enumerate(self._pending):
+            if _opcode == opcode and (src is None or rank == src):
+                del self._pending[i]
+                return rank, arg
+        while True:
+            rank, _opcode, arg = self.recv(src)
+            if _opcode == opcode:
+                return rank, arg
+            self._pending.append((rank, _opcode, arg))
+
+    def flush(self):
+        """Waits until every posted message has been delivered."""
+        for work, _ in self._sends:
+            work.wait()
+        self._sends = []
@@ -24,11 +24,28 @@ from torchrl.collectors.collectors import (
     MultiSyncDataCollector,
     SyncDataCollector,
 )
+from torchrl.collectors.distributed.control import (
+    _ControlChannel,
+    _new_control_group,
+    CONTINUE,
+    DONE,
+    DOWN,
+    SEED,
+    SEEDED,
+    SHUTDOWN,
+    UPDATE_WEIGHTS,
+    UPDATED,
+)
 from torchrl.collectors.distributed.default_configs import (
     DEFAULT_SLURM_CONF,
     MAX_TIME_TO_CONNECT,
     TCP_PORT,
 )
+from torchrl.collectors.distributed.weight_sync import (
+    _new_process_group,
+    _WeightBroadcaster,
+    _WeightSubscriber,
+)
 from torchrl.collectors.utils import split_trajectories
 from torchrl.data.utils import CloudpickleWrapper
 from torchrl.envs import EnvBase, EnvCreator
@@ -63,16 +80,7 @@ def _node_init_dist(rank, world_size, backend, rank0_ip, tcpport, verbose):
         init_method=f"tcp://{rank0_ip}:{tcpport}",
     )
     if verbose:
-        print(f"Connected!\nNode with rank {rank} -- creating store")
-    # The store carries instructions for the node
-    _store = torch.distributed.TCPStore(
-        host_name=rank0_ip,
-        port=tcpport + 1,
-        world_size=world_size,
-        is_master=False,
-        timeout=timedelta(10),
-    )
-    return _store
+        print(f"Connected!\nNode with rank {rank}")
 
 
 def _distributed_init_delayed(
@@ -87,7 +95,7 @@ def _distributed_init_delayed(
 
     This function will wait for the main worker to send the launch command.
     """
-    _store = _node_init_dist(rank, world_size, backend, rank0_ip, tcpport, verbose)
+    _node_init_dist(rank, world_size, backend, rank0_ip, tcpport, verbose)
     # wait...
     objects = [
         None,
@@ -102,8 +110,9 @@ def _distributed_init_delayed(
     policy = output["policy"]
     frames_per_batch = output["frames_per_batch"]
     collector_kwargs = output["collector_kwargs"]
+    weight_sync = output["weight_sync"]
+    weight_sync_dtype = output["weight_sync_dtype"]
     _run_collector(
-        _store,
         sync,
         collector_class,
         num_workers,
@@ -112,6 +121,9 @@ def _distributed_init_delayed(
         frames_per_batch,
         collector_kwargs,
         verbose=verbose,
+        backend=backend,
+        weight_sync=weight_sync,
+        weight_sync_dtype=weight_sync_dtype,
     )
 
 
@@ -129,10 +141,11 @@ def _distributed_init_collection_node(
     frames_per_batch,
     collector_kwargs,
     verbose=True,
+    weight_sync="p2p",
+    weight_sync_dtype=None,
 ):
-    _store = _node_init_dist(rank, world_size, backend, rank0_ip, tcpport, verbose)
+    _node_init_dist(rank, world_size, backend, rank0_ip, tcpport, verbose)
     _run_collector(
-        _store,
         sync,
         collector_class,
         num_workers,
@@ -141,11 +154,13 @@ def _distributed_init_collection_node(
         frames_per_batch,
         collector_kwargs,
         verbose=verbose,
+        backend=backend,
+        weight_sync=weight_sync,
+        weight_sync_dtype=weight_sync_dtype,
     )
 
 
 def _run_collector(
-    _store,
     sync,
     collector_class,
     num_workers,
@@ -154,8 +169,14 @@ def _run_collector(
     frames_per_batch,
     collector_kwargs,
     verbose=True,
+    backend="gloo",
+    weight_sync="p2p",
+    weight_sync_dtype=None,
 ):
     rank = torch.distributed.get_rank()
+    # the groups must be created in the same order as on the trainer
+    control = _ControlChannel(_new_control_group())
+    weight_group = _new_process_group(backend) if weight_sync == "broadcast" else None
     if verbose:
         print(f"node with rank {rank} -- creating collector of type {collector_class}")
     if not issubclass(collector_class, SyncDataCollector):
@@ -189,16 +210,26 @@ def _run_collector(
         split_trajs=False,
         **collector_kwargs,
     )
+    if weight_sync == "broadcast":
+        weight_subscriber = _WeightSubscriber(
+            policy_weights, weight_group, backend, dtype=weight_sync_dtype
+        )
+    else:
+        weight_subscriber = None
     total_frames = 0
     if verbose:
         print(f"node with rank {rank} -- loop")
     while True:
-        instruction = _store.get(f"NODE_{rank}_in")
+        # blocks until the trainer sends a command
+        _, instruction, arg = control.recv(src=0)
         if verbose:
             print(f"node with rank {rank} -- new instruction: {instruction}")
-        _store.delete_key(f"NODE_{rank}_in")
-        if instruction == b"continue":
-            _store.set(f"NODE_{rank}_status", b"busy")
+        if instruction == CONTINUE:
+            # the argument of CONTINUE is the latest published weights version
+            if weight_subscriber is not None and weight_subscriber.pull(arg):
+                # weights are loaded in place, the sub-collectors may need
+                # to be updated too
+                collector.update_policy_weights_(policy_weights)
             if verbose:
                 print(f"node with rank {rank} -- new data")
             data = collector.next()
@@ -206,22 +237,23 @@ def _run_collector(
             if verbose:
                 print(f"got data, total frames = {total_frames}")
                 print(f"node with rank {rank} -- sending {data}")
-            if _store.get("TRAINER_status") == b"alive":
-                data.isend(dst=0)
+            data.isend(dst=0)
+            if not sync:
                 if verbose:
-                    print(f"node with rank {rank} -- setting to 'done'")
-                if not sync:
-                    _store.set(f"NODE_{rank}_status", b"done")
-        elif instruction == b"shutdown":
+                    print(f"node with rank {rank} -- sending 'done'")
+                control.send([0], DONE)
+        elif instruction == SHUTDOWN:
             if verbose:
                 print(f"node with rank {rank} -- shutting down")
+            if weight_subscriber is not None:
+                weight_subscriber.drain(arg)
             try:
                 collector.shutdown()
             except Exception:
                 pass
-            _store.set(f"NODE_{rank}_out", b"down")
+            control.send([0], DOWN)
             break
-        elif instruction == b"update_weights":
+        elif instruction == UPDATE_WEIGHTS:
             if sync:
                 policy_weights.recv(0)
             else:
@@ -230,14 +262,13 @@ def _run_collector(
                 policy_weights.irecv(0)
             # the policy has been updated: we can simply update the weights
             collector.update_policy_weights_(policy_weights)
-            _store.set(f"NODE_{rank}_out", b"updated")
-        elif instruction.startswith(b"seeding"):
-            seed = int(instruction.split(b"seeding_"))
-            new_seed = collector.set_seed(seed)
-            _store.set(f"NODE_{rank}_out", b"seeded")
-            _store.set(f"NODE_{rank}_seed", str(new_seed).encode("utf-8"))
+            control.send([0], UPDATED)
+        elif instruction == SEED:
+            new_seed = collector.set_seed(arg)
+            control.send([0], SEEDED, new_seed)
         else:
             raise RuntimeError(f"Instruction {instruction} is not recognised")
+    control.flush()
     if not collector.closed:
         collector.shutdown()
     del collector
@@ -354,6 +385,19 @@ class DistributedDataCollector(DataCollectorBase):
             to learn more.
             Defaults to ``"submitit"``.
         tcp_port (int, optional): the TCP port to be used. Defaults to 10003.
+        weight_sync (str, optional): how policy weights are sent to the workers.
+            With ``"p2p"`` (default), the weights are sent to each worker in
+            turn and the trainer waits for every worker to acknowledge the
+            update. With ``"broadcast"``, each call to
+            :meth:`~.update_policy_weights_` publishes a new version of the
+            weights through a single asynchronous collective broadcast and
+            returns immediately. Workers pull the latest version lazily,
+            before collecting their next batch. In this mode, every update
+            targets all the workers, even if a ``worker_rank`` is passed.
+        weight_sync_dtype (torch.dtype, optional): if provided with
+            ``weight_sync="broadcast"``, floating-point weights are cast to this
+            dtype (e.g. ``torch.float16``) for transport and cast back when
+            loaded on the workers. Defaults to ``None`` (no cast).
     """
 
     _VERBOSE = VERBOSE  # for debugging
@@ -384,6 +428,8 @@ class DistributedDataCollector(DataCollectorBase):
         max_weight_update_interval=-1,
         launcher="submitit",
         tcp_port=None,
+        weight_sync="p2p",
+        weight_sync_dtype=None,
     ):
         exploration_type = _convert_exploration_type(
             exploration_mode=exploration_mode, exploration_type=exploration_type
@@ -417,6 +463,16 @@ class DistributedDataCollector(DataCollectorBase):
                 "`max_weight_update_interval` are incompatible."
             )
         self.launcher = launcher
+        if weight_sync not in ("p2p", "broadcast"):
+            raise ValueError(
+                f"weight_sync must be one of 'p2p' or 'broadcast', got {weight_sync}."
+            )
+        if weight_sync_dtype is not None and weight_sync != "broadcast":
+            raise ValueError(
+                "weight_sync_dtype can only be used with weight_sync='broadcast'."
+            )
+        self.weight_sync = weight_sync
+        self.weight_sync_dtype = weight_sync_dtype
         self._batches_since_weight_update = [0 for _ in range(self.num_workers)]
         if tcp_port is None:
             self.tcp_port = os.environ.get("TCP_PORT", TCP_PORT)
@@ -498,17 +554,7 @@ class DistributedDataCollector(DataCollectorBase):
             init_method=f"tcp://{self.IPAddr}:{TCP_PORT}",
         )
         if self._VERBOSE:
-            print("main initiated! Launching store...", end="\t")
-        self._store = torch.distributed.TCPStore(
-            host_name=self.IPAddr,
-            port=int(TCP_PORT) + 1,
-            world_size=self.num_workers + 1,
-            is_master=True,
-            timeout=timedelta(10),
-        )
-        if self._VERBOSE:
-            print("done. Setting status to 'alive'")
-        self._store.set("TRAINER_status", b"alive")
+            print("main initiated!")
 
     def _make_container(self):
         if self._VERBOSE:
@@ -579,6 +625,8 @@ class DistributedDataCollector(DataCollectorBase):
             self._frames_per_batch_corrected,
             self.collector_kwargs[i],
             self._VERBOSE,
+            self.weight_sync,
+            self.weight_sync_dtype,
         )
         return job
 
@@ -599,6 +647,8 @@ class DistributedDataCollector(DataCollectorBase):
                 "policy": self.policy,
                 "frames_per_batch": self._frames_per_batch_corrected,
                 "collector_kwargs": self.collector_kwargs[i],
+                "weight_sync": self.weight_sync,
+                "weight_sync_dtype": self.weight_sync_dtype,
             }
             for i in range(self.num_workers)
         ]
@@ -626,6 +676,8 @@ class DistributedDataCollector(DataCollectorBase):
                 self._frames_per_batch_corrected,
                 self.collector_kwargs[i],
                 self._VERBOSE,
+                self.weight_sync,
+                self.weight_sync_dtype,
             ),
         )
         job.start()
@@ -671,6 +723,18 @@ class DistributedDataCollector(DataCollectorBase):
                         print("job launched")
                 self.jobs.append(job)
             self._init_master_dist(self.num_workers + 1, self.backend)
+        # the groups must be created in the same order as on the workers
+        self._control = _ControlChannel(_new_control_group())
+        self._workers_shutdown = False
+        if self.weight_sync == "broadcast":
+            self._weight_broadcaster = _WeightBroadcaster(
+                self.policy_weights,
+                _new_process_group(self.backend),
+                self.backend,
+                dtype=self.weight_sync_dtype,
+            )
+        else:
+            self._weight_broadcaster = None
 
     def iterator(self):
         yield from self._iterator_dist()
@@ -681,10 +745,9 @@ class DistributedDataCollector(DataCollectorBase):
 
         total_frames = 0
         if not self._sync:
-            for rank in range(1, self.num_workers + 1):
-                if self._VERBOSE:
-                    print(f"sending 'continue' to {rank}")
-                self._store.set(f"NODE_{rank}_in", b"continue")
+            if self._VERBOSE:
+                print("sending 'continue' to all workers")
+            self._send_continue(range(1, self.num_workers + 1))
             trackers = []
             for i in range(self.num_workers):
                 rank = i + 1
@@ -713,9 +776,16 @@ class DistributedDataCollector(DataCollectorBase):
                     ):
                         self.update_policy_weights_(rank)
 
-        for i in range(self.num_workers):
-            rank = i + 1
-            self._store.set(f"NODE_{rank}_in", b"shutdown")
+        self._shutdown_workers()
+
+    def _weights_version(self):
+        if self._weight_broadcaster is None:
+            return 0
+        return self._weight_broadcaster.version
+
+    def _send_continue(self, ranks):
+        # the workers pull the broadcast weights up to this version first
+        self._control.send(ranks, CONTINUE, self._weights_version())
 
     def _next_sync(self, total_frames):
         # in the 'sync' case we should update before collecting the data
@@ -726,10 +796,9 @@ class DistributedDataCollector(DataCollectorBase):
                 self._batches_since_weight_update[j] += 1
 
         if total_frames < self.total_frames:
-            for rank in range(1, self.num_workers + 1):
-                if self._VERBOSE:
-                    print(f"sending 'continue' to {rank}")
-                self._store.set(f"NODE_{rank}_in", b"continue")
+            if self._VERBOSE:
+                print("sending 'continue' to all workers")
+            self._send_continue(range(1, self.num_workers + 1))
         trackers = []
         for i in range(self.num_workers):
             rank = i + 1
@@ -749,27 +818,22 @@ class DistributedDataCollector(DataCollectorBase):
         return data, total_frames
 
     def _next_async(self, total_frames, trackers):
-        data = None
-        while data is None:
-            for i in range(self.num_workers):
-                rank = i + 1
-                if self._store.get(f"NODE_{rank}_status") == b"done":
-                    for _tracker in trackers[i]:
-                        _tracker.wait()
-                    data = self._tensordict_out[i].clone()
-                    if self.update_after_each_batch:
-                        self.update_policy_weights_(rank)
-                    total_frames += data.numel()
-                    if total_frames < self.total_frames:
-                        if self._VERBOSE:
-                            print(f"sending 'continue' to {rank}")
-                        self._store.set(f"NODE_{rank}_in", b"continue")
-                    trackers[i] = self._tensordict_out[i].irecv(
-                        src=i + 1, return_premature=True
-                    )
-                    for j in range(self.num_workers):
-                        self._batches_since_weight_update[j] += j != i
-                    break
+        # blocks until the first worker reports that its batch has been sent
+        rank, _ = self._control.expect(DONE)
+        i = rank - 1
+        for _tracker in trackers[i]:
+            _tracker.wait()
+        data = self._tensordict_out[i].clone()
+        if self.update_after_each_batch:
+            self.update_policy_weights_(rank)
+        total_frames += data.numel()
+        if total_frames < self.total_frames:
+            if self._VERBOSE:
+                print(f"sending 'continue' to {rank}")
+            self._send_continue([rank])
+        trackers[i] = self._tensordict_out[i].irecv(src=rank, return_premature=True)
+        for j in range(self.num_workers):
+            self._batches_since_weight_update[j] += j != i
         return data, total_frames
 
     def update_policy_weights_(self, worker_rank=None) -> None:
@@ -777,37 +841,37 @@ class DistributedDataCollector(DataCollectorBase):
 
         Args:
             worker_rank (int, optional): if provided, only this worker weights
-                will be updated.
+                will be updated. Ignored with ``weight_sync="broadcast"``,
+                where all workers receive the new weights.
         """
         if worker_rank is not None and worker_rank < 1:
             raise RuntimeError("worker_rank must be greater than 1")
-        workers = range(self.num_workers) if worker_rank is None else [worker_rank - 1]
-        for i in workers:
-            rank = i + 1
+        if self._weight_broadcaster is not None:
+            version = self._weight_broadcaster.publish()
             if self._VERBOSE:
-                print(f"updating weights of {rank}")
-            self._store.set(f"NODE_{rank}_in", b"update_weights")
-            if self._sync:
-                self.policy_weights.send(rank)
-            else:
-                self.policy_weights.isend(rank)
-            self._batches_since_weight_update[i] = 0
-            status = self._store.get(f"NODE_{rank}_out")
-            if status != b"updated":
-                raise RuntimeError(f"Expected 'updated' but got status {status}.")
-            self._store.delete_key(f"NODE_{rank}_out")
+                print(f"published weights version {version}")
+            self._batches_since_weight_update = [0 for _ in range(self.num_workers)]
+            return
+        if worker_rank is None:
+            ranks = range(1, self.num_workers + 1)
+        else:
+            ranks = [worker_rank]
+        if self._VERBOSE:
+            print(f"updating weights of {list(ranks)}")
+        # the command and the weights are posted to all ranks before waiting
+        # for any acknowledgement
+        self._control.send(ranks, UPDATE_WEIGHTS)
+        for rank in ranks:
+            self.policy_weights.isend(rank)
+        for rank in ranks:
+            self._control.expect(UPDATED, src=rank)
+            self._batches_since_weight_update[rank - 1] = 0
 
     def set_seed(self, seed: int, static_seed: bool = False) -> int:
         for i in range(self.num_workers):
             rank = i + 1
-            self._store.set(f"NODE_{rank}_in", f"seeding_{seed}".encode("utf-8"))
-            status = self._store.get(f"NODE_{rank}_out")
-            if status != b"updated":
-                raise RuntimeError(f"Expected 'seeded' but got status {status}.")
-            self._store.delete_key(f"NODE_{rank}_out")
-            new_seed = self._store.get(f"NODE_{rank}_seed")
-            self._store.delete_key(f"NODE_{rank}_seed")
-            seed = int(new_seed)
+            self._control.send([rank], SEED, seed)
+            _, seed = self._control.expect(SEEDED, src=rank)
         return seed
 
     def state_dict(self) -> OrderedDict:
@@ -816,21 +880,27 @@ class DistributedDataCollector(DataCollectorBase):
     def load_state_dict(self, state_dict: OrderedDict) -> None:
         raise NotImplementedError
 
-    def shutdown(self):
-        self._store.set("TRAINER_status", b"shutdown")
-        for i in range(self.num_workers):
-            rank = i + 1
-            if self._VERBOSE:
-                print(f"shutting down node with rank={rank}")
-            self._store.set(f"NODE_{rank}_in", b"shutdown")
-        for i in range(self.num_workers):
-            rank = i + 1
+    def _shutdown_workers(self):
+        if self._workers_shutdown:
+            return
+        if self._VERBOSE:
+            print("shutting down all nodes")
+        ranks = range(1, self.num_workers + 1)
+        self._control.send(ranks, SHUTDOWN, self._weights_version())
+        for rank in ranks:
             if self._VERBOSE:
-                print(f"getting status of node {rank}", end="\t")
-            status = self._store.get(f"NODE_{rank}_out")
-            if status != b"down":
-                raise RuntimeError(f"Expected 'down' but got status {status}.")
-            self._store.delete_key(f"NODE_{rank}_out")
+                print(f"getting status of node {rank}")
+            # replies sent before the shutdown (e.g. 'done' by a worker whose
+            # batch is not needed anymore) are skipped
+            self._control.expect(DOWN, src=rank)
+        self._control.flush()
+        if self._weight_broadcaster is not None:
+            # the workers have joined every broadcast before shutting down
+            self._weight_broadcaster.wait()
+        self._workers_shutdown = True
+
+    def shutdown(self):
+        self._shutdown_workers()
         for i in range(self.num_workers):
             if self.launcher == "mp":
                 if not self.jobs[i].is_alive():
@@ -0,0 +1,154 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+r"""Versioned policy weight broadcasting for torch.distributed collectors."""
+from datetime import timedelta
+
+import torch
+from tensordict.tensordict import TensorDictBase
+
+from torchrl.collectors.distributed.default_configs import MAX_TIME_TO_CONNECT
+
+
+def _transport_device(backend):
+    if backend == "nccl":
+        return torch.device("cuda", torch.cuda.current_device())
+    return torch.device("cpu")
+
+
+def _new_process_group(backend):
+    # must be called by every rank of the default group, in the same order
+    return torch.distributed.new_group(
+        ranks=list(range(torch.distributed.get_world_size())),
+        backend=backend,
+        timeout=timedelta(MAX_TIME_TO_CONNECT),
+    )
+
+
+class _WeightLayout:
+    """Maps the leaves of a weight tensordict onto flat, per-dtype buffers.
+
+    Leaves are ordered by key so that two processes holding tensordicts with
+    the same structure agree on the layout without exchanging it.
+
+    Args:
+        weights (TensorDictBase): the policy weights.
+        dtype (torch.dtype, optional): if provided, floating-point leaves are
+            cast to this dtype for transport (e.g. ``torch.float16``).
+    """
+
+    def __init__(self, weights: TensorDictBase, dtype: torch.dtype = None):
+        self._layout = []
+        self._sizes = {}
+        items = weights.items(include_nested=True, leaves_only=True)
+        for key, value in sorted(items, key=lambda item: str(item[0])):
+            if dtype is not None and value.is_floating_point():
+                transport_dtype = dtype
+            else:
+                transport_dtype = value.dtype
+            offset = self._sizes.get(transport_dtype, 0)
+            self._layout.append(
+                (key, transport_dtype, offset, value.numel(), value.shape)
+            )
+            self._sizes[transport_dtype] = offset + value.numel()
+
+    def empty(self, device):
+        return {
+            dtype: torch.empty(numel, dtype=dtype, device=device)
+            for dtype, numel in self._sizes.items()
+        }
+
+    def pack(self, weights: TensorDictBase, buffers):
+        for key, dtype, offset, numel, _ in self._layout:
+            buffers[dtype][offset : offset + numel].copy_(weights.get(key).reshape(-1))
+
+    def unpack(self, buffers, weights: TensorDictBase):
+        for key, dtype, offset, numel, shape in self._layout:
+            weights.get(key).copy_(buffers[dtype][offset : offset + numel].view(shape))
+
+
+class _WeightBroadcaster:
+    """Trainer side of the broadcast weight synchronization.
+
+    Each call to :meth:`publish` snapshots the weights in a fresh transport
+    buffer, posts an asynchronous ``torch.distributed.broadcast`` over the
+    weight group and bumps the version, which the trainer passes along with
+    its next commands. The trainer never waits for the workers: a broadcast
+    completes whenever the slowest worker joins it, and its buffer is
+    released then.
+    """
+
+    def __init__(self, weights, group, backend, dtype=None):
+        self.weights = weights
+        self.version = 0
+        self._group = group
+        self._device = _transport_device(backend)
+        self._layout = _WeightLayout(weights, dtype)
+        self._pending = []
+
+    def publish(self) -> int:
+        buffers = self._layout.empty(self._device)
+        self._layout.pack(self.weights, buffers)
+        works = [
+            torch.distributed.broadcast(buffer, src=0, group=self._group, async_op=True)
+            for buffer in buffers.values()
+        ]
+        self._pending = [
+            (_works, _buffers)
+            for (_works, _buffers) in self._pending
+            if not all(work.is_completed() for work in _works)
+        ]
+        self._pending.append((works, buffers))
+        self.version += 1
+        return self.version
+
+    def wait(self):
+        for works, _ in self._pending:
+            for work in works:
+                work.wait()
+        self._pending = []
+
+
+class _WeightSubscriber:
+    """Worker side of the broadcast weight synchronization.
+
+    Workers pull lazily: :meth:`pull` joins every broadcast issued since the
+    last pull (collectives must be matched by all ranks), then loads only the
+    latest weights.
+    """
+
+    def __init__(self, weights, group, backend, dtype=None):
+        self.weights = weights
+        self.version = 0
+        self._group = group
+        self._layout = _WeightLayout(weights, dtype)
+        self._buffers = self._layout.empty(_transport_device(backend))
+
+    def _join(self, version):
+        while self.version < version:
+            works = [
+                torch.distributed.broadcast(
+                    buffer, src=0, group=self._group, async_op=True
+                )
+                for buffer in self._buffers.values()
+            ]
+            for work in works:
+                work.wait()
+            self.version += 1
+
+    def pull(self, version: int) -> bool:
+        """Loads the weights published up to ``version``, if not done yet.
+
+        Returns ``True`` if the weights have been updated.
+        """
+        if version == self.version:
+            return False
+        self._join(version)
+        self._layout.unpack(self._buffers, self.weights)
+        return True
+
+    def drain(self, version: int):
+        """Joins the broadcasts published up to ``version`` without loading them."""
+        self._join(version)
@@ -3,10 +3,11 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-from typing import Callable
+import warnings
+from typing import Any, Callable, Dict, Optional
 
 import torch
-from tensordict.tensordict import pad, TensorDictBase
+from tensordict.tensordict import TensorDict, TensorDictBase
 
 
 def _stack_output(fun) -> Callable:
@@ -69,10 +70,11 @@ def split_trajectories(
                 traj_ids[i] += traj_ids[i - 1].max()
         rollout_tensordict.set(traj_ids_key, traj_ids)
 
-    splits = traj_ids.view(-1)
-    splits = [(splits == i).sum().item() for i in splits.unique_consecutive()]
+    # trajectory lengths are read from the runs of identical consecutive ids
+    lengths = traj_ids.reshape(-1).unique_consecutive(return_counts=True)[1]
+    min_len, max_len = torch.stack([lengths.min(), lengths.max()]).tolist()
     # if all splits are identical then we can skip this function
-    if len(set(splits)) == 1 and splits[0] == traj_ids.shape[-1]:
+    if min_len == max_len == traj_ids.shape[-1]:
         rollout_tensordict.set(
             mask_key,
             torch.ones(
@@ -84,23 +86,162 @@ def split_trajectories(
         if rollout_tensordict.ndimension() == 1:
             rollout_tensordict = rollout_tensordict.unsqueeze(0).to_tensordict()
         return rollout_tensordict.unflatten_keys(sep)
-    out_splits = rollout_tensordict.view(-1).split(splits, 0)
 
-    for out_split in out_splits:
-        out_split.set(
-            mask_key,
-            torch.ones(
-                out_split.shape,
-                dtype=torch.bool,
-                device=out_split.get(("next", "done")).device,
-            ),
+    # each element is scattered at (trajectory, step within the trajectory)
+    # in a zero-padded [n_traj, max_len] tensordict
+    n_traj = lengths.numel()
+    traj_index = torch.repeat_interleave(
+        torch.arange(n_traj, device=lengths.device), lengths
+    )
+    offsets = lengths.cumsum(0) - lengths
+    time_index = (
+        torch.arange(traj_index.numel(), device=lengths.device) - offsets[traj_index]
+    )
+    flat_tensordict = rollout_tensordict.reshape(-1)
+
+    def _scatter(tensor):
+        index = (traj_index.to(tensor.device), time_index.to(tensor.device))
+        out = torch.zeros(
+            (n_traj, max_len, *tensor.shape[1:]),
+            dtype=tensor.dtype,
+            device=tensor.device,
         )
-    if len(out_splits) > 1:
-        MAX = max(*[out_split.shape[0] for out_split in out_splits])
-    else:
-        MAX = out_splits[0].shape[0]
-    td = torch.stack(
-        [pad(out_split, [0, MAX - out_split.shape[0]]) for out_split in out_splits], 0
-    ).contiguous()
+        return out.index_put_(index, tensor)
+
+    td = flat_tensordict.apply(_scatter, batch_size=[n_traj, max_len])
+    mask = torch.zeros(
+        (n_traj, max_len),
+        dtype=torch.bool,
+        device=rollout_tensordict.get(("next", "done")).device,
+    )
+    mask[traj_index.to(mask.device), time_index.to(mask.device)] = True
+    td.set(mask_key, mask)
     # td = td.unflatten_keys(sep)
     return td
+
+
+class _CapturedPolicyStep:
+    """Runs a policy followed by an environment step through a captured function.
+
+    The first call is executed eagerly and records which entries are read and
+    written. A function of flat tensors replaying ``policy`` and
+    ``env.step`` is then built and either compiled with :func:`torch.compile`
+    (``mode="compile"``) or recorded as a CUDA graph (``mode="cudagraph"``).
+    Subsequent calls feed the recorded entries to this function and write its
+    outputs back in the tensordict. Whenever the structure of the input
+    tensordict differs from the recorded one, the step is executed eagerly.
+
+    Args:
+        policy (Callable): the policy, reading and writing the tensordict in-place.
+        env (EnvBase): the environment to step.
+        mode (str): ``"compile"`` or ``"cudagraph"``.
+        capture_kwargs (dict, optional): keyword arguments passed to
+            :func:`torch.compile` in ``"compile"`` mode, or the number of
+            warmup iterations (``"warmup"``, defaults to 3) in ``"cudagraph"``
+            mode.
+    """
+
+    def __init__(
+        self,
+        policy: Callable[[TensorDictBase], TensorDictBase],
+        env: "EnvBase",  # noqa: F821
+        mode: str,
+        capture_kwargs: Optional[Dict[str, Any]] = None,
+    ):
+        if mode not in ("compile", "cudagraph"):
+            raise ValueError(
+                f"Unknown capture mode {mode}, expected 'compile' or 'cudagraph'."
+            )
+        self.policy = policy
+        self.env = env
+        self.mode = mode
+        self.capture_kwargs = capture_kwargs if capture_kwargs is not None else {}
+        self._in_keys = None
+        self._out_keys = None
+        self._fn = None
+
+    @staticmethod
+    def _keys(tensordict: TensorDictBase):
+        # private entries (e.g. "_reset") are consumed eagerly by the collector
+        return sorted(
+            (
+                key
+                for key in tensordict.keys(True, True)
+                if not (key if isinstance(key, str) else key[-1]).startswith("_")
+            ),
+            key=str,
+        )
+
+    def __call__(self, tensordict: TensorDictBase) -> TensorDictBase:
+        in_keys = self._keys(tensordict)
+        if self._in_keys is None:
+            return self._record(tensordict, in_keys)
+        if in_keys != self._in_keys or tensordict.batch_size != self._batch_size:
+            return self._eager(tensordict)
+        outputs = self._fn(*[tensordict.get(key) for key in in_keys])
+        for key, value in zip(self._out_keys, outputs):
+            tensordict.set(key, value)
+        return tensordict
+
+    def _eager(self, tensordict: TensorDictBase) -> TensorDictBase:
+        self.policy(tensordict)
+        return self.env.step(tensordict)
+
+    def _record(self, tensordict: TensorDictBase, in_keys) -> TensorDictBase:
+        before = {key: tensordict.get(key) for key in in_keys}
+        # entries written in-place keep their identity: their values are
+        # compared too, otherwise they would be lost when replaying a graph
+        values = {key: value.clone() for key, value in before.items()}
+        self._eager(tensordict)
+        self._out_keys = [
+            key
+            for key in self._keys(tensordict)
+            if key not in before
+            or before[key] is not tensordict.get(key)
+            or not torch.equal(values[key], tensordict.get(key))
+        ]
+        self._in_keys = in_keys
+        self._batch_size = tensordict.batch_size
+        self._device = tensordict.device
+        if self.mode == "compile":
+            try:
+                self._fn = torch.compile(self._flat_step, **self.capture_kwargs)
+            except RuntimeError as err:
+                warnings.warn(
+                    f"torch.compile is not available ({err}), the captured "
+                    f"policy step will be executed eagerly."
+                )
+                self._fn = self._flat_step
+        else:
+            self._fn = self._make_cudagraph([before[key] for key in in_keys])
+        return tensordict
+
+    def _flat_step(self, *tensors):
+        tensordict = TensorDict(
+            {}, batch_size=self._batch_size, device=self._device, _run_checks=False
+        )
+        for key, value in zip(self._in_keys, tensors):
+            tensordict.set(key, value)
+        tensordict = self._eager(tensordict)
+        return tuple(tensordict.get(key) for key in self._out_keys)
+
+    def _make_cudagraph(self, tensors):
+        static_inputs = [tensor.clone() for tensor in tensors]
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(stream):
+            for _ in range(self.capture_kwargs.get("warmup", 3)):
+                self._flat_step(*static_inputs)
+        torch.cuda.current_stream().wait_stream(stream)
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph):
+            static_outputs = self._flat_step(*static_inputs)
+
+        def replay(*tensors):
+            for static_input, tensor in zip(static_inputs, tensors):
+                static_input.copy_(tensor)
+            graph.replay()
+            # outputs are overwritten at each replay
+            return tuple(output.clone() for output in static_outputs)
+
+        return replay
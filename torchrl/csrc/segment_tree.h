@@ -10,10 +10,14 @@
 #include <torch/extension.h>
 #include <torch/torch.h>
 
+#include <algorithm>
 #include <cassert>
+#include <cmath>
 #include <cstdint>
 #include <functional>
 #include <limits>
+#include <stdexcept>
+#include <tuple>
 #include <vector>
 
 #include "numpy_utils.h"
@@ -240,6 +244,9 @@ class SegmentTree {
   std::vector<T> values_;
 };
 
+template <typename T>
+class MinSegmentTree;
+
 template <typename T>
 class SumSegmentTree final : public SegmentTree<T, std::plus<T>> {
  public:
@@ -286,6 +293,72 @@ class SumSegmentTree final : public SegmentTree<T, std::plus<T>> {
     return index;
   }
 
+  // Stratified sampling of batch_size indices within [0, size).
+  // The mass of [0, size) is split into batch_size segments of equal length
+  // and one index is drawn from each segment. The importance sampling weights
+  // (value / min_value) ^ (-beta) are computed in the same pass.
+  // Time complexity: O(BlogN)
+  std::tuple<torch::Tensor, torch::Tensor> StratifiedSample(
+      int64_t batch_size, int64_t size, const T& min_value,
+      const T& beta) const {
+    if (batch_size <= 0) {
+      throw std::invalid_argument("batch_size must be positive.");
+    }
+    if (size <= 0 || size > this->size_) {
+      throw std::invalid_argument("size must be in (0, capacity].");
+    }
+    const T segment = this->Query(0, size) / static_cast<T>(batch_size);
+    const torch::Tensor mass =
+        torch::rand({batch_size}, utils::TorchDataType<T>::value);
+    torch::Tensor index = torch::empty({batch_size}, torch::kInt64);
+    torch::Tensor weight =
+        torch::empty({batch_size}, utils::TorchDataType<T>::value);
+    BatchStratifiedSampleImpl(batch_size, size, segment, min_value, beta,
+                              mass.data_ptr<T>(), index.data_ptr<int64_t>(),
+                              weight.data_ptr<T>());
+    return std::make_tuple(index, weight);
+  }
+
+  // Update the items at index to value in both this tree and min_tree.
+  // Time complexity: O(BlogN)
+  void UpdateWithMinTree(MinSegmentTree<T>& min_tree,
+                         const torch::Tensor& index, const T& value) {
+    CheckMinTreeUpdate(min_tree, index);
+    const torch::Tensor index_contiguous = index.contiguous();
+    const int64_t* index_data = index_contiguous.data_ptr<int64_t>();
+    const int64_t n = index_contiguous.numel();
+    for (int64_t i = 0; i < n; ++i) {
+      this->Update(index_data[i], value);
+      min_tree.Update(index_data[i], value);
+    }
+  }
+
+  void UpdateWithMinTree(MinSegmentTree<T>& min_tree,
+                         const torch::Tensor& index,
+                         const torch::Tensor& value) {
+    CheckMinTreeUpdate(min_tree, index);
+    if (value.dtype() != utils::TorchDataType<T>::value) {
+      throw std::invalid_argument("value has the wrong dtype.");
+    }
+    if (value.numel() != 1 && index.numel() != value.numel()) {
+      throw std::invalid_argument(
+          "value must be a scalar or have as many elements as index.");
+    }
+    const torch::Tensor value_contiguous = value.contiguous();
+    if (value_contiguous.numel() == 1) {
+      UpdateWithMinTree(min_tree, index, *(value_contiguous.data_ptr<T>()));
+      return;
+    }
+    const torch::Tensor index_contiguous = index.contiguous();
+    const int64_t* index_data = index_contiguous.data_ptr<int64_t>();
+    const T* value_data = value_contiguous.data_ptr<T>();
+    const int64_t n = index_contiguous.numel();
+    for (int64_t i = 0; i < n; ++i) {
+      this->Update(index_data[i], value_data[i]);
+      min_tree.Update(index_data[i], value_data[i]);
+    }
+  }
+
  protected:
   void BatchScanLowerBoundImpl(int64_t n, const T* value,
                                int64_t* index) const {
@@ -293,6 +366,32 @@ class SumSegmentTree final : public SegmentTree<T, std::plus<T>> {
       index[i] = ScanLowerBound(value[i]);
     }
   }
+  void CheckMinTreeUpdate(const MinSegmentTree<T>& min_tree,
+                          const torch::Tensor& index) const {
+    if (index.dtype() != torch::kInt64) {
+      throw std::invalid_argument("index must be an int64 tensor.");
+    }
+    if (min_tree.size() != this->size_) {
+      throw std::invalid_argument("min_tree must have the same size.");
+    }
+    if (index.numel() > 0 && (index.min().item<int64_t>() < 0 ||
+                              index.max().item<int64_t>() >= this->size_)) {
+      throw std::out_of_range("index out of range.");
+    }
+  }
+
+  void BatchStratifiedSampleImpl(int64_t n, int64_t size, const T& segment,
+                                 const T& min_value, const T& beta,
+                                 const T* mass, int64_t* index,
+                                 T* weight) const {
+    for (int64_t i = 0; i < n; ++i) {
+      const int64_t cur = std::min(
+          ScanLowerBound((static_cast<T>(i) + mass[i]) * segment), size - 1);
+      index[i] = cur;
+      weight[i] = std::pow(this->values_[cur | this->capacity_] / min_value,
+                           -beta);
+    }
+  }
 };
 
 template <typename T>
@@ -373,6 +472,14 @@ void DefineSumSegmentTree(const std::string& type, py::module& m) {
       .def("scan_lower_bound",
            py::overload_cast<const torch::Tensor&>(
                &SumSegmentTree<T>::ScanLowerBound, py::const_))
+      .def("stratified_sample", &SumSegmentTree<T>::StratifiedSample)
+      .def("update_with_min_tree",
+           py::overload_cast<MinSegmentTree<T>&, const torch::Tensor&,
+                             const T&>(&SumSegmentTree<T>::UpdateWithMinTree))
+      .def("update_with_min_tree",
+           py::overload_cast<MinSegmentTree<T>&, const torch::Tensor&,
+                             const torch::Tensor&>(
+               &SumSegmentTree<T>::UpdateWithMinTree))
       .def(py::pickle(
           [](const SumSegmentTree<T>& s) {
             return py::make_tuple(s.DumpValues());
@@ -12,6 +12,8 @@ from .replay_buffers import (
     PrioritizedReplayBuffer,
     RemoteTensorDictReplayBuffer,
     ReplayBuffer,
+    ShardedReplayBuffer,
+    SharedTensorDictReplayBuffer,
     Storage,
     TensorDictPrioritizedReplayBuffer,
     TensorDictReplayBuffer,
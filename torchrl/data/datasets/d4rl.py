@@ -11,6 +11,13 @@ import torch
 from tensordict.tensordict import make_tensordict
 
 from torchrl.collectors.utils import split_trajectories
+from torchrl.data.datasets.utils import (
+    _cache_path,
+    _cache_storage,
+    _load_cache,
+    _load_cache_state,
+    _write_cache,
+)
 from torchrl.data.replay_buffers import TensorDictReplayBuffer
 from torchrl.data.replay_buffers.samplers import Sampler
 from torchrl.data.replay_buffers.storages import LazyMemmapStorage
@@ -78,6 +85,13 @@ class D4RLExperienceReplay(TensorDictReplayBuffer):
 
         use_timeout_as_done (bool, optional): if ``True``, ``done = terminal | timeout``.
             Otherwise, only the ``terminal`` key is used. Defaults to ``True``.
+        cache_dir (str or path, optional): a directory where the converted
+            dataset is cached. The first construction writes the memory-mapped
+            storage along with the sampler and writer states, the specs and
+            the metadata. Later constructions with the same arguments
+            memory-map it directly, without loading or converting the D4RL
+            data. The cache is mapped copy-on-write: writing to the buffer
+            does not modify it. Defaults to ``None`` (no cache).
         **env_kwargs (key-value pairs): additional kwargs for
             :func:`d4rl.qlearning_dataset`. Supports ``terminate_on_end``
             (``False`` by default) or other kwargs if defined by D4RL library.
@@ -118,25 +132,43 @@ class D4RLExperienceReplay(TensorDictReplayBuffer):
         split_trajs: bool = False,
         from_env: bool = True,
         use_timeout_as_done: bool = True,
+        cache_dir: Optional[str] = None,
         **env_kwargs,
     ):
-
-        type(self)._import_d4rl()
-
-        if not self._has_d4rl:
-            raise ImportError("Could not import d4rl") from self.D4RL_ERR
         self.from_env = from_env
         self.use_timeout_as_done = use_timeout_as_done
-        if from_env:
-            dataset = self._get_dataset_from_env(name, env_kwargs)
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = _cache_path(
+                cache_dir,
+                type(self),
+                name,
+                split_trajs=split_trajs,
+                from_env=from_env,
+                use_timeout_as_done=use_timeout_as_done,
+                env_kwargs=env_kwargs,
+                sampler=type(sampler).__name__,
+                writer=type(writer).__name__,
+            )
+        cache_state = _load_cache_state(cache_path)
+        if cache_state is not None:
+            dataset = None
+            storage = LazyMemmapStorage(cache_state["max_size"])
         else:
-            dataset = self._get_dataset_direct(name, env_kwargs)
-        # Fill unknown next states with 0
-        dataset["next", "observation"][dataset["next", "done"].squeeze()] = 0
-
-        if split_trajs:
-            dataset = split_trajectories(dataset)
-        storage = LazyMemmapStorage(dataset.shape[0])
+            type(self)._import_d4rl()
+
+            if not self._has_d4rl:
+                raise ImportError("Could not import d4rl") from self.D4RL_ERR
+            if from_env:
+                dataset = self._get_dataset_from_env(name, env_kwargs)
+            else:
+                dataset = self._get_dataset_direct(name, env_kwargs)
+            # Fill unknown next states with 0
+            dataset["next", "observation"][dataset["next", "done"].squeeze()] = 0
+
+            if split_trajs:
+                dataset = split_trajectories(dataset)
+            storage = _cache_storage(dataset.shape[0], cache_path)
         super().__init__(
             batch_size=batch_size,
             storage=storage,
@@ -147,7 +179,12 @@ class D4RLExperienceReplay(TensorDictReplayBuffer):
             prefetch=prefetch,
             transform=transform,
         )
-        self.extend(dataset)
+        if dataset is None:
+            _load_cache(self, cache_path, cache_state)
+        else:
+            self.extend(dataset)
+            if cache_path is not None:
+                _write_cache(self, cache_path, metadata=self.metadata, specs=self.specs)
 
     def _get_dataset_direct(self, name, env_kwargs):
         from torchrl.envs.libs.gym import GymWrapper
@@ -8,6 +8,13 @@ from typing import Callable, Optional
 import numpy as np
 from tensordict.tensordict import TensorDict
 
+from torchrl.data.datasets.utils import (
+    _cache_path,
+    _cache_storage,
+    _load_cache,
+    _load_cache_state,
+    _write_cache,
+)
 from torchrl.data.replay_buffers import (
     LazyMemmapStorage,
     Sampler,
@@ -48,6 +55,13 @@ class OpenMLExperienceReplay(TensorDictReplayBuffer):
             using multithreading.
         transform (Transform, optional): Transform to be executed when sample() is called.
             To chain transforms use the :obj:`Compose` class.
+        cache_dir (str or path, optional): a directory where the converted
+            dataset is cached. The first construction writes the memory-mapped
+            storage along with the sampler and writer states. Later
+            constructions with the same dataset name memory-map it directly,
+            without fetching or converting the data. The cache is mapped
+            copy-on-write: writing to the buffer does not modify it.
+            Defaults to ``None`` (no cache).
 
     """
 
@@ -61,17 +75,31 @@ class OpenMLExperienceReplay(TensorDictReplayBuffer):
         pin_memory: bool = False,
         prefetch: Optional[int] = None,
         transform: Optional["Transform"] = None,  # noqa-F821
+        cache_dir: Optional[str] = None,
     ):
 
         if sampler is None:
             sampler = SamplerWithoutReplacement()
 
-        dataset = self._get_data(
-            name,
-        )
-        self.max_outcome_val = dataset["y"].max().item()
-
-        storage = LazyMemmapStorage(dataset.shape[0])
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = _cache_path(
+                cache_dir,
+                type(self),
+                name,
+                sampler=type(sampler).__name__,
+                writer=type(writer).__name__,
+            )
+        cache_state = _load_cache_state(cache_path)
+        if cache_state is not None:
+            dataset = None
+            storage = LazyMemmapStorage(cache_state["max_size"])
+        else:
+            dataset = self._get_data(
+                name,
+            )
+            self.max_outcome_val = dataset["y"].max().item()
+            storage = _cache_storage(dataset.shape[0], cache_path)
         super().__init__(
             batch_size=batch_size,
             storage=storage,
@@ -82,7 +110,12 @@ class OpenMLExperienceReplay(TensorDictReplayBuffer):
             prefetch=prefetch,
             transform=transform,
         )
-        self.extend(dataset)
+        if dataset is None:
+            _load_cache(self, cache_path, cache_state)
+        else:
+            self.extend(dataset)
+            if cache_path is not None:
+                _write_cache(self, cache_path, max_outcome_val=self.max_outcome_val)
 
     @classmethod
     def _get_data(cls, dataset_name):
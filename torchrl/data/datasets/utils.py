@@ -0,0 +1,127 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import torch
+from tensordict.memmap import MemmapTensor
+from tensordict.tensordict import TensorDict
+
+from torchrl.data.replay_buffers.storages import LazyMemmapStorage
+
+try:
+    from torchrl.version import __version__ as _TORCHRL_VERSION
+except ImportError:
+    _TORCHRL_VERSION = None
+
+# bump when the conversion of any dataset changes
+_CACHE_VERSION = 1
+
+
+def _cache_path(cache_dir, dataset_cls, name, **options) -> Path:
+    """Returns the directory where a dataset built with ``options`` is cached.
+
+    The options are hashed together with the cache and torchrl versions, such
+    that datasets built differently never share a directory. Since the sampler
+    and writer states are cached too, their types should be part of the options.
+    """
+    key = json.dumps(
+        {
+            "cache_version": _CACHE_VERSION,
+            "torchrl_version": _TORCHRL_VERSION,
+            "name": name,
+            **options,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return Path(cache_dir) / dataset_cls.__name__ / f"{name}-{digest}"
+
+
+def _load_cache_state(cache_path):
+    """Returns the state of a cached dataset, or ``None`` if it is not cached."""
+    if cache_path is None or not (cache_path / "state.pt").exists():
+        return None
+    return torch.load(cache_path / "state.pt")
+
+
+def _cache_storage(max_size, cache_path) -> LazyMemmapStorage:
+    """Creates the storage a dataset is built into.
+
+    If ``cache_path`` is provided, the memmap files are written in a staging
+    directory next to it, which :func:`_write_cache` moves in place once the
+    dataset is complete.
+    """
+    if cache_path is None:
+        return LazyMemmapStorage(max_size)
+    os.makedirs(cache_path.parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f"{cache_path.name}.", dir=cache_path.parent)
+    staging = Path(staging)
+    os.makedirs(staging / "storage")
+    return LazyMemmapStorage(max_size, scratch_dir=staging / "storage")
+
+
+def _write_cache(rb, cache_path, **attributes):
+    """Saves a freshly built dataset in ``cache_path``.
+
+    ``attributes`` are restored on the replay buffer when the cache is loaded.
+    If another process has written the same cache in the meantime, its copy
+    is kept and the one of ``rb`` is discarded.
+    """
+    storage = rb._storage
+    staging = Path(storage.scratch_dir).parent
+    state = {
+        "max_size": storage.max_size,
+        "_len": storage._len,
+        "_sampler": rb._sampler.state_dict(),
+        "_writer": rb._writer.state_dict(),
+        "attributes": attributes,
+    }
+    torch.save(state, staging / "state.pt")
+    try:
+        # renaming a directory is atomic: concurrent jobs either see a
+        # complete cache or none
+        os.rename(staging, cache_path)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        state = _load_cache_state(cache_path)
+    # point the storage to the final location of the memmap files
+    _load_cache(rb, cache_path, state)
+
+
+def _copy_on_write(tensor: MemmapTensor) -> MemmapTensor:
+    return MemmapTensor(
+        tensor.shape,
+        device=tensor.device,
+        dtype=tensor.dtype,
+        filename=tensor.filename,
+        mode="c",
+    )
+
+
+def _load_cache(rb, cache_path, state):
+    """Memory-maps a cached dataset in the storage of ``rb`` without copying it.
+
+    The files are mapped copy-on-write: the cache is shared by every buffer
+    loaded from it, hence writing to the storage (e.g. when extending the
+    buffer) only modifies the memory of this process.
+    """
+    storage = rb._storage
+    storage._storage = TensorDict.load_memmap(cache_path / "storage").apply(
+        _copy_on_write
+    )
+    storage.initialized = True
+    storage._len = state["_len"]
+    storage.scratch_dir = str(cache_path / "storage") + "/"
+    rb._sampler.load_state_dict(state["_sampler"])
+    rb._writer.load_state_dict(state["_writer"])
+    for key, value in state["attributes"].items():
+        setattr(rb, key, value)
@@ -7,6 +7,8 @@ from .replay_buffers import (
     PrioritizedReplayBuffer,
     RemoteTensorDictReplayBuffer,
     ReplayBuffer,
+    ShardedReplayBuffer,
+    SharedTensorDictReplayBuffer,
     TensorDictPrioritizedReplayBuffer,
     TensorDictReplayBuffer,
 )
@@ -15,6 +17,7 @@ from .samplers import (
     RandomSampler,
     Sampler,
     SamplerWithoutReplacement,
+    SliceSampler,
 )
 from .storages import LazyMemmapStorage, LazyTensorStorage, ListStorage, Storage
 from .writers import RoundRobinWriter, Writer
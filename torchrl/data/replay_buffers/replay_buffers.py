@@ -4,14 +4,17 @@
 # LICENSE file in the root directory of this source tree.
 
 import collections
+import itertools
 import threading
 import warnings
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 import torch
+from torch import multiprocessing as mp
 
 from tensordict import is_tensorclass
+from tensordict.memmap import MemmapTensor
 from tensordict.tensordict import (
     is_tensor_collection,
     LazyStackedTensorDict,
@@ -29,6 +32,8 @@ from torchrl.data.replay_buffers.samplers import (
 )
 from torchrl.data.replay_buffers.storages import (
     _get_default_collate,
+    LazyMemmapStorage,
+    LazyTensorStorage,
     ListStorage,
     Storage,
 )
@@ -133,6 +138,30 @@ class ReplayBuffer:
               incompatible with prefetching (since this requires to know the
               batch-size in advance) as well as with samplers that have a
               ``drop_last`` argument.
+        pinned_staging (bool, optional): if ``True``, batches sampled from a
+            :class:`~torchrl.data.replay_buffers.LazyTensorStorage` or a
+            :class:`~torchrl.data.replay_buffers.LazyMemmapStorage` are
+            gathered directly into a ring of ``prefetch + 2`` preallocated
+            (pinned, if CUDA is available) staging buffers instead of being
+            allocated and pinned at every call. The batches returned by
+            :meth:`~.sample` are views on these buffers: they are overwritten
+            after ``prefetch + 1`` subsequent calls and must be cloned if they
+            need to be kept longer. Defaults to ``False``.
+        prefetch_device (torch.device, optional): if provided, sampled batches
+            are sent to this device with ``non_blocking=True`` as soon as they
+            are gathered. Together with ``prefetch`` and ``pinned_staging``,
+            this overlaps the host-to-device transfer of the next batches
+            with the computation on the current one. Batches that are neither
+            tensors nor tensordicts (eg. lists of items stored in a
+            :class:`~torchrl.data.replay_buffers.ListStorage`) are left as is.
+        reuse_output (bool, optional): if ``True``, batches sampled from a
+            :class:`~torchrl.data.replay_buffers.LazyTensorStorage` or a
+            :class:`~torchrl.data.replay_buffers.LazyMemmapStorage` are
+            gathered in ``prefetch + 1`` preallocated output buffers
+            (a single one if no prefetching is used) that are reused across
+            calls to :meth:`~.sample`, which avoids allocating a new batch
+            every time. As with ``pinned_staging``, the returned batches are
+            overwritten by subsequent calls. Defaults to ``False``.
 
     Examples:
         >>> import torch
@@ -188,6 +217,9 @@ class ReplayBuffer:
         prefetch: Optional[int] = None,
         transform: Optional["Transform"] = None,  # noqa-F821
         batch_size: Optional[int] = None,
+        pinned_staging: bool = False,
+        prefetch_device: Optional[DEVICE_TYPING] = None,
+        reuse_output: bool = False,
     ) -> None:
         self._storage = storage if storage is not None else ListStorage(max_size=1_000)
         self._storage.attach(self)
@@ -210,6 +242,14 @@ class ReplayBuffer:
         if self._prefetch_cap:
             self._prefetch_executor = ThreadPoolExecutor(max_workers=self._prefetch_cap)
 
+        self._pinned_staging = pinned_staging
+        self._reuse_output = reuse_output
+        self._staging_ring = None
+        self._staging_cursor = itertools.count()
+        self._prefetch_device = (
+            torch.device(prefetch_device) if prefetch_device is not None else None
+        )
+
         self._replay_lock = threading.RLock()
         self._futures_lock = threading.RLock()
         from torchrl.envs.transforms.transforms import Compose
@@ -328,12 +368,55 @@ class ReplayBuffer:
         with self._replay_lock:
             self._sampler.update_priority(index, priority)
 
+    def _can_stage(self, index: Any) -> bool:
+        return (
+            (self._pinned_staging or self._reuse_output)
+            and isinstance(self._storage, LazyTensorStorage)
+            and isinstance(
+                self._storage._storage, (torch.Tensor, MemmapTensor, TensorDictBase)
+            )
+            and isinstance(index, torch.Tensor)
+            and index.ndim == 1
+        )
+
+    def _get_staged(self, index: torch.Tensor) -> Tuple[Any, int]:
+        # gathers the data in the next buffer of the staging ring
+        batch_size = len(index)
+        if (
+            self._staging_ring is None
+            or self._staging_ring[0][0].shape[0] != batch_size
+        ):
+            # one buffer per pending prefetch, plus the one returned to the
+            # user and, for pinned buffers, one for the in-flight device copy
+            ring_size = self._prefetch_cap + (2 if self._pinned_staging else 1)
+            self._staging_ring = []
+            for _ in range(ring_size):
+                buffer = self._storage._empty_batch(batch_size)
+                if self._pinned_staging and torch.cuda.is_available():
+                    buffer = buffer.pin_memory()
+                self._staging_ring.append([buffer, None])
+        slot = next(self._staging_cursor) % len(self._staging_ring)
+        buffer, event = self._staging_ring[slot]
+        if event is not None:
+            # the buffer may still be read by a pending host-to-device copy
+            event.synchronize()
+        return self._storage.get(index, out=buffer), slot
+
+    def _read(self, index: Any) -> Tuple[Any, Optional[int]]:
+        # returns the data at index and its staging slot, if any
+        if self._can_stage(index):
+            return self._get_staged(index)
+        return self._storage[index], None
+
     @pin_memory_output
     def _sample(self, batch_size: int) -> Tuple[Any, dict]:
         with self._replay_lock:
             index, info = self._sampler.sample(self._storage, batch_size)
             info["index"] = index
-            data = self._storage[index]
+            data, slot = self._read(index)
+        return self._process_sample(data, index, slot), info
+
+    def _process_sample(self, data: Any, index: Any, slot: Optional[int]) -> Any:
         if not isinstance(index, INT_CLASSES):
             data = self._collate_fn(data)
         if self._transform is not None and len(self._transform):
@@ -350,7 +433,16 @@ class ReplayBuffer:
             if not is_td:
                 data = data["data"]
 
-        return data, info
+        if self._prefetch_device is not None and (
+            isinstance(data, torch.Tensor) or is_tensor_collection(data)
+        ):
+            data = data.to(self._prefetch_device, non_blocking=True)
+            if slot is not None and self._prefetch_device.type == "cuda":
+                event = torch.cuda.Event()
+                event.record()
+                self._staging_ring[slot][1] = event
+
+        return data
 
     def sample(
         self, batch_size: Optional[int] = None, return_info: bool = False
@@ -493,6 +585,9 @@ class PrioritizedReplayBuffer(ReplayBuffer):
               incompatible with prefetching (since this requires to know the
               batch-size in advance) as well as with samplers that have a
               ``drop_last`` argument.
+        pinned_staging (bool, optional): see :class:`~torchrl.data.ReplayBuffer`.
+        prefetch_device (torch.device, optional): see :class:`~torchrl.data.ReplayBuffer`.
+        reuse_output (bool, optional): see :class:`~torchrl.data.ReplayBuffer`.
 
     .. note::
         Generic prioritized replay buffers (ie. non-tensordict backed) require
@@ -514,19 +609,18 @@ class PrioritizedReplayBuffer(ReplayBuffer):
         >>> rb.extend(data)
         >>> sample = rb.sample(3)
         >>> print(sample)
-        tensor([1, 0, 1])
+        tensor([1, 5, 6])
         >>> # get the info to find what the indices are
         >>> sample, info = rb.sample(5, return_info=True)
         >>> print(sample, info)
-        tensor([2, 7, 4, 3, 5]) {'_weight': array([1., 1., 1., 1., 1.], dtype=float32), 'index': array([2, 7, 4, 3, 5])}
+        tensor([0, 2, 5, 6, 9]) {'_weight': tensor([1., 1., 1., 1., 1.]), 'index': tensor([0, 2, 5, 6, 9])}
         >>> # update priority
         >>> priority = torch.ones(5) * 5
         >>> rb.update_priority(info["index"], priority)
         >>> # and now a new sample, the weights should be updated
         >>> sample, info = rb.sample(5, return_info=True)
         >>> print(sample, info)
-        tensor([2, 5, 2, 2, 5]) {'_weight': array([0.36278465, 0.36278465, 0.36278465, 0.36278465, 0.36278465],
-              dtype=float32), 'index': array([2, 5, 2, 2, 5])}
+        tensor([0, 2, 5, 6, 8]) {'_weight': tensor([0.3628, 0.3628, 0.3628, 0.3628, 1.0000]), 'index': tensor([0, 2, 5, 6, 8])}
 
     """
 
@@ -543,6 +637,9 @@ class PrioritizedReplayBuffer(ReplayBuffer):
         prefetch: Optional[int] = None,
         transform: Optional["Transform"] = None,  # noqa-F821
         batch_size: Optional[int] = None,
+        pinned_staging: bool = False,
+        prefetch_device: Optional[DEVICE_TYPING] = None,
+        reuse_output: bool = False,
     ) -> None:
         if storage is None:
             storage = ListStorage(max_size=1_000)
@@ -555,8 +652,377 @@ class PrioritizedReplayBuffer(ReplayBuffer):
             prefetch=prefetch,
             transform=transform,
             batch_size=batch_size,
+            pinned_staging=pinned_staging,
+            prefetch_device=prefetch_device,
+            reuse_output=reuse_output,
+        )
+
+
+class ShardedReplayBuffer:
+    """A replay buffer split into independently locked shards.
+
+    Each shard owns its storage, sampler and writer, and is protected by its
+    own lock. Writers are dispatched to the shards in a round-robin fashion
+    and samples are drawn across shards in proportion to their size (or their
+    total priority when a :class:`~torchrl.data.replay_buffers.PrioritizedSampler`
+    is used). Threads that write and threads that sample (eg. when ``prefetch``
+    is used) therefore only contend when they hit the same shard.
+
+    Indices returned by :meth:`~.add`, :meth:`~.extend` and :meth:`~.sample`,
+    and accepted by indexing, are global: the indices of the ``k``-th shard are
+    offset by the sum of the ``max_size`` of the previous shards.
+
+    Since it has no single storage, sampler or writer, this class does not
+    subclass :class:`~torchrl.data.ReplayBuffer` but exposes the same public
+    methods.
+
+    Keyword Args:
+        storages (sequence of Storage): the storages of the shards. The number
+            of shards is given by the length of this sequence.
+        samplers (sequence of Sampler, optional): the samplers of the shards.
+            If none is provided, a :class:`~torchrl.data.replay_buffers.RandomSampler`
+            is created for each shard. All samplers must be of the same type.
+        writers (sequence of Writer, optional): the writers of the shards.
+            If none is provided, a :class:`~torchrl.data.replay_buffers.RoundRobinWriter`
+            is created for each shard.
+        collate_fn (callable, optional): merges a list of samples to form a
+            mini-batch of Tensor(s)/outputs. It is applied to the content
+            of each shard separately, and the results are concatenated along
+            the first dimension. The default value will be decided
+            based on the storage type.
+        pin_memory (bool): whether pin_memory() should be called on the rb
+            samples.
+        prefetch (int, optional): number of next batches to be prefetched
+            using multithreading. Defaults to None (no prefetching).
+        transform (Transform, optional): Transform to be executed when
+            sample() is called.
+        batch_size (int, optional): the batch size to be used when sample() is
+            called.
+        is_tensordict (bool, optional): whether the buffer stores
+            :class:`tensordict.TensorDict` instances. Only used to pick the
+            default ``collate_fn`` of :class:`~torchrl.data.replay_buffers.ListStorage`
+            shards. Defaults to ``False``.
+
+    Examples:
+        >>> import torch
+        >>> from torchrl.data import LazyTensorStorage, ShardedReplayBuffer
+        >>> rb = ShardedReplayBuffer(
+        ...     storages=[LazyTensorStorage(100) for _ in range(4)],
+        ...     batch_size=8,
+        ...     prefetch=4,
+        ... )
+        >>> for i in range(8):
+        ...     index = rb.extend(torch.full((10,), i))
+        >>> len(rb)
+        80
+        >>> sample = rb.sample()
+        >>> sample.shape
+        torch.Size([8])
+
+    """
+
+    def __init__(
+        self,
+        *,
+        storages: Sequence[Storage],
+        samplers: Optional[Sequence[Sampler]] = None,
+        writers: Optional[Sequence[Writer]] = None,
+        collate_fn: Optional[Callable] = None,
+        pin_memory: bool = False,
+        prefetch: Optional[int] = None,
+        transform: Optional["Transform"] = None,  # noqa-F821
+        batch_size: Optional[int] = None,
+        is_tensordict: bool = False,
+    ) -> None:
+        num_shards = len(storages)
+        if not num_shards:
+            raise ValueError("At least one storage must be provided.")
+        if samplers is None:
+            samplers = [RandomSampler() for _ in range(num_shards)]
+        if writers is None:
+            writers = [RoundRobinWriter() for _ in range(num_shards)]
+        if len(samplers) != num_shards or len(writers) != num_shards:
+            raise ValueError(
+                f"Got {num_shards} storages, {len(samplers)} samplers and "
+                f"{len(writers)} writers. Each shard must have exactly one storage, "
+                "one sampler and one writer."
+            )
+        if len({type(sampler) for sampler in samplers}) != 1:
+            raise TypeError("All the shards must have a sampler of the same type.")
+        if any(getattr(sampler, "drop_last", False) for sampler in samplers):
+            raise ValueError("Samplers with drop_last=True cannot be sharded.")
+        self._storages = list(storages)
+        self._samplers = list(samplers)
+        self._writers = list(writers)
+        self._shard_locks = [threading.RLock() for _ in range(num_shards)]
+        for storage, sampler, writer in zip(
+            self._storages, self._samplers, self._writers
+        ):
+            # storage changes are reported to the sampler of the shard directly
+            storage.attach(sampler)
+            writer.register_storage(storage)
+        self._offsets = [0]
+        for storage in self._storages[:-1]:
+            self._offsets.append(self._offsets[-1] + storage.max_size)
+        self._next_shard = itertools.count()
+        self._collate_fns = [
+            collate_fn
+            if collate_fn is not None
+            else _get_default_collate(storage, _is_tensordict=is_tensordict)
+            for storage in self._storages
+        ]
+        self._pin_memory = pin_memory
+
+        self._prefetch = bool(prefetch)
+        self._prefetch_cap = prefetch or 0
+        self._prefetch_queue = collections.deque()
+        if self._prefetch_cap:
+            self._prefetch_executor = ThreadPoolExecutor(max_workers=self._prefetch_cap)
+        self._futures_lock = threading.RLock()
+
+        from torchrl.envs.transforms.transforms import Compose
+
+        if transform is None:
+            transform = Compose()
+        elif not isinstance(transform, Compose):
+            transform = Compose(transform)
+        transform.eval()
+        self._transform = transform
+
+        if batch_size is None and prefetch:
+            raise ValueError(
+                "Dynamic batch-size specification is incompatible "
+                "with multithreaded sampling. "
+                "When using prefetch, the batch-size must be specified in "
+                "advance. "
+            )
+        self._batch_size = batch_size
+
+    @property
+    def num_shards(self) -> int:
+        return len(self._storages)
+
+    def __len__(self) -> int:
+        return sum(len(storage) for storage in self._storages)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}("
+            f"num_shards={self.num_shards}, "
+            f"storage={self._storages[0]}, "
+            f"sampler={self._samplers[0]}, "
+            f"writer={self._writers[0]}"
+            ")"
         )
 
+    def _shard_index(self, index: torch.Tensor) -> torch.Tensor:
+        offsets = torch.tensor(self._offsets[1:], device=index.device)
+        return torch.bucketize(index, offsets, right=True)
+
+    @pin_memory_output
+    def __getitem__(self, index: Union[int, torch.Tensor]) -> Any:
+        if isinstance(index, INT_CLASSES):
+            shard = int(self._shard_index(torch.as_tensor(index)))
+            with self._shard_locks[shard]:
+                data = self._storages[shard][index - self._offsets[shard]]
+            return self._apply_transform(data)
+
+        index = torch.as_tensor(index)
+        shard_index = self._shard_index(index)
+        data = []
+        positions = []
+        for shard in shard_index.unique().tolist():
+            mask = shard_index == shard
+            with self._shard_locks[shard]:
+                shard_data = self._storages[shard][index[mask] - self._offsets[shard]]
+            data.append(self._collate_fns[shard](shard_data))
+            positions.append(mask.nonzero().squeeze(-1))
+        data = self._cat_shards(data)
+        # shards are gathered one after the other: restore the order of the index
+        order = torch.cat(positions).argsort()
+        if isinstance(data, list):
+            data = [data[i] for i in order.tolist()]
+        else:
+            data = data[order]
+        return self._apply_transform(data)
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {
+            "_shards": [
+                {
+                    "_storage": storage.state_dict(),
+                    "_sampler": sampler.state_dict(),
+                    "_writer": writer.state_dict(),
+                }
+                for storage, sampler, writer in zip(
+                    self._storages, self._samplers, self._writers
+                )
+            ],
+            "_batch_size": self._batch_size,
+        }
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        if len(state_dict["_shards"]) != self.num_shards:
+            raise RuntimeError(
+                f"Cannot load a state dict with {len(state_dict['_shards'])} shards "
+                f"into a buffer with {self.num_shards} shards."
+            )
+        for shard_state_dict, storage, sampler, writer in zip(
+            state_dict["_shards"], self._storages, self._samplers, self._writers
+        ):
+            storage.load_state_dict(shard_state_dict["_storage"])
+            sampler.load_state_dict(shard_state_dict["_sampler"])
+            writer.load_state_dict(shard_state_dict["_writer"])
+        self._batch_size = state_dict["_batch_size"]
+
+    def add(self, data: Any) -> int:
+        shard = next(self._next_shard) % self.num_shards
+        with self._shard_locks[shard]:
+            index = self._writers[shard].add(data)
+            self._samplers[shard].add(index)
+        return index + self._offsets[shard]
+
+    def extend(self, data: Sequence) -> torch.Tensor:
+        """Extends one of the shards with one or more elements contained in an iterable.
+
+        Consecutive calls write to consecutive shards.
+
+        Args:
+            data (iterable): collection of data to be added to the replay
+                buffer.
+
+        Returns:
+            Global indices of the data added to the replay buffer.
+        """
+        if self._transform is not None and is_tensor_collection(data):
+            data = self._transform.inv(data)
+        elif self._transform is not None and len(self._transform):
+            # Accepts transforms that act on "data" key
+            data = self._transform.inv(TensorDict({"data": data}, [])).get("data")
+        shard = next(self._next_shard) % self.num_shards
+        with self._shard_locks[shard]:
+            index = self._writers[shard].extend(data)
+            self._samplers[shard].extend(index)
+        return index + self._offsets[shard]
+
+    def update_priority(
+        self,
+        index: Union[int, torch.Tensor],
+        priority: Union[int, torch.Tensor],
+    ) -> None:
+        index = torch.as_tensor(index)
+        shard_index = self._shard_index(index)
+        priority = torch.as_tensor(priority)
+        for shard in shard_index.unique().tolist():
+            mask = shard_index == shard
+            with self._shard_locks[shard]:
+                self._samplers[shard].update_priority(
+                    index[mask] - self._offsets[shard],
+                    priority if priority.numel() == 1 else priority[mask],
+                )
+
+    def mark_update(self, index: Union[int, torch.Tensor]) -> None:
+        index = torch.as_tensor(index)
+        shard_index = self._shard_index(index)
+        for shard in shard_index.unique().tolist():
+            with self._shard_locks[shard]:
+                self._samplers[shard].mark_update(
+                    index[shard_index == shard] - self._offsets[shard]
+                )
+
+    def _shard_masses(self) -> Tuple[torch.Tensor, List[float]]:
+        masses = []
+        min_priorities = []
+        for storage, sampler, lock in zip(
+            self._storages, self._samplers, self._shard_locks
+        ):
+            with lock:
+                len_storage = len(storage)
+                if not len_storage:
+                    masses.append(0.0)
+                    min_priorities.append(float("inf"))
+                elif isinstance(sampler, PrioritizedSampler):
+                    masses.append(sampler._sum_tree.query(0, len_storage))
+                    min_priorities.append(sampler._min_tree.query(0, len_storage))
+                else:
+                    masses.append(float(len_storage))
+        return torch.tensor(masses, dtype=torch.double), min_priorities
+
+    @pin_memory_output
+    def _sample(self, batch_size: int) -> Tuple[Any, dict]:
+        masses, min_priorities = self._shard_masses()
+        if not masses.sum():
+            raise RuntimeError("Cannot sample from an empty buffer.")
+        counts = torch.multinomial(masses, batch_size, replacement=True).bincount(
+            minlength=self.num_shards
+        )
+        data = []
+        infos = []
+        for shard, count in enumerate(counts.tolist()):
+            if not count:
+                continue
+            with self._shard_locks[shard]:
+                index, info = self._samplers[shard].sample(self._storages[shard], count)
+                shard_data = self._storages[shard][index]
+            data.append(self._collate_fns[shard](shard_data))
+            if "_weight" in info and min_priorities:
+                # importance weights are normalized by the global minimum priority
+                info["_weight"] = info["_weight"] * (
+                    min_priorities[shard] / min(min_priorities)
+                ) ** (-self._samplers[shard]._beta)
+            info["index"] = torch.as_tensor(index) + self._offsets[shard]
+            infos.append(info)
+        data = self._cat_shards(data)
+        info = {
+            key: torch.cat([torch.as_tensor(_info[key]) for _info in infos], 0)
+            for key in infos[0].keys()
+        }
+        return self._apply_transform(data), info
+
+    @staticmethod
+    def _cat_shards(data: List[Any]) -> Any:
+        if len(data) == 1:
+            return data[0]
+        if isinstance(data[0], torch.Tensor) or is_tensor_collection(data[0]):
+            return torch.cat(data, 0)
+        return [item for shard_data in data for item in shard_data]
+
+    def _apply_transform(self, data: Any) -> Any:
+        if self._transform is None or not len(self._transform):
+            return data
+        is_td = True
+        if not is_tensor_collection(data):
+            data = TensorDict({"data": data}, [])
+            is_td = False
+        is_locked = data.is_locked
+        if is_locked:
+            data.unlock_()
+        data = self._transform(data)
+        if is_locked:
+            data.lock_()
+        if not is_td:
+            data = data["data"]
+        return data
+
+    # these only rely on the batch-size, prefetching and transform attributes
+    # and on _sample, which are shared with ReplayBuffer
+    sample = ReplayBuffer.sample
+    append_transform = ReplayBuffer.append_transform
+    insert_transform = ReplayBuffer.insert_transform
+
+    def __iter__(self):
+        for sampler in self._samplers:
+            if sampler.ran_out:
+                sampler.ran_out = False
+        if self._batch_size is None:
+            raise RuntimeError(
+                "Cannot iterate over the replay buffer. "
+                "Batch_size was not specified during construction of the replay buffer."
+            )
+        while not any(sampler.ran_out for sampler in self._samplers):
+            data = self.sample()
+            yield data
+
 
 class TensorDictReplayBuffer(ReplayBuffer):
     """TensorDict-specific wrapper around the :class:`~torchrl.data.ReplayBuffer` class.
@@ -601,6 +1067,9 @@ class TensorDictReplayBuffer(ReplayBuffer):
             This is to be used when the sampler is of type
             :class:`~torchrl.data.PrioritizedSampler`.
             Defaults to ``"td_error"``.
+        pinned_staging (bool, optional): see :class:`~torchrl.data.ReplayBuffer`.
+        prefetch_device (torch.device, optional): see :class:`~torchrl.data.ReplayBuffer`.
+        reuse_output (bool, optional): see :class:`~torchrl.data.ReplayBuffer`.
 
     Examples:
         >>> import torch
@@ -761,7 +1230,7 @@ class TensorDictReplayBuffer(ReplayBuffer):
                 device=data.device,
             )
         else:
-            priority = self._get_priority(data)
+            priority = torch.as_tensor(self._get_priority(data))
         # if the index shape does not match the priority shape, we have expanded it.
         # we just take the first value
         index = data.get("index")
@@ -864,6 +1333,9 @@ class TensorDictPrioritizedReplayBuffer(TensorDictReplayBuffer):
         reduction (str, optional): the reduction method for multidimensional
             tensordicts (ie stored trajectories). Can be one of "max", "min",
             "median" or "mean".
+        pinned_staging (bool, optional): see :class:`~torchrl.data.ReplayBuffer`.
+        prefetch_device (torch.device, optional): see :class:`~torchrl.data.ReplayBuffer`.
+        reuse_output (bool, optional): see :class:`~torchrl.data.ReplayBuffer`.
 
     Examples:
         >>> import torch
@@ -936,6 +1408,9 @@ class TensorDictPrioritizedReplayBuffer(TensorDictReplayBuffer):
         transform: Optional["Transform"] = None,  # noqa-F821
         reduction: Optional[str] = "max",
         batch_size: Optional[int] = None,
+        pinned_staging: bool = False,
+        prefetch_device: Optional[DEVICE_TYPING] = None,
+        reuse_output: bool = False,
     ) -> None:
         if storage is None:
             storage = ListStorage(max_size=1_000)
@@ -951,6 +1426,9 @@ class TensorDictPrioritizedReplayBuffer(TensorDictReplayBuffer):
             prefetch=prefetch,
             transform=transform,
             batch_size=batch_size,
+            pinned_staging=pinned_staging,
+            prefetch_device=prefetch_device,
+            reuse_output=reuse_output,
         )
 
 
@@ -986,6 +1464,180 @@ class RemoteTensorDictReplayBuffer(TensorDictReplayBuffer):
         return super().update_tensordict_priority(data)
 
 
+class SharedTensorDictReplayBuffer(TensorDictReplayBuffer):
+    """A TensorDict replay buffer that can be shared by several processes on a single host.
+
+    The content of the buffer lives in shared memory (:class:`~torchrl.data.replay_buffers.LazyTensorStorage`)
+    or in memory-mapped files (:class:`~torchrl.data.replay_buffers.LazyMemmapStorage`),
+    and the writer cursor and the storage length are kept in a shared-memory
+    tensor protected by an inter-process lock. The buffer can be passed to
+    collector and learner processes (eg. as an argument of :class:`torch.multiprocessing.Process`)
+    which can then :meth:`~.extend` and :meth:`~.sample` it directly: only
+    the indices are computed locally, the data is neither pickled nor sent
+    through RPC.
+
+    The storage is allocated when the buffer is extended for the first time,
+    which must happen before the buffer is sent to other processes.
+
+    Keyword Args:
+        storage (LazyTensorStorage or LazyMemmapStorage): the storage to be used.
+        sampler (Sampler, optional): the sampler to be used. Each process keeps
+            its own copy of the sampler, hence samplers that hold a state
+            about the stored data (such as :class:`~torchrl.data.replay_buffers.PrioritizedSampler`)
+            are not supported. Defaults to :class:`~torchrl.data.replay_buffers.RandomSampler`.
+        writer (Writer, optional): the writer to be used. Only
+            :class:`~torchrl.data.replay_buffers.RoundRobinWriter` is supported.
+        collate_fn (callable, optional): merges a list of samples to form a
+            mini-batch of Tensor(s)/outputs.
+        pin_memory (bool): whether pin_memory() should be called on the rb
+            samples.
+        prefetch (int, optional): number of next batches to be prefetched
+            using multithreading. Defaults to None (no prefetching).
+        transform (Transform, optional): Transform to be executed when
+            sample() is called.
+        batch_size (int, optional): the batch size to be used when sample() is
+            called.
+        priority_key (str, optional): unused, kept for compatibility with
+            :class:`~torchrl.data.TensorDictReplayBuffer`.
+
+    Examples:
+        >>> import torch
+        >>> from torch import multiprocessing as mp
+        >>> from tensordict import TensorDict
+        >>> from torchrl.data import LazyMemmapStorage, SharedTensorDictReplayBuffer
+        >>>
+        >>> def collect(rb):
+        ...     rb.extend(TensorDict({"obs": torch.ones(10, 3)}, [10]))
+        >>>
+        >>> rb = SharedTensorDictReplayBuffer(storage=LazyMemmapStorage(100), batch_size=4)
+        >>> rb.extend(TensorDict({"obs": torch.zeros(10, 3)}, [10]))
+        >>> proc = mp.Process(target=collect, args=(rb,))
+        >>> proc.start()
+        >>> proc.join()
+        >>> len(rb)
+        20
+        >>> rb.sample()["obs"].shape
+        torch.Size([4, 3])
+
+    """
+
+    def __init__(
+        self,
+        *,
+        storage: LazyTensorStorage,
+        sampler: Optional[Sampler] = None,
+        writer: Optional[Writer] = None,
+        **kw,
+    ) -> None:
+        if not isinstance(storage, LazyTensorStorage):
+            raise TypeError(
+                f"{type(self).__name__} requires a LazyTensorStorage or a "
+                f"LazyMemmapStorage, got {type(storage)}."
+            )
+        if isinstance(sampler, PrioritizedSampler):
+            raise TypeError(f"{type(self).__name__} does not support {type(sampler)}.")
+        if writer is not None and type(writer) is not RoundRobinWriter:
+            raise TypeError(f"{type(self).__name__} does not support {type(writer)}.")
+        super().__init__(storage=storage, sampler=sampler, writer=writer, **kw)
+        self._replay_lock = mp.RLock()
+        # the staging ring is local to each process but shared by its threads
+        self._staging_lock = threading.RLock()
+        # writer cursor, storage length and total number of items written
+        self._shared_meta = torch.zeros(3, dtype=torch.long).share_memory_()
+
+    def _pull_meta(self) -> int:
+        cursor, length, written = self._shared_meta.tolist()
+        self._writer._cursor = cursor
+        self._storage._len = length
+        return written
+
+    def _push_meta(self, num_written: int) -> None:
+        written = self._shared_meta[2].item() + num_written
+        self._shared_meta.copy_(
+            torch.tensor([self._writer._cursor, self._storage._len, written])
+        )
+
+    def __len__(self) -> int:
+        with self._replay_lock:
+            self._pull_meta()
+            return len(self._storage)
+
+    def add(self, data: TensorDictBase) -> int:
+        with self._replay_lock:
+            self._pull_meta()
+            index = super().add(data)
+            self._push_meta(1)
+        return index
+
+    def extend(self, tensordicts: Union[List, TensorDictBase]) -> torch.Tensor:
+        with self._replay_lock:
+            self._pull_meta()
+            index = super().extend(tensordicts)
+            self._push_meta(len(index))
+        return index
+
+    def _read(self, index: Any) -> Tuple[Any, Optional[int]]:
+        if self._can_stage(index):
+            with self._staging_lock:
+                return super()._read(index)
+        return super()._read(index)
+
+    def _overwritten(self, index: torch.Tensor, written: int) -> bool:
+        # whether some of the indices have been written since ``written`` items
+        # were in the buffer. Writers hold the lock for the whole write, so
+        # once it is acquired every overlapping write is accounted for.
+        with self._replay_lock:
+            written_now = self._shared_meta[2].item()
+        if written_now == written:
+            return False
+        max_size = self._storage.max_size
+        if written_now - written >= max_size:
+            return True
+        cursors = torch.arange(written, written_now) % max_size
+        return bool(torch.isin(torch.as_tensor(index), cursors).any())
+
+    @pin_memory_output
+    def _sample(self, batch_size: int) -> Tuple[Any, dict]:
+        # the inter-process lock is only held to draw the indices: the data is
+        # gathered outside of it, and gathered again if a concurrent write
+        # has overwritten some of the sampled items in the meantime
+        while True:
+            with self._replay_lock:
+                written = self._pull_meta()
+                index, info = self._sampler.sample(self._storage, batch_size)
+            data, slot = self._read(index)
+            if not self._overwritten(index, written):
+                break
+        info["index"] = index
+        return self._process_sample(data, index, slot), info
+
+    def __getstate__(self) -> Dict[str, Any]:
+        if not self._storage.initialized:
+            raise RuntimeError(
+                f"The storage of a {type(self).__name__} must be initialized "
+                "(eg. by extending the buffer once) before the buffer is "
+                "sent to another process."
+            )
+        storage = self._storage._storage
+        if not isinstance(self._storage, LazyMemmapStorage) and not storage.is_shared():
+            storage.share_memory_()
+        state = self.__dict__.copy()
+        # thread-related attributes are local to each process
+        state.pop("_prefetch_executor", None)
+        state["_prefetch_queue"] = collections.deque()
+        state["_staging_ring"] = None
+        state.pop("_futures_lock")
+        state.pop("_staging_lock")
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._futures_lock = threading.RLock()
+        self._staging_lock = threading.RLock()
+        if self._prefetch_cap:
+            self._prefetch_executor = ThreadPoolExecutor(max_workers=self._prefetch_cap)
+
+
 class InPlaceSampler:
     """A sampler to write tennsordicts in-place.
 
@@ -7,8 +7,8 @@ from abc import ABC, abstractmethod
 from copy import deepcopy
 from typing import Any, Dict, Tuple, Union
 
-import numpy as np
 import torch
+from tensordict.tensordict import is_tensor_collection, NestedKey
 
 from torchrl._torchrl import (
     MinSegmentTreeFp32,
@@ -17,8 +17,7 @@ from torchrl._torchrl import (
     SumSegmentTreeFp64,
 )
 
-from .storages import Storage
-from .utils import _to_numpy, INT_CLASSES
+from .storages import _as_tensor, LazyTensorStorage, Storage
 
 
 class Sampler(ABC):
@@ -155,10 +154,18 @@ class PrioritizedSampler(Sampler):
         beta (float): importance sampling negative exponent.
         eps (float, optional): delta added to the priorities to ensure that the buffer
             does not contain null priorities. Defaults to 1e-8.
+        dtype (torch.dtype, optional): the dtype of the priorities. Can be one
+            of ``torch.float`` or ``torch.double``. Defaults to ``torch.float``.
         reduction (str, optional): the reduction method for multidimensional
             tensordicts (ie stored trajectories). Can be one of "max", "min",
             "median" or "mean".
 
+    Indices are sampled in a stratified fashion: the total priority mass is
+    split in ``batch_size`` segments of equal mass and one index is drawn from
+    each of them. Sampling, importance weighting and priority updates are
+    executed by the C++ segment trees on :class:`torch.Tensor` inputs and
+    outputs, without any round-trip through NumPy.
+
     """
 
     def __init__(
@@ -183,9 +190,11 @@ class PrioritizedSampler(Sampler):
         self._eps = eps
         self.reduction = reduction
         if dtype in (torch.float, torch.FloatType, torch.float32):
+            self._dtype = torch.float32
             self._sum_tree = SumSegmentTreeFp32(self._max_capacity)
             self._min_tree = MinSegmentTreeFp32(self._max_capacity)
         elif dtype in (torch.double, torch.DoubleTensor, torch.float64):
+            self._dtype = torch.float64
             self._sum_tree = SumSegmentTreeFp64(self._max_capacity)
             self._min_tree = MinSegmentTreeFp64(self._max_capacity)
         else:
@@ -205,16 +214,6 @@ class PrioritizedSampler(Sampler):
             raise RuntimeError("negative p_sum")
         if p_min <= 0:
             raise RuntimeError("negative p_min")
-        mass = np.random.uniform(0.0, p_sum, size=batch_size)
-        index = self._sum_tree.scan_lower_bound(mass)
-        if not isinstance(index, np.ndarray):
-            index = np.array([index])
-        if isinstance(index, torch.Tensor):
-            index.clamp_max_(len(storage) - 1)
-        else:
-            index = np.clip(index, None, len(storage) - 1)
-        weight = self._sum_tree[index]
-
         # Importance sampling weight formula:
         #   w_i = (p_i / sum(p) * N) ^ (-beta)
         #   weight_i = w_i / max(w)
@@ -222,8 +221,10 @@ class PrioritizedSampler(Sampler):
         #       ((min(p) / sum(p) * N) ^ (-beta))
         #   weight_i = ((p_i / sum(p) * N) / (min(p) / sum(p) * N)) ^ (-beta)
         #   weight_i = (p_i / min(p)) ^ (-beta)
-        # weight = np.power(weight / (p_min + self._eps), -self._beta)
-        weight = np.power(weight / p_min, -self._beta)
+        # Indices and weights are computed in a single pass by the sum-tree.
+        index, weight = self._sum_tree.stratified_sample(
+            batch_size, len(storage), p_min, self._beta
+        )
         return index, {"_weight": weight}
 
     def _add_or_extend(self, index: Union[int, torch.Tensor]) -> None:
@@ -239,8 +240,9 @@ class PrioritizedSampler(Sampler):
                 "length as index"
             )
 
-        self._sum_tree[index] = priority
-        self._min_tree[index] = priority
+        self._sum_tree.update_with_min_tree(
+            self._min_tree, torch.as_tensor(index, dtype=torch.long), priority
+        )
 
     def add(self, index: int) -> None:
         super().add(index)
@@ -262,30 +264,18 @@ class PrioritizedSampler(Sampler):
                 indexed elements.
 
         """
-        if isinstance(index, INT_CLASSES):
-            if not isinstance(priority, float):
-                if len(priority) != 1:
-                    raise RuntimeError(
-                        f"priority length should be 1, got {len(priority)}"
-                    )
-                priority = priority.item()
-        else:
-            if not (
-                isinstance(priority, float)
-                or len(priority) == 1
-                or len(index) == len(priority)
-            ):
-                raise RuntimeError(
-                    "priority should be a number or an iterable of the same "
-                    "length as index"
-                )
-            index = _to_numpy(index)
-            priority = _to_numpy(priority)
-
-        self._max_priority = max(self._max_priority, np.max(priority))
-        priority = np.power(priority + self._eps, self._alpha)
-        self._sum_tree[index] = priority
-        self._min_tree[index] = priority
+        index = torch.as_tensor(index, dtype=torch.long).detach().cpu()
+        priority = torch.as_tensor(priority, dtype=self._dtype).detach().cpu()
+        if index.ndim == 0 and priority.numel() != 1:
+            raise RuntimeError(f"priority length should be 1, got {priority.numel()}")
+        if not (priority.numel() == 1 or index.numel() == priority.numel()):
+            raise RuntimeError(
+                "priority should be a number or an iterable of the same "
+                "length as index"
+            )
+        self._max_priority = max(self._max_priority, priority.max().item())
+        priority = torch.pow(priority + self._eps, self._alpha)
+        self._sum_tree.update_with_min_tree(self._min_tree, index, priority)
 
     def mark_update(self, index: Union[int, torch.Tensor]) -> None:
         self.update_priority(index, self.default_priority)
@@ -307,3 +297,184 @@ class PrioritizedSampler(Sampler):
         self._max_priority = state_dict["_max_priority"]
         self._sum_tree = state_dict.pop("_sum_tree")
         self._min_tree = state_dict.pop("_min_tree")
+
+
+class SliceSampler(Sampler):
+    """Samples contiguous slices of trajectories for sequence models.
+
+    The storage is expected to contain individual transitions written in
+    chronological order (e.g. the flattened output of a data collector).
+    The sampler keeps a per-item cache of the trajectory ids (or done flags)
+    that is updated incrementally with the items written since the last call
+    to :meth:`~.sample`, from which the positions where trajectories end are
+    derived. Each sampled element is a window of ``slice_len`` consecutive
+    items that does not cross a trajectory end.
+
+    The indices returned have shape ``[batch_size, slice_len]``. Items of a
+    window that lie past the end of its trajectory point to the last item of
+    the trajectory and are flagged as invalid by the ``"mask"`` entry of the
+    info dictionary, which has the same shape as the indices.
+
+    Args:
+        slice_len (int): the length of the slices to be sampled.
+        traj_key (NestedKey, optional): the key of the trajectory ids in the
+            stored data. Defaults to ``("collector", "traj_ids")``.
+        end_key (NestedKey, optional): the key of the done flags, used to
+            delimit trajectories when ``traj_key`` is not present in the
+            stored data. Defaults to ``("next", "done")``.
+        strict_length (bool, optional): if ``True``, only windows that
+            fit entirely within a trajectory are sampled, and the mask is
+            always ``True``. Defaults to ``False``.
+
+    .. note::
+      Trajectories are split at the end of the storage and at the last item
+      written, as the items that follow them belong to other trajectories.
+
+    Examples:
+        >>> import torch
+        >>> from tensordict import TensorDict
+        >>> from torchrl.data.replay_buffers import LazyTensorStorage, SliceSampler, TensorDictReplayBuffer
+        >>> rb = TensorDictReplayBuffer(
+        ...     storage=LazyTensorStorage(100),
+        ...     sampler=SliceSampler(slice_len=4),
+        ...     batch_size=3,
+        ... )
+        >>> traj_ids = torch.arange(10).repeat_interleave(10)
+        >>> data = TensorDict({"obs": torch.arange(100), ("collector", "traj_ids"): traj_ids}, [100])
+        >>> rb.extend(data)
+        >>> sample = rb.sample()
+        >>> sample.shape
+        torch.Size([3, 4])
+
+    """
+
+    def __init__(
+        self,
+        slice_len: int,
+        traj_key: NestedKey = ("collector", "traj_ids"),
+        end_key: NestedKey = ("next", "done"),
+        strict_length: bool = False,
+    ) -> None:
+        if slice_len < 1:
+            raise ValueError(f"slice_len must be a positive integer, got {slice_len}")
+        self.slice_len = slice_len
+        self.traj_key = traj_key
+        self.end_key = end_key
+        self.strict_length = strict_length
+        self._arange = torch.arange(slice_len)
+        self._reset_cache()
+
+    def _reset_cache(self) -> None:
+        self._markers = None
+        self._use_traj_ids = None
+        self._dirty = []
+        self._last_written = None
+        self._ends = None
+        self._starts = None
+
+    def add(self, index: int) -> None:
+        self._dirty.append(torch.tensor([index]))
+        self._last_written = index
+        self._ends = None
+
+    def extend(self, index: torch.Tensor) -> None:
+        index = torch.as_tensor(index, dtype=torch.long).reshape(-1)
+        if not index.numel():
+            return
+        self._dirty.append(index)
+        self._last_written = index[-1].item()
+        self._ends = None
+
+    def _read_markers(self, storage: Storage, index: torch.Tensor) -> torch.Tensor:
+        if isinstance(storage, LazyTensorStorage) and is_tensor_collection(
+            storage._storage
+        ):
+            # read the entry only rather than gathering whole items
+            content = storage._storage
+            if "_data" in content.keys():
+                content = content.get("_data")
+        else:
+            content = storage.get(index.tolist())
+            if isinstance(content, list):
+                content = torch.stack(content, 0)
+            if not is_tensor_collection(content):
+                raise RuntimeError(
+                    "SliceSampler requires the storage to contain tensordicts."
+                )
+            if "_data" in content.keys():
+                content = content.get("_data")
+            index = slice(None)
+        if self._use_traj_ids is None:
+            keys = content.keys(include_nested=True)
+            if self.traj_key in keys:
+                self._use_traj_ids = True
+            elif self.end_key in keys:
+                self._use_traj_ids = False
+            else:
+                raise KeyError(
+                    f"Could not find the keys {self.traj_key} or {self.end_key} in the storage."
+                )
+        key = self.traj_key if self._use_traj_ids else self.end_key
+        markers = _as_tensor(content.get(key))[index]
+        markers = markers.reshape(markers.shape[0], -1)
+        if self._use_traj_ids:
+            return markers[:, 0].long()
+        return markers.any(-1)
+
+    def _update_ends(self, storage: Storage) -> None:
+        if self._markers is None:
+            self._dirty = [torch.arange(len(storage))]
+        if self._dirty:
+            index = torch.cat(self._dirty)
+            self._dirty = []
+            markers = self._read_markers(storage, index)
+            if self._markers is None:
+                self._markers = torch.zeros(
+                    storage.max_size,
+                    dtype=torch.long if self._use_traj_ids else torch.bool,
+                )
+            self._markers[index] = markers
+            self._ends = None
+        if self._ends is not None:
+            return
+        len_storage = len(storage)
+        markers = self._markers[:len_storage]
+        is_end = torch.ones(len_storage, dtype=torch.bool)
+        if self._use_traj_ids:
+            is_end[:-1] = markers[:-1] != markers[1:]
+        else:
+            is_end[:-1] = markers[:-1]
+        if self._last_written is not None:
+            is_end[self._last_written] = True
+        self._ends = is_end.nonzero().squeeze(-1)
+        if self.strict_length:
+            positions = torch.arange(len_storage)
+            length = self._ends[torch.searchsorted(self._ends, positions)] - positions
+            self._starts = (length >= self.slice_len - 1).nonzero().squeeze(-1)
+
+    def sample(self, storage: Storage, batch_size: int) -> Tuple[torch.Tensor, dict]:
+        len_storage = len(storage)
+        if not len_storage:
+            raise RuntimeError("An empty storage was passed")
+        self._update_ends(storage)
+        if self.strict_length:
+            if not self._starts.numel():
+                raise RuntimeError(
+                    f"No trajectory of length {self.slice_len} or more in the storage."
+                )
+            start = self._starts[torch.randint(self._starts.numel(), (batch_size,))]
+        else:
+            start = torch.randint(len_storage, (batch_size,))
+        end = self._ends[torch.searchsorted(self._ends, start)].unsqueeze(-1)
+        index = start.unsqueeze(-1) + self._arange
+        mask = index <= end
+        index = torch.minimum(index, end)
+        return index, {"mask": mask}
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {"_last_written": self._last_written}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        # the cache is rebuilt from the storage content at the next call to sample
+        self._reset_cache()
+        self._last_written = state_dict["_last_written"]
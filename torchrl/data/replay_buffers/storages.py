@@ -8,7 +8,7 @@ import os
 import warnings
 from collections import OrderedDict
 from copy import copy
-from typing import Any, Dict, Sequence, Union
+from typing import Any, Dict, Optional, Sequence, Union
 
 import torch
 from tensordict import is_tensorclass
@@ -268,17 +268,62 @@ class LazyTensorStorage(Storage):
                 self._init(data)
         self._storage[cursor] = data
 
-    def get(self, index: Union[int, Sequence[int], slice]) -> Any:
+    def get(
+        self,
+        index: Union[int, Sequence[int], slice],
+        out: Optional[Union[TensorDictBase, torch.Tensor]] = None,
+    ) -> Any:
+        """Returns the items located at ``index``.
+
+        Args:
+            index (int, sequence of int, slice or torch.Tensor): the indices of
+                the items to be retrieved.
+            out (TensorDictBase or torch.Tensor, optional): if provided, the
+                items are gathered in this preallocated batch one entry at a
+                time with :func:`torch.index_select`, instead of being
+                allocated at every call. It must have the same structure as
+                the storage content with a leading dimension of size ``len(index)``.
+                ``index`` must then be a sequence of integers or a tensor.
+
+        """
         if not self.initialized:
             raise RuntimeError(
                 "Cannot get an item from an unitialized LazyMemmapStorage"
             )
+        if out is not None:
+            return self._get_into(index, out)
+        if isinstance(index, torch.Tensor) and index.ndim > 1:
+            # memory-mapped tensors do not support multidimensional indices:
+            # we gather the items with a flat index and reshape the result
+            out = self.get(index.reshape(-1))
+            return out.reshape(*index.shape, *out.shape[1:])
         out = self._storage[index]
         if is_tensor_collection(out):
             out = _reset_batch_size(out)
             return out.unlock_()
         return out
 
+    def _empty_batch(self, batch_size: int) -> Union[TensorDictBase, torch.Tensor]:
+        """Allocates a batch of ``batch_size`` items shaped like the storage content."""
+        index = torch.zeros(batch_size, dtype=torch.long, device=self.device)
+        if is_tensor_collection(self._storage):
+            return self._storage[index].clone()
+        return _as_tensor(self._storage)[index]
+
+    def _get_into(
+        self,
+        index: Union[Sequence[int], torch.Tensor],
+        out: Union[TensorDictBase, torch.Tensor],
+    ) -> Union[TensorDictBase, torch.Tensor]:
+        """Gathers the items at ``index`` in a batch preallocated with :meth:`~._empty_batch`."""
+        index = torch.as_tensor(index, dtype=torch.long, device=self.device)
+        if not is_tensor_collection(self._storage):
+            return torch.index_select(_as_tensor(self._storage), 0, index, out=out)
+        for key, value in self._storage.items(include_nested=True, leaves_only=True):
+            torch.index_select(_as_tensor(value), 0, index, out=out.get(key))
+        # _reset_batch_size pops the entries it reads, hence the shallow copy
+        return _reset_batch_size(out.clone(recurse=False)).unlock_()
+
     def __len__(self):
         return self._len
 
@@ -427,6 +472,13 @@ def _mem_map_tensor_as_tensor(mem_map_tensor: MemmapTensor) -> torch.Tensor:
         return mem_map_tensor._tensor
 
 
+def _as_tensor(tensor: Union[MemmapTensor, torch.Tensor]) -> torch.Tensor:
+    # views a MemmapTensor as a regular tensor without copy
+    if isinstance(tensor, MemmapTensor):
+        return tensor._tensor
+    return tensor
+
+
 def _reset_batch_size(x):
     """Resets the batch size of a tensordict.
 
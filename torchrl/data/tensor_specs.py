@@ -482,12 +482,28 @@ class TensorSpec:
 
         return decorator
 
-    def encode(self, val: Union[np.ndarray, torch.Tensor]) -> torch.Tensor:
+    def encode(
+        self,
+        val: Union[np.ndarray, torch.Tensor],
+        *,
+        out: Optional[torch.Tensor] = None,
+        copy: bool = True,
+    ) -> torch.Tensor:
         """Encodes a value given the specified spec, and return the corresponding tensor.
 
         Args:
             val (np.ndarray or torch.Tensor): value to be encoded as tensor.
 
+        Keyword Args:
+            out (torch.Tensor, optional): if provided, the value is written in
+                this preallocated tensor (e.g. a shared-memory buffer), with the
+                dtype and device conversions happening within this single copy.
+            copy (bool, optional): if ``False``, NumPy arrays whose dtype and
+                device already match the spec are wrapped without copy, hence
+                the result shares its memory with ``val``. Only use it with
+                arrays that the caller owns and that are not overwritten
+                afterwards (e.g. by the simulator). Defaults to ``True``.
+
         Returns:
             torch.Tensor matching the required tensor specs.
 
@@ -502,11 +518,18 @@ class TensorSpec:
                     val = val[0]
                 else:
                     val = np.array(val)
-            if isinstance(val, np.ndarray) and not all(
-                stride > 0 for stride in val.strides
+            if isinstance(val, np.ndarray) and (
+                not val.flags.writeable or not all(stride > 0 for stride in val.strides)
             ):
+                # read-only and non-positively strided arrays cannot be shared
                 val = val.copy()
-            val = torch.tensor(val, device=self.device, dtype=self.dtype)
+            if out is not None:
+                # the conversion is done by out.copy_
+                val = torch.as_tensor(val)
+            elif copy:
+                val = torch.tensor(val, device=self.device, dtype=self.dtype)
+            else:
+                val = torch.as_tensor(val, device=self.device, dtype=self.dtype)
             if val.shape[-len(self.shape) :] != self.shape:
                 # option 1: add a singleton dim at the end
                 if (
@@ -519,6 +542,8 @@ class TensorSpec:
                         f"Shape mismatch: the value has shape {val.shape} which "
                         f"is incompatible with the spec shape {self.shape}."
                     )
+        if out is not None:
+            val = out.copy_(val)
         if _CHECK_SPEC_ENCODE:
             self.assert_is_in(val)
         return val
@@ -1114,9 +1139,11 @@ class OneHotDiscreteTensorSpec(TensorSpec):
         self,
         val: Union[np.ndarray, torch.Tensor],
         space: Optional[DiscreteBox] = None,
+        *,
+        out: Optional[torch.Tensor] = None,
     ) -> torch.Tensor:
         if not isinstance(val, torch.Tensor):
-            val = torch.tensor(val, dtype=self.dtype, device=self.device)
+            val = torch.as_tensor(val, dtype=self.dtype, device=self.device)
 
         if space is None:
             space = self.space
@@ -1130,6 +1157,8 @@ class OneHotDiscreteTensorSpec(TensorSpec):
             raise AssertionError("Value must be less than action space.")
 
         val = torch.nn.functional.one_hot(val.long(), space.n)
+        if out is not None:
+            val = out.copy_(val)
         return val
 
     def to_numpy(self, val: torch.Tensor, safe: bool = True) -> np.ndarray:
@@ -1735,9 +1764,14 @@ class MultiOneHotDiscreteTensorSpec(OneHotDiscreteTensorSpec):
         ).squeeze(-2)
         return x
 
-    def encode(self, val: Union[np.ndarray, torch.Tensor]) -> torch.Tensor:
+    def encode(
+        self,
+        val: Union[np.ndarray, torch.Tensor],
+        *,
+        out: Optional[torch.Tensor] = None,
+    ) -> torch.Tensor:
         if not isinstance(val, torch.Tensor):
-            val = torch.tensor(val, device=self.device)
+            val = torch.as_tensor(val, device=self.device)
 
         x = []
         for v, space in zip(val.unbind(-1), self.space):
@@ -1746,7 +1780,7 @@ class MultiOneHotDiscreteTensorSpec(OneHotDiscreteTensorSpec):
                     f"value {v} is greater than the allowed max {space.n}"
                 )
             x.append(super(MultiOneHotDiscreteTensorSpec, self).encode(v, space))
-        return torch.cat(x, -1)
+        return torch.cat(x, -1, out=out)
 
     def _split(self, val: torch.Tensor) -> Optional[torch.Tensor]:
         split_sizes = [space.n for space in self.space]
@@ -2637,7 +2671,34 @@ class CompositeSpec(TensorSpec):
             raise AttributeError(f"CompositeSpec has no key {key}")
         del self._specs[key]
 
-    def encode(self, vals: Dict[str, Any]) -> Dict[str, torch.Tensor]:
+    def encode(
+        self, vals: Dict[str, Any], *, out: Optional[TensorDictBase] = None
+    ) -> Dict[str, torch.Tensor]:
+        """Encodes a dictionary of values given the specs.
+
+        Args:
+            vals (dict): the values to be encoded, indexed by spec keys.
+
+        Keyword Args:
+            out (TensorDictBase, optional): if provided, each value is written
+                in place in the matching entry of this preallocated tensordict
+                (e.g. a shared-memory buffer), which is then returned.
+
+        """
+        if out is not None:
+            for key, item in vals.items():
+                if item is None:
+                    raise RuntimeError(
+                        "CompositeSpec.encode cannot be used with missing values."
+                    )
+                try:
+                    spec = self[key]
+                except KeyError:
+                    raise KeyError(
+                        f"The CompositeSpec instance with keys {self.keys()} does not have a '{key}' key."
+                    )
+                spec.encode(item, out=out.get(key))
+            return out
         if isinstance(vals, TensorDict):
             out = vals.select()  # create and empty tensordict similar to vals
         else:
@@ -24,7 +24,7 @@ from torchrl.data.tensor_specs import (
     UnboundedContinuousTensorSpec,
 )
 from torchrl.data.utils import DEVICE_TYPING
-from torchrl.envs.utils import get_available_libraries, step_mdp
+from torchrl.envs.utils import _StepMDP, get_available_libraries
 
 LIBRARIES = get_available_libraries()
 
@@ -33,6 +33,22 @@ def _tensor_to_np(t):
     return t.detach().cpu().numpy()
 
 
+def _make_rollout_buffer(tensordict: TensorDictBase, max_steps: int) -> TensorDictBase:
+    """Allocates a zero-filled tensordict that can hold ``max_steps`` copies of ``tensordict`` along a new time dimension."""
+    batch_size = tensordict.batch_size
+    ndim = len(batch_size)
+
+    def _zeros(tensor):
+        # entries missing at some step are left to zero rather than garbage
+        return torch.zeros(
+            (*batch_size, max_steps, *tensor.shape[ndim:]),
+            dtype=tensor.dtype,
+            device=tensor.device,
+        )
+
+    return tensordict.apply(_zeros, batch_size=[*batch_size, max_steps])
+
+
 dtype_map = {
     torch.float: np.float32,
     torch.double: np.float64,
@@ -131,6 +147,11 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
             will be compared against their respective spec and an exception
             will be raised if they don't match.
             Defaults to False.
+        - trusted_step (bool): if ``True``, the next call to :meth:`step` is
+            fully validated and the following ones skip the per-step checks
+            (input shape assertion, tensordict locking, output checks and,
+            if the first step did not need it, reward and done reshaping).
+            Defaults to False.
 
     Methods:
         step (TensorDictBase -> TensorDictBase): step in the environment
@@ -176,6 +197,10 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
         cls._device = None
         # cached in_keys to be excluded from update when calling step
         cls._cache_in_keys = None
+        # see EnvBase.trusted_step
+        cls._trusted_step = False
+        cls._trusted_step_validated = False
+        cls._trusted_step_reshape = True
         return super().__new__(cls)
 
     def __setattr__(self, key, value):
@@ -207,6 +232,31 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
     def run_type_checks(self, run_type_checks: bool) -> None:
         self._run_type_checks = run_type_checks
 
+    @property
+    def trusted_step(self) -> bool:
+        """Whether :meth:`step` can skip its per-step validation.
+
+        Once set to ``True``, the next call to :meth:`step` goes through all
+        the usual checks. If it succeeds, the following calls directly write
+        the output of :meth:`_step` in the input tensordict. Setting this
+        property (to ``True`` or ``False``) discards any previous validation.
+        The specs themselves can be checked beforehand with
+        :func:`~torchrl.envs.utils.check_env_specs`.
+
+        Examples:
+            >>> env = GymEnv("Pendulum-v1")
+            >>> check_env_specs(env)
+            >>> env.trusted_step = True
+            >>> td = env.rollout(1000)  # only the first step is validated
+        """
+        return self._trusted_step
+
+    @trusted_step.setter
+    def trusted_step(self, value: bool) -> None:
+        self._trusted_step = value
+        self._trusted_step_validated = False
+        self._trusted_step_reshape = True
+
     @property
     def batch_size(self) -> TensorSpec:
         if ("_batch_size" not in self.__dir__()) and (
@@ -371,6 +421,8 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
             (+ others if needed).
 
         """
+        if self._trusted_step_validated:
+            return self._step_trusted(tensordict)
         # sanity check
         self._assert_tensordict_shape(tensordict)
 
@@ -392,6 +444,46 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
             )
         tensordict.unlock_()
 
+        reshaped = self._reshape_reward_and_done(next_tensordict_out)
+
+        tensordict_out.set("next", next_tensordict_out)
+
+        if self.run_type_checks:
+            for key in self._select_observation_keys(tensordict_out):
+                obs = tensordict_out.get(key)
+                self.observation_spec.type_check(obs, key)
+
+            if next_tensordict_out.get("reward").dtype is not self.reward_spec.dtype:
+                raise TypeError(
+                    f"expected reward.dtype to be {self.reward_spec.dtype} "
+                    f"but got {tensordict_out.get('reward').dtype}"
+                )
+
+            if next_tensordict_out.get("done").dtype is not self.done_spec.dtype:
+                raise TypeError(
+                    f"expected done.dtype to be torch.bool but got {tensordict_out.get('done').dtype}"
+                )
+        # tensordict could already have a "next" key
+        tensordict.update(tensordict_out)
+
+        if self._trusted_step:
+            # this step passed all the checks: the next ones can skip them
+            self._trusted_step_validated = True
+            self._trusted_step_reshape = reshaped
+        return tensordict
+
+    def _step_trusted(self, tensordict: TensorDictBase) -> TensorDictBase:
+        tensordict_out = self._step(tensordict)
+        if self._trusted_step_reshape:
+            self._reshape_reward_and_done(tensordict_out.get("next"))
+        tensordict.update(tensordict_out)
+        return tensordict
+
+    def _reshape_reward_and_done(self, next_tensordict_out: TensorDictBase) -> bool:
+        """Reshapes the reward and done entries to match their specs, if needed.
+
+        Returns ``True`` if any of them had to be reshaped.
+        """
         # TODO: Refactor this using reward spec
         reward = next_tensordict_out.get("reward")
         # unsqueeze rewards if needed
@@ -404,6 +496,7 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
             if dims
             else next_tensordict_out.shape
         )
+        reshaped = False
         expected_reward_shape = torch.Size(
             [*leading_batch_size, *self.reward_spec.shape]
         )
@@ -411,6 +504,7 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
         if actual_reward_shape != expected_reward_shape:
             reward = reward.view(expected_reward_shape)
             next_tensordict_out.set("reward", reward)
+            reshaped = True
 
         # TODO: Refactor this using done spec
         done = next_tensordict_out.get("done")
@@ -420,28 +514,8 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
         if actual_done_shape != expected_done_shape:
             done = done.view(expected_done_shape)
             next_tensordict_out.set("done", done)
-
-        tensordict_out.set("next", next_tensordict_out)
-
-        if self.run_type_checks:
-            for key in self._select_observation_keys(tensordict_out):
-                obs = tensordict_out.get(key)
-                self.observation_spec.type_check(obs, key)
-
-            if next_tensordict_out.get("reward").dtype is not self.reward_spec.dtype:
-                raise TypeError(
-                    f"expected reward.dtype to be {self.reward_spec.dtype} "
-                    f"but got {tensordict_out.get('reward').dtype}"
-                )
-
-            if next_tensordict_out.get("done").dtype is not self.done_spec.dtype:
-                raise TypeError(
-                    f"expected done.dtype to be torch.bool but got {tensordict_out.get('done').dtype}"
-                )
-        # tensordict could already have a "next" key
-        tensordict.update(tensordict_out)
-
-        return tensordict
+            reshaped = True
+        return reshaped
 
     def _get_in_keys_to_exclude(self, tensordict):
         if self._cache_in_keys is None:
@@ -641,6 +715,7 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
         break_when_any_done: bool = True,
         return_contiguous: bool = True,
         tensordict: Optional[TensorDictBase] = None,
+        preallocate: bool = False,
     ) -> TensorDictBase:
         """Executes a rollout in the environment.
 
@@ -664,6 +739,16 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
             return_contiguous (bool): if False, a LazyStackedTensorDict will be returned. Default is True.
             tensordict (TensorDict, optional): if auto_reset is False, an initial
                 tensordict must be provided.
+            preallocate (bool, optional): if ``True``, a ``[*batch_size, max_steps]``
+                output tensordict is allocated once the first step has been
+                executed and each subsequent step is written in place in it,
+                instead of cloning every step and stacking the results at the end.
+                This halves the peak memory of the rollout and removes the
+                per-step allocations. If the rollout stops early, the executed
+                steps are copied in a new tensordict, unless
+                ``return_contiguous=False`` in which case a view on them is
+                returned. Entries missing from some steps are filled with zeros.
+                Default is ``False``.
 
         Returns:
             TensorDict object containing the resulting trajectory.
@@ -782,7 +867,9 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
                 self.rand_action(td)
                 return td
 
+        _step_mdp = _StepMDP(keep_other=True, exclude_action=False)
         tensordicts = []
+        out_td = None
         for i in range(max_steps):
             if auto_cast_to_device:
                 tensordict = tensordict.to(policy_device)
@@ -791,7 +878,16 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
                 tensordict = tensordict.to(env_device)
             tensordict = self.step(tensordict)
 
-            tensordicts.append(tensordict.clone())
+            if preallocate:
+                if out_td is None:
+                    out_td = _make_rollout_buffer(tensordict, max_steps)
+                    out_keys = list(out_td.keys(True, True))
+                # keys that appear after the first step (e.g. "_reset") are
+                # not recorded, as they would not be stacked either
+                step_index = (slice(None),) * tensordict.batch_dims + (i,)
+                out_td[step_index] = tensordict.select(*out_keys, strict=False)
+            else:
+                tensordicts.append(tensordict.clone())
             done = tensordict.get(("next", "done"))
             truncated = tensordict.get(
                 ("next", "truncated"),
@@ -800,11 +896,7 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
             done = done | truncated
             if (break_when_any_done and done.any()) or i == max_steps - 1:
                 break
-            tensordict = step_mdp(
-                tensordict,
-                keep_other=True,
-                exclude_action=False,
-            )
+            tensordict = _step_mdp(tensordict)
             if not break_when_any_done and done.any():
                 _reset = done.clone()
                 tensordict.set("_reset", _reset)
@@ -815,6 +907,15 @@ class EnvBase(nn.Module, metaclass=abc.ABCMeta):
 
         batch_size = self.batch_size if tensordict is None else tensordict.batch_size
 
+        if preallocate:
+            if i < max_steps - 1:
+                out_td = out_td[(slice(None),) * len(batch_size) + (slice(i + 1),)]
+                if return_contiguous:
+                    # do not keep the unused steps alive through the view
+                    out_td = out_td.clone()
+            out_td.refine_names(..., "time")
+            return out_td
+
         out_td = torch.stack(tensordicts, len(batch_size))
         out_td.refine_names(..., "time")
         if return_contiguous:
@@ -1649,6 +1649,7 @@ class ObservationNorm(ObservationTransform):
     """
 
     _ERR_INIT_MSG = "Cannot have an mixed initialized and uninitialized loc and scale"
+    _STATS_BUFFERS = ("_stats_count", "_stats_mean", "_stats_m2")
 
     def __init__(
         self,
@@ -1707,6 +1708,8 @@ class ObservationNorm(ObservationTransform):
         cat_dim: Optional[int] = None,
         key: Optional[str] = None,
         keep_dims: Optional[Tuple[int]] = None,
+        collector: Optional["DataCollectorBase"] = None,  # noqa: F821
+        chunk_size: Optional[int] = None,
     ) -> None:
         """Initializes the loc and scale stats of the parent environment.
 
@@ -1716,6 +1719,9 @@ class ObservationNorm(ObservationTransform):
         deviation of a Gaussian distribution fitted on data generated randomly with
         the parent environment for a given number of steps.
 
+        The statistics are accumulated chunk by chunk (see :meth:`~.update_stats`),
+        such that only one chunk of data is kept in memory at any time.
+
         Args:
             num_iter (int): number of random iterations to run in the environment.
             reduce_dim (int or tuple of int, optional): dimension to compute the mean and std over.
@@ -1730,6 +1736,14 @@ class ObservationNorm(ObservationTransform):
                 For instance, one may want the location and scale to have shape [C, 1, 1]
                 when normalizing a 3D tensor over the last two dimensions, but not the
                 third. Defaults to None.
+            collector (DataCollectorBase, optional): if provided, the data will be
+                gathered from the batches yielded by the collector rather than
+                from rollouts of the parent environment. The collector must not
+                execute this transform. ``reduce_dim`` must match the layout of
+                the collected batches.
+            chunk_size (int, optional): maximum number of steps of each rollout
+                of the parent environment. Smaller values bound the memory used
+                to compute the statistics. Defaults to ``num_iter``.
 
         """
         if cat_dim is None:
@@ -1761,21 +1775,85 @@ class ObservationNorm(ObservationTransform):
                     "while a parent ObservationNorm transform is still uninitialized"
                 )
 
-        parent = self.parent
-        if parent is None:
-            raise RuntimeError(
-                "Cannot initialize the transform if parent env is not defined."
-            )
-        parent.apply(raise_initialization_exception)
+        if collector is None:
+            parent = self.parent
+            if parent is None:
+                raise RuntimeError(
+                    "Cannot initialize the transform if parent env is not defined."
+                )
+            parent.apply(raise_initialization_exception)
+
+            def rollouts():
+                max_steps = num_iter if chunk_size is None else chunk_size
+                while True:
+                    yield parent.rollout(max_steps=max_steps)
+
+            data_iterator = rollouts()
+        else:
+            data_iterator = iter(collector)
 
+        # the statistics are accumulated over chunks, which is equivalent to
+        # reducing the concatenation of the chunks along cat_dim
+        self.reset_stats()
         collected_frames = 0
-        data = []
-        while collected_frames < num_iter:
-            tensordict = parent.rollout(max_steps=num_iter)
+        for tensordict in data_iterator:
             collected_frames += tensordict.numel()
-            data.append(tensordict.get(key))
+            self._accumulate_stats(
+                tensordict.get(key), reduce_dim=reduce_dim, keep_dims=keep_dims
+            )
+            if collected_frames >= num_iter:
+                break
+        self._set_loc_scale_from_stats()
+
+    def update_stats(
+        self,
+        data: Union[torch.Tensor, TensorDictBase],
+        reduce_dim: Union[int, Tuple[int]] = 0,
+        key: Optional[str] = None,
+        keep_dims: Optional[Tuple[int]] = None,
+    ) -> None:
+        """Refines the loc and scale stats with a new chunk of data.
+
+        The statistics are accumulated with Welford's algorithm, such that
+        successive calls result in the same loc and scale as a single call over
+        the concatenated chunks. The running statistics are registered as buffers
+        and can be saved and restored through :meth:`~.state_dict`.
+
+        Args:
+            data (torch.Tensor or TensorDictBase): the un-normalized data. If a
+                tensordict is passed, the data will be read from ``key``.
+            reduce_dim (int or tuple of int, optional): dimension to compute the mean and std over.
+                Defaults to 0.
+            key (str, optional): the key to read from the tensordict. Defaults to
+                the first key in :obj:`ObservationNorm.in_keys`.
+            keep_dims (tuple of int, optional): the dimensions to keep in the loc and scale.
+                See :meth:`~.init_stats`.
+
+        Examples:
+            >>> transform = ObservationNorm(in_keys=["obs"], standard_normal=True)
+            >>> for _ in range(10):
+            ...     transform.update_stats(torch.randn(100, 3) * 2 + 1)
+            >>> transform.loc, transform.scale  # close to (1, 2)
+
+        """
+        if isinstance(data, TensorDictBase):
+            if len(self.in_keys) > 1 and key is None:
+                raise RuntimeError(
+                    "Transform has multiple in_keys but no specific key was passed as an argument"
+                )
+            data = data.get(self.in_keys[0] if key is None else key)
+        self._accumulate_stats(data, reduce_dim=reduce_dim, keep_dims=keep_dims)
+        self._set_loc_scale_from_stats()
 
-        data = torch.cat(data, cat_dim)
+    def reset_stats(self) -> None:
+        """Discards the running statistics accumulated by :meth:`~.update_stats`.
+
+        The current loc and scale are left untouched.
+        """
+        for name in self._STATS_BUFFERS:
+            self._buffers.pop(name, None)
+
+    def _accumulate_stats(self, data, reduce_dim, keep_dims) -> None:
         if isinstance(reduce_dim, int):
             reduce_dim = [reduce_dim]
         if keep_dims is not None:
@@ -1783,13 +1861,38 @@ class ObservationNorm(ObservationTransform):
                 raise ValueError("keep_dim elements must be part of reduce_dim list.")
         else:
             keep_dims = []
-        loc = data.mean(reduce_dim, keepdim=True)
-        scale = data.std(reduce_dim, keepdim=True)
+        batch_var, batch_mean = torch.var_mean(
+            data, reduce_dim, unbiased=False, keepdim=True
+        )
+        batch_count = data.numel() // batch_mean.numel()
         for r in sorted(reduce_dim, reverse=True):
             if r not in keep_dims:
-                loc = loc.squeeze(r)
-                scale = scale.squeeze(r)
+                batch_mean = batch_mean.squeeze(r)
+                batch_var = batch_var.squeeze(r)
+        batch_m2 = batch_var.mul_(batch_count)
+
+        if "_stats_count" not in self._buffers:
+            self.register_buffer(
+                "_stats_count",
+                torch.zeros((), dtype=batch_mean.dtype, device=batch_mean.device),
+            )
+            self.register_buffer("_stats_mean", torch.zeros_like(batch_mean))
+            self.register_buffer("_stats_m2", torch.zeros_like(batch_m2))
+        _welford_update_(
+            self._stats_count,
+            self._stats_mean,
+            self._stats_m2,
+            batch_count,
+            batch_mean,
+            batch_m2,
+        )
 
+    def _set_loc_scale_from_stats(self) -> None:
+        if "_stats_count" not in self._buffers:
+            raise RuntimeError("No data has been collected to compute the stats.")
+        loc = self._stats_mean
+        # unbiased estimator, as torch.std
+        scale = (self._stats_m2 / (self._stats_count - 1).clamp_min(1)).sqrt()
         if not self.standard_normal:
             scale = 1 / scale.clamp_min(self.eps)
             loc = -loc * scale
@@ -1798,11 +1901,62 @@ class ObservationNorm(ObservationTransform):
             raise RuntimeError("Non-finite values found in loc")
         if not torch.isfinite(scale).all():
             raise RuntimeError("Non-finite values found in scale")
-        self.loc.materialize(shape=loc.shape, dtype=loc.dtype)
+        if not self.initialized:
+            self.loc.materialize(shape=loc.shape, dtype=loc.dtype)
+            self.scale.materialize(shape=scale.shape, dtype=scale.dtype)
         self.loc.copy_(loc)
-        self.scale.materialize(shape=scale.shape, dtype=scale.dtype)
         self.scale.copy_(scale.clamp_min(self.eps))
 
+    def _save_to_state_dict(self, destination, prefix, keep_vars):
+        # uninitialized loc and scale cannot be detached: they are not saved
+        if self.initialized:
+            return super()._save_to_state_dict(destination, prefix, keep_vars)
+        loc, scale = self._buffers.pop("loc"), self._buffers.pop("scale")
+        try:
+            super()._save_to_state_dict(destination, prefix, keep_vars)
+        finally:
+            self._buffers["loc"] = loc
+            self._buffers["scale"] = scale
+
+    def _load_from_state_dict(
+        self,
+        state_dict,
+        prefix,
+        local_metadata,
+        strict,
+        missing_keys,
+        unexpected_keys,
+        error_msgs,
+    ):
+        uninitialized = not self.initialized
+        if uninitialized and prefix + "loc" in state_dict:
+            for name in ("loc", "scale"):
+                value = state_dict[prefix + name]
+                getattr(self, name).materialize(shape=value.shape, dtype=value.dtype)
+            uninitialized = False
+        if prefix + "_stats_count" in state_dict:
+            for name in self._STATS_BUFFERS:
+                value = state_dict[prefix + name]
+                buffer = self._buffers.get(name)
+                if buffer is None or buffer.shape != value.shape:
+                    self.register_buffer(name, torch.empty_like(value))
+        else:
+            self.reset_stats()
+        super()._load_from_state_dict(
+            state_dict,
+            prefix,
+            local_metadata,
+            strict,
+            missing_keys,
+            unexpected_keys,
+            error_msgs,
+        )
+        if uninitialized:
+            # an uninitialized transform can load the state of another uninitialized one
+            for name in ("loc", "scale"):
+                if prefix + name in missing_keys:
+                    missing_keys.remove(prefix + name)
+
     def _apply_transform(self, obs: torch.Tensor) -> torch.Tensor:
         if not self.initialized:
             raise RuntimeError(
@@ -1883,6 +2037,12 @@ class CatFrames(ObservationTransform):
             has to be written. Defaults to the value of `in_keys`.
         padding (str, optional): the padding method. One of ``"same"`` or ``"zeros"``.
             Defaults to ``"same"``, ie. the first value is uesd for padding.
+        ring_buffer (bool, optional): if ``True``, the frames are stored in a
+            ring buffer: at each step, only the new frame is written in place of
+            the oldest one and the ordered stack is obtained with a single
+            gather. Otherwise, the whole buffer is shifted at each step and
+            copied to the output. Both modes produce identical outputs.
+            Defaults to ``False``.
 
     Examples:
         >>> from torchrl.envs.libs.gym import GymEnv
@@ -1955,11 +2115,16 @@ class CatFrames(ObservationTransform):
         in_keys: Optional[Sequence[str]] = None,
         out_keys: Optional[Sequence[str]] = None,
         padding="same",
+        ring_buffer: bool = False,
     ):
         if in_keys is None:
             in_keys = IMAGE_KEYS
         super().__init__(in_keys=in_keys, out_keys=out_keys)
         self.N = N
+        self.ring_buffer = ring_buffer
+        # index of the slot holding the oldest frame in ring-buffer mode. All
+        # the buffers (and all the envs) are written in lockstep.
+        self._ring_cursor = 0
         if dim > 0:
             raise ValueError(self._CAT_DIM_ERR)
         self.dim = dim
@@ -2043,6 +2208,9 @@ class CatFrames(ObservationTransform):
                 else:
                     # make linter happy. An exception has already been raised
                     raise NotImplementedError
+            if self.ring_buffer:
+                tensordict.set(out_key, self._ring_write(buffer, data, d))
+                continue
             buffer.copy_(torch.roll(buffer, shifts=-d, dims=self.dim))
             # add new obs
             idx = self.dim
@@ -2054,9 +2222,20 @@ class CatFrames(ObservationTransform):
             buffer[idx].copy_(data)
             # add to tensordict
             tensordict.set(out_key, buffer.clone())
+        if self.ring_buffer:
+            self._ring_cursor = (self._ring_cursor + 1) % self.N
         self._just_reset = False
         return tensordict
 
+    def _ring_write(self, buffer, data, d):
+        # the new frame replaces the oldest one...
+        cursor = self._ring_cursor
+        buffer.narrow(self.dim, cursor * d, d).copy_(data)
+        # ... and the frames are read from the next oldest one onwards
+        index = torch.arange(self.N * d, device=buffer.device)
+        index = (index + (cursor + 1) * d) % (self.N * d)
+        return buffer.index_select(self.dim, index)
+
     @_apply_to_composite
     def transform_observation_spec(self, observation_spec: TensorSpec) -> TensorSpec:
         space = observation_spec.space
@@ -2906,6 +3085,24 @@ def _sum_left(val, dest):
     return val
 
 
+def _welford_update_(count, mean, m2, batch_count, batch_mean, batch_m2, decay=1.0):
+    """Merges the statistics of a batch in running statistics, in-place.
+
+    ``m2`` is the sum of squared deviations from the mean. Follows the parallel
+    algorithm of Chan et al., such that merging batches one at a time gives the
+    same result as computing the statistics over their concatenation. The
+    running statistics are discounted by ``decay`` first.
+    """
+    if decay != 1.0:
+        count.mul_(decay)
+        m2.mul_(decay)
+    weight = batch_count / (count + batch_count)
+    delta = batch_mean - mean
+    mean.addcmul_(delta, weight)
+    m2.add_(batch_m2).addcmul_(delta.pow_(2), count * weight)
+    count.add_(batch_count)
+
+
 class gSDENoise(TensorDictPrimer):
     """A gSDE noise initializer.
 
@@ -2946,6 +3143,16 @@ class VecNorm(Transform):
     To use VecNorm at inference time and avoid updating the values with the new
     observations, one should substitute this layer by `vecnorm.to_observation_norm()`.
 
+    Sharing a single set of statistics requires every process to hold the
+    lock while updating them. With ``num_workers`` set, the statistics are
+    instead accumulated in ``num_workers`` separate slots (count, mean and sum
+    of squared deviations): each VecNorm instance claims a slot at its first
+    call and then only writes to that slot, without locking. The slots are
+    merged with the parallel algorithm of Chan et al. whenever the
+    normalization constants are needed. When the transform is built through
+    an :class:`~torchrl.envs.EnvCreator`, the shadow environment created at
+    initialization claims one of the slots.
+
     Args:
         in_keys (iterable of str, optional): keys to be updated.
             default: ["observation", "reward"]
@@ -2962,6 +3169,10 @@ class VecNorm(Transform):
             If not, the feature dimensions of the entry (ie all dims that do
             not belong to the tensordict batch-size) will be considered as
             feature dimension.
+        num_workers (int, optional): if provided, the number of processes that
+            will share the statistics, each of them accumulating in its own
+            slot. Defaults to ``None`` (a single set of statistics updated
+            under the lock).
 
     Examples:
         >>> from torchrl.envs.libs.gym import GymEnv
@@ -2990,6 +3201,7 @@ class VecNorm(Transform):
         decay: float = 0.9999,
         eps: float = 1e-4,
         shapes: List[torch.Size] = None,
+        num_workers: Optional[int] = None,
     ) -> None:
         if lock is None:
             lock = mp.Lock()
@@ -3003,13 +3215,12 @@ class VecNorm(Transform):
             raise RuntimeError(
                 "shared_td must be either in shared memory or a memmap " "tensordict."
             )
+        stat_names = (
+            ("_count", "_mean", "_m2") if num_workers else ("_sum", "_ssq", "_count")
+        )
         if shared_td is not None:
             for key in in_keys:
-                if (
-                    (key + "_sum" not in shared_td.keys())
-                    or (key + "_ssq" not in shared_td.keys())
-                    or (key + "_count" not in shared_td.keys())
-                ):
+                if any(key + name not in shared_td.keys() for name in stat_names):
                     raise KeyError(
                         f"key {key} not present in the shared tensordict "
                         f"with keys {shared_td.keys()}"
@@ -3019,6 +3230,9 @@ class VecNorm(Transform):
         self.decay = decay
         self.shapes = shapes
         self.eps = eps
+        self.num_workers = num_workers
+        self._slot = None
+        self._slot_stats = {}
 
     def _key_str(self, key):
         if not isinstance(key, str):
@@ -3026,6 +3240,8 @@ class VecNorm(Transform):
         return key
 
     def _call(self, tensordict: TensorDictBase) -> TensorDictBase:
+        if self.num_workers:
+            return self._call_slot(tensordict)
         if self.lock is not None:
             self.lock.acquire()
 
@@ -3045,11 +3261,48 @@ class VecNorm(Transform):
 
         return tensordict
 
+    def _call_slot(self, tensordict: TensorDictBase) -> TensorDictBase:
+        for key in self.in_keys:
+            if key not in tensordict.keys(include_nested=True):
+                continue
+            key_str = self._key_str(key)
+            if key_str not in self._slot_stats:
+                # the lock is only needed to create the statistics and claim a slot
+                if self.lock is not None:
+                    self.lock.acquire()
+                try:
+                    self._init(tensordict, key)
+                    if self._slot is None:
+                        self._claim_slot()
+                finally:
+                    if self.lock is not None:
+                        self.lock.release()
+                # views on the slot of this instance, cached to avoid lookups
+                self._slot_stats[key_str] = tuple(
+                    self._td.get(key_str + name)[self._slot]
+                    for name in ("_count", "_mean", "_m2")
+                )
+            new_val = self._update_slot(key_str, tensordict.get(key))
+            tensordict.set(key, new_val)
+        return tensordict
+
+    def _claim_slot(self) -> None:
+        claimed = self._td.get("_claimed")
+        free = (~claimed).nonzero()
+        if not free.numel():
+            raise RuntimeError(
+                f"All the {self.num_workers} VecNorm statistics slots have been "
+                f"claimed. Increase num_workers to the number of VecNorm "
+                f"instances sharing these statistics."
+            )
+        self._slot = int(free[0])
+        claimed[self._slot] = True
+
     forward = _call
 
     def _init(self, tensordict: TensorDictBase, key: str) -> None:
         key_str = self._key_str(key)
-        if self._td is None or key_str + "_sum" not in self._td.keys():
+        if self._td is None or key_str + "_count" not in self._td.keys():
             if key is not key_str and key_str in tensordict.keys():
                 raise RuntimeError(
                     f"Conflicting key names: {key_str} from VecNorm and input tensordict keys."
@@ -3088,8 +3341,30 @@ class VecNorm(Transform):
                     + "_count": torch.zeros(1, device=item.device, dtype=torch.float)
                 }
             )
+            batch_size = []
+            if self.num_workers:
+                # one (count, mean, m2) accumulator per slot
+                num_workers = self.num_workers
+                batch_size = [num_workers]
+                d = {
+                    key_str + "_count": d[key_str + "_count"].expand(num_workers, 1),
+                    key_str
+                    + "_mean": d[key_str + "_sum"].expand(
+                        num_workers, *d[key_str + "_sum"].shape
+                    ),
+                    key_str
+                    + "_m2": d[key_str + "_ssq"].expand(
+                        num_workers, *d[key_str + "_ssq"].shape
+                    ),
+                    "_claimed": torch.zeros(
+                        num_workers, dtype=torch.bool, device=item.device
+                    ),
+                }
+                d = {key: value.clone() for key, value in d.items()}
+                if self._td is not None and "_claimed" in self._td.keys():
+                    del d["_claimed"]
             if self._td is None:
-                self._td = TensorDict(d, batch_size=[])
+                self._td = TensorDict(d, batch_size=batch_size)
             else:
                 self._td.update(d)
         else:
@@ -3097,49 +3372,57 @@ class VecNorm(Transform):
 
     def _update(self, key, value, N) -> torch.Tensor:
         key = self._key_str(key)
+        # the statistics are updated in-place in the (possibly shared) tensordict
         _sum = self._td.get(key + "_sum")
+        _sum.mul_(self.decay).add_(_sum_left(value, _sum))
         _ssq = self._td.get(key + "_ssq")
+        _ssq.mul_(self.decay).add_(_sum_left(value.pow(2), _ssq))
         _count = self._td.get(key + "_count")
+        _count.mul_(self.decay).add_(N)
 
-        _sum = self._td.get(key + "_sum")
-        value_sum = _sum_left(value, _sum)
-        _sum *= self.decay
-        _sum += value_sum
-        self._td.set_(
-            key + "_sum",
-            _sum,
-        )
-
-        _ssq = self._td.get(key + "_ssq")
-        value_ssq = _sum_left(value.pow(2), _ssq)
-        _ssq *= self.decay
-        _ssq += value_ssq
-        self._td.set_(
-            key + "_ssq",
-            _ssq,
-        )
+        mean = _sum / _count
+        std = (_ssq / _count - mean.pow(2)).clamp_min(self.eps).sqrt()
+        return (value - mean) / std.clamp_min(self.eps)
 
-        _count = self._td.get(key + "_count")
-        _count *= self.decay
-        _count += N
-        self._td.set_(
-            key + "_count",
-            _count,
+    def _update_slot(self, key, value) -> torch.Tensor:
+        count, mean, m2 = self._slot_stats[key]
+        # decayed Welford update with the batch statistics (Chan et al.)
+        value_flat = value.reshape(-1, *mean.shape)
+        batch_count = value_flat.shape[0]
+        batch_mean = value_flat.mean(0)
+        batch_m2 = (value_flat - batch_mean).pow_(2).sum(0)
+        _welford_update_(
+            count, mean, m2, batch_count, batch_mean, batch_m2, decay=self.decay
         )
 
-        mean = _sum / _count
-        std = (_ssq / _count - mean.pow(2)).clamp_min(self.eps).sqrt()
+        mean, var = self._merged_stats(key)
+        std = var.clamp_min(self.eps).sqrt()
         return (value - mean) / std.clamp_min(self.eps)
 
+    def _merged_stats(self, key) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Merges the statistics of all the slots and returns their mean and variance."""
+        count = self._td.get(key + "_count")
+        mean = self._td.get(key + "_mean")
+        m2 = self._td.get(key + "_m2")
+        count = count.view(count.shape[0], *[1] * (mean.ndimension() - 1))
+        total_count = count.sum(0)
+        total_mean = (count * mean).sum(0) / total_count
+        total_m2 = m2.sum(0) + (count * (mean - total_mean).pow(2)).sum(0)
+        return total_mean, total_m2 / total_count
+
     def to_observation_norm(self) -> Union[Compose, ObservationNorm]:
         """Converts VecNorm into an ObservationNorm class that can be used at inference time."""
         out = []
         for key in self.in_keys:
-            _sum = self._td.get(key + "_sum")
-            _ssq = self._td.get(key + "_ssq")
-            _count = self._td.get(key + "_count")
-            mean = _sum / _count
-            std = (_ssq / _count - mean.pow(2)).clamp_min(self.eps).sqrt()
+            if self.num_workers:
+                mean, var = self._merged_stats(key)
+                std = var.clamp_min(self.eps).sqrt()
+            else:
+                _sum = self._td.get(key + "_sum")
+                _ssq = self._td.get(key + "_ssq")
+                _count = self._td.get(key + "_count")
+                mean = _sum / _count
+                std = (_ssq / _count - mean.pow(2)).clamp_min(self.eps).sqrt()
 
             _out = ObservationNorm(
                 loc=mean,
@@ -3236,6 +3519,9 @@ class VecNorm(Transform):
                 "Only shared tensordicts can be set in VecNorm transforms"
             )
         self._td = td
+        # slots are claimed on the tensordict in use
+        self._slot = None
+        self._slot_stats = {}
 
     def __repr__(self) -> str:
         return (
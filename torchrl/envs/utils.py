@@ -16,7 +16,7 @@ from tensordict.nn.probabilistic import (  # noqa
     set_interaction_mode as set_exploration_mode,
     set_interaction_type as set_exploration_type,
 )
-from tensordict.tensordict import TensorDictBase
+from tensordict.tensordict import TensorDict, TensorDictBase
 
 __all__ = [
     "exploration_mode",
@@ -181,6 +181,157 @@ def step_mdp(
         return select_tensordict
 
 
+_FROM_ROOT = 0
+_FROM_NEXT = 1
+_MERGE = 2
+
+
+class _StepMDP:
+    """A reusable version of :func:`step_mdp` for loops where the tensordict structure rarely changes.
+
+    The mapping from the entries of the input tensordict and of its ``"next"``
+    entry to the entries of the output is computed once per tensordict
+    structure and cached. Subsequent calls only move the entries in a new
+    tensordict, without building intermediate tensordicts with ``select``,
+    ``exclude`` and ``update``. Nested entries that are present at the root
+    and in ``"next"`` are merged recursively with their own cached mapping.
+    When the structure of the input changes, a new mapping is computed.
+    Inputs that are not :class:`~tensordict.TensorDict` instances (e.g.
+    lazy stacks) or whose ``"next"`` entry lives on another device go
+    through :func:`step_mdp`.
+
+    Args:
+        keep_other (bool, optional): see :func:`step_mdp`. Defaults to ``True``.
+        exclude_reward (bool, optional): see :func:`step_mdp`. Defaults to ``True``.
+        exclude_done (bool, optional): see :func:`step_mdp`. Defaults to ``False``.
+        exclude_action (bool, optional): see :func:`step_mdp`. Defaults to ``True``.
+
+    Examples:
+        >>> from torchrl.envs import GymEnv
+        >>> env = GymEnv("Pendulum-v1")
+        >>> step_mdp_fn = _StepMDP()
+        >>> td = env.reset()
+        >>> for _ in range(10):
+        ...     td = step_mdp_fn(env.rand_step(td))
+    """
+
+    def __init__(
+        self,
+        keep_other: bool = True,
+        exclude_reward: bool = True,
+        exclude_done: bool = False,
+        exclude_action: bool = True,
+    ):
+        self.keep_other = keep_other
+        self.exclude_reward = exclude_reward
+        self.exclude_done = exclude_done
+        self.exclude_action = exclude_action
+        excluded = {
+            key
+            for key, exclude in (
+                ("action", exclude_action),
+                ("done", exclude_done),
+                ("reward", exclude_reward),
+            )
+            if exclude
+        }
+        self._root_excluded = excluded | {"next"}
+        self._next_excluded = excluded - {"action"}
+        self._other_keys = [
+            key for key in ("action", "done", "reward") if key not in excluded
+        ]
+        self._plans = {}
+
+    def __call__(
+        self,
+        tensordict: TensorDictBase,
+        next_tensordict: TensorDictBase = None,
+    ) -> TensorDictBase:
+        next_td = tensordict.get("next")
+        if (
+            type(tensordict) is not TensorDict
+            or type(next_td) is not TensorDict
+            or tensordict.device != next_td.device
+        ):
+            return step_mdp(
+                tensordict,
+                next_tensordict=next_tensordict,
+                keep_other=self.keep_other,
+                exclude_reward=self.exclude_reward,
+                exclude_done=self.exclude_done,
+                exclude_action=self.exclude_action,
+            )
+        out = self._merge(tensordict, next_td, self._plans, root=True)
+        if next_tensordict is not None:
+            return next_tensordict.update(out)
+        return out
+
+    def _build_plan(self, tensordict, next_td, root):
+        if not root:
+            keys = list(tensordict._tensordict)
+            next_keys = set(next_td._tensordict)
+        else:
+            if self.keep_other:
+                keys = [
+                    key
+                    for key in tensordict._tensordict
+                    if key not in self._root_excluded
+                ]
+            else:
+                keys = [
+                    key for key in self._other_keys if key in tensordict._tensordict
+                ]
+            next_keys = {
+                key for key in next_td._tensordict if key not in self._next_excluded
+            }
+        plan = []
+        for key in keys:
+            if key not in next_keys:
+                plan.append((key, _FROM_ROOT, None))
+            elif isinstance(tensordict._tensordict[key], TensorDictBase) and isinstance(
+                next_td._tensordict[key], TensorDictBase
+            ):
+                # entries present on both sides are merged, as update() would
+                plan.append((key, _MERGE, {}))
+            else:
+                plan.append((key, _FROM_NEXT, None))
+        kept_keys = set(keys)
+        for key in next_td._tensordict:
+            if key in next_keys and key not in kept_keys:
+                plan.append((key, _FROM_NEXT, None))
+        return plan
+
+    def _merge(self, tensordict, next_td, plans, root=False):
+        signature = (tuple(tensordict._tensordict), tuple(next_td._tensordict))
+        plan = plans.get(signature, None)
+        if plan is None:
+            plan = plans[signature] = self._build_plan(tensordict, next_td, root)
+        source = {}
+        root_source = tensordict._tensordict
+        next_source = next_td._tensordict
+        for key, origin, subplans in plan:
+            if origin == _FROM_ROOT:
+                source[key] = root_source[key]
+            elif origin == _FROM_NEXT:
+                source[key] = next_source[key]
+            else:
+                value = root_source[key]
+                next_value = next_source[key]
+                if type(value) is TensorDict and type(next_value) is TensorDict:
+                    source[key] = self._merge(value, next_value, subplans)
+                else:
+                    source[key] = value.clone(False).update(next_value)
+        return TensorDict(
+            source,
+            batch_size=tensordict.batch_size,
+            device=tensordict.device,
+            names=tensordict._names,
+            _run_checks=False,
+            _is_memmap=tensordict._is_memmap,
+            _is_shared=tensordict._is_shared,
+        )
+
+
 def get_available_libraries():
     """Returns all the supported libraries."""
     return SUPPORTED_LIBRARIES
@@ -36,6 +36,8 @@ from torchrl.envs.utils import _sort_keys
 
 
 _has_envpool = importlib.util.find_spec("envpool")
+# seconds between two checks of the workers' health while waiting for a step
+_WORKER_TIMEOUT = 10.0
 
 
 def _check_start(fun):
@@ -646,16 +648,63 @@ class ParallelEnv(_BatchedEnv):
 
     TensorDicts are passed via shared memory or memory map.
 
+    If the ``zero_copy`` keyword argument is set to ``True``, two sets of shared
+    tensordicts are used alternately from one step to the next. Workers are
+    triggered and report the completion of a step through shared semaphores
+    rather than pipe messages, and :meth:`~.step` and :meth:`~.reset`
+    return views on the shared buffers instead of clones. A tensordict returned
+    by :meth:`~.step` is therefore only valid until the step after the next one,
+    where its buffer is overwritten. This mode is only available on CPU.
+
+    Workers can also be stepped asynchronously with :meth:`~.step_send` and
+    :meth:`~.step_recv`: the latter returns the results of the first workers to
+    complete their step, along with their indices, such that slow environments
+    do not stall the others.
+
     """
 
     __doc__ += _BatchedEnv.__doc__
 
+    def __init__(self, *args, zero_copy: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        if zero_copy and not (self._share_memory or self._memmap):
+            raise ValueError(
+                "zero_copy requires the tensordicts to be placed in shared memory or memory map."
+            )
+        self._zero_copy = zero_copy
+
+    def _create_td(self) -> None:
+        super()._create_td()
+        if self._zero_copy:
+            buffer = (self.shared_tensordict_parent, self.shared_tensordicts)
+            super()._create_td()
+            self._shared_buffers = [
+                buffer,
+                (self.shared_tensordict_parent, self.shared_tensordicts),
+            ]
+            self._buffer_id = torch.ones((), dtype=torch.long).share_memory_()
+
+    def _swap_buffers(self) -> None:
+        buffer_id = 1 - self._buffer_id.item()
+        (
+            self.shared_tensordict_parent,
+            self.shared_tensordicts,
+        ) = self._shared_buffers[buffer_id]
+        self._buffer_id.fill_(buffer_id)
+
     def _start_workers(self) -> None:
         _num_workers = self.num_workers
         ctx = mp.get_context("spawn")
 
         self.parent_channels = []
         self._workers = []
+        self._pending_steps = set()
+        if self._zero_copy:
+            if self.device.type == "cuda":
+                raise RuntimeError("zero_copy is not supported on cuda devices.")
+            self._wake_signals = [ctx.Semaphore(0) for _ in range(_num_workers)]
+            self._pending_messages = [ctx.Value("i", 0) for _ in range(_num_workers)]
+            self._step_signals = [ctx.Semaphore(0) for _ in range(_num_workers)]
 
         for idx in range(_num_workers):
             if self._verbose:
@@ -678,19 +727,41 @@ class ParallelEnv(_BatchedEnv):
                     self.env_input_keys,
                     self.device,
                     self.allow_step_when_done,
+                    self._wake_signals[idx] if self._zero_copy else None,
+                    self._pending_messages[idx] if self._zero_copy else None,
+                    self._step_signals[idx] if self._zero_copy else None,
                 ),
             )
             w.daemon = True
             w.start()
             channel2.close()
+            if self._zero_copy:
+                channel1 = _SignaledChannel(
+                    channel1, self._wake_signals[idx], self._pending_messages[idx]
+                )
             self.parent_channels.append(channel1)
             self._workers.append(w)
 
         # send shared tensordict to workers
-        for channel, shared_tensordict in zip(
-            self.parent_channels, self.shared_tensordicts
-        ):
-            channel.send(("init", shared_tensordict))
+        if self._zero_copy:
+            (_, tensordicts0), (_, tensordicts1) = self._shared_buffers
+            for channel, shared_tensordict0, shared_tensordict1 in zip(
+                self.parent_channels, tensordicts0, tensordicts1
+            ):
+                channel.send(
+                    (
+                        "init",
+                        (
+                            (shared_tensordict0, shared_tensordict1),
+                            self._buffer_id,
+                        ),
+                    )
+                )
+        else:
+            for channel, shared_tensordict in zip(
+                self.parent_channels, self.shared_tensordicts
+            ):
+                channel.send(("init", shared_tensordict))
         self.is_closed = False
 
     @_check_start
@@ -722,6 +793,13 @@ class ParallelEnv(_BatchedEnv):
     @_check_start
     def _step(self, tensordict: TensorDictBase) -> TensorDictBase:
         self._assert_tensordict_shape(tensordict)
+        if self._pending_steps:
+            raise RuntimeError(
+                "Cannot step the environment synchronously while asynchronous "
+                "steps are pending. Call step_recv() first."
+            )
+        if self._zero_copy:
+            return self._step_zero_copy(tensordict)
 
         self.shared_tensordict_parent.update_(
             tensordict.select(*self.env_input_keys, strict=False)
@@ -742,12 +820,129 @@ class ParallelEnv(_BatchedEnv):
         # will be modified in-place at further steps
         return self.shared_tensordict_parent.select(*self._selected_step_keys).clone()
 
+    def _step_zero_copy(self, tensordict: TensorDictBase) -> TensorDictBase:
+        # the previous step output remains untouched in the other buffer
+        self._swap_buffers()
+        self.shared_tensordict_parent.update_(
+            tensordict.select(*self.env_input_keys, strict=False)
+        )
+        for wake_signal in self._wake_signals:
+            wake_signal.release()
+        for step_signal in self._step_signals:
+            while not step_signal.acquire(timeout=_WORKER_TIMEOUT):
+                _check_for_faulty_process(self._workers)
+        return self.shared_tensordict_parent.select(*self._selected_step_keys)
+
+    @_check_start
+    def step_send(
+        self,
+        tensordict: TensorDictBase,
+        env_ids: Optional[Union[Sequence[int], torch.Tensor]] = None,
+    ) -> None:
+        """Requests a step from some of the workers without waiting for the results.
+
+        The results are retrieved with :meth:`~.step_recv`.
+
+        Args:
+            tensordict (TensorDictBase): the input of the step (e.g. the actions),
+                with a leading dimension matching the number of workers to step.
+            env_ids (sequence of int or torch.Tensor, optional): the indices of
+                the workers to step. Defaults to all the workers.
+
+        .. note::
+          Unlike :meth:`~.step`, no check or post-processing is applied to the
+          data, and the output of the environment is not written in the input
+          tensordict.
+
+        Examples:
+            >>> env = ParallelEnv(4, lambda: GymEnv("Pendulum-v1"))
+            >>> td = env.reset()
+            >>> env.step_send(td.set("action", env.action_spec.rand()))
+            >>> # results of the two first workers to complete their step
+            >>> out, env_ids = env.step_recv(2)
+            >>> td = step_mdp(out).set("action", env.action_spec.rand()[env_ids])
+            >>> env.step_send(td, env_ids)
+
+        """
+        if self._zero_copy:
+            raise RuntimeError("Asynchronous steps are not supported with zero_copy.")
+        if env_ids is None:
+            env_ids = range(self.num_workers)
+        else:
+            env_ids = torch.as_tensor(env_ids).reshape(-1).tolist()
+        if len(env_ids) != tensordict.shape[0]:
+            raise RuntimeError(
+                f"Expected a tensordict with a leading dimension of {len(env_ids)}, "
+                f"got shape {tensordict.shape}."
+            )
+        tensordict = tensordict.select(*self.env_input_keys, strict=False)
+        for i, env_id in enumerate(env_ids):
+            if env_id in self._pending_steps:
+                raise RuntimeError(f"Worker {env_id} has a pending step.")
+            self.shared_tensordicts[env_id].update_(tensordict[i])
+            self.parent_channels[env_id].send(("step", None))
+            self._pending_steps.add(env_id)
+
+    @_check_start
+    def step_recv(
+        self, batch_size: Optional[int] = None
+    ) -> Tuple[TensorDictBase, torch.Tensor]:
+        """Waits for the results of the first workers to complete their pending step.
+
+        Args:
+            batch_size (int, optional): the number of results to return.
+                Defaults to the number of pending steps.
+
+        Returns:
+            a tensordict containing the ``"next"`` entries written by the workers,
+            with a leading dimension of size ``batch_size``, and the indices of
+            the corresponding workers.
+
+        """
+        if batch_size is None:
+            batch_size = len(self._pending_steps)
+        if not 0 < batch_size <= len(self._pending_steps):
+            raise RuntimeError(
+                f"Cannot receive {batch_size} results with {len(self._pending_steps)} pending steps."
+            )
+        channels = {self.parent_channels[i]: i for i in self._pending_steps}
+        env_ids = []
+        while len(env_ids) < batch_size:
+            ready = connection.wait(list(channels), timeout=_WORKER_TIMEOUT)
+            if not ready:
+                _check_for_faulty_process(self._workers)
+            for channel in ready[: batch_size - len(env_ids)]:
+                env_id = channels.pop(channel)
+                msg, data = channel.recv()
+                if msg != "step_result":
+                    raise RuntimeError(
+                        f"Expected 'step_result' but received {msg} from worker {env_id}"
+                    )
+                if data is not None:
+                    self.shared_tensordicts[env_id].update_(data)
+                self._pending_steps.remove(env_id)
+                env_ids.append(env_id)
+        out = torch.stack(
+            [
+                self.shared_tensordicts[env_id]
+                .select(*self._selected_step_keys, strict=False)
+                .clone()
+                for env_id in env_ids
+            ],
+            0,
+        )
+        if not self.share_individual_td:
+            out = out.contiguous()
+        return out, torch.tensor(env_ids, device=self.device)
+
     @_check_start
     def _shutdown_workers(self) -> None:
         if self.is_closed:
             raise RuntimeError(
                 "calling {self.__class__.__name__}._shutdown_workers only allowed when env.is_closed = False"
             )
+        if self._pending_steps:
+            self.step_recv()
         for i, channel in enumerate(self.parent_channels):
             if self._verbose:
                 print(f"closing {i}")
@@ -762,6 +957,9 @@ class ParallelEnv(_BatchedEnv):
                 )
 
         del self.shared_tensordicts, self.shared_tensordict_parent
+        if self._zero_copy:
+            del self._shared_buffers, self._wake_signals, self._pending_messages
+            del self._step_signals
 
         for channel in self.parent_channels:
             channel.close()
@@ -807,6 +1005,11 @@ class ParallelEnv(_BatchedEnv):
             else:
                 tensordict_ = None
             kwargs["tensordict"] = tensordict_
+            if i in self._pending_steps:
+                if _reset[i].any():
+                    raise RuntimeError(f"Cannot reset worker {i}: a step is pending.")
+                # the worker is writing in its tensordict
+                continue
             if not _reset[i].any():
                 self.shared_tensordicts[i].update_(
                     self.shared_tensordicts[i]["next"].select(
@@ -832,7 +1035,10 @@ class ParallelEnv(_BatchedEnv):
             if data is not None:
                 self.shared_tensordicts[i].update_(data)
 
-        return self.shared_tensordict_parent.select(*self._selected_reset_keys).clone()
+        out = self.shared_tensordict_parent.select(*self._selected_reset_keys)
+        if self._zero_copy:
+            return out
+        return out.clone()
 
     def __reduce__(self):
         if not self.is_closed:
@@ -883,6 +1089,32 @@ class ParallelEnv(_BatchedEnv):
         return self
 
 
+class _SignaledChannel:
+    """A pipe end that releases a semaphore for each message sent.
+
+    Workers of a zero-copy :class:`ParallelEnv` wait on this semaphore and
+    read the pipe only if a message has been announced in the shared
+    ``pending`` counter: any other release of the semaphore is a step request.
+
+    """
+
+    def __init__(self, channel: connection.Connection, signal, pending):
+        self.channel = channel
+        self.signal = signal
+        self.pending = pending
+
+    def send(self, obj: Any) -> None:
+        with self.pending.get_lock():
+            self.pending.value += 1
+        # the semaphore is released first as large messages may not fit in
+        # the pipe buffer before the worker starts reading them
+        self.signal.release()
+        self.channel.send(obj)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.channel, attr)
+
+
 def _recursively_strip_locks_from_state_dict(state_dict: OrderedDict) -> OrderedDict:
     return OrderedDict(
         **{
@@ -906,6 +1138,9 @@ def _run_worker_pipe_shared_mem(
     env_input_keys: Dict[str, Any],
     device: DEVICE_TYPING = "cpu",
     allow_step_when_done: bool = False,
+    wake_signal=None,
+    pending_messages=None,
+    step_signal=None,
     verbose: bool = False,
 ) -> None:
     parent_pipe.close()
@@ -927,12 +1162,29 @@ def _run_worker_pipe_shared_mem(
     # make sure that process can be closed
     tensordict = None
     _td = None
+    # zero-copy mode: the buffers used alternately and the index of the current one
+    buffers = None
+    buffer_id = None
 
     while True:
-        try:
-            cmd, data = child_pipe.recv()
-        except EOFError as err:
-            raise EOFError(f"proc {pid} failed, last command: {cmd}.") from err
+        if wake_signal is not None:
+            wake_signal.acquire()
+            with pending_messages.get_lock():
+                has_message = pending_messages.value > 0
+                if has_message:
+                    pending_messages.value -= 1
+            if buffers is not None:
+                tensordict = buffers[buffer_id.item()]
+            if not has_message:
+                # steps are requested through the semaphore only
+                cmd, data = "step", None
+        else:
+            has_message = True
+        if has_message:
+            try:
+                cmd, data = child_pipe.recv()
+            except EOFError as err:
+                raise EOFError(f"proc {pid} failed, last command: {cmd}.") from err
         if cmd == "seed":
             if not initialized:
                 raise RuntimeError("call 'init' before closing")
@@ -947,7 +1199,11 @@ def _run_worker_pipe_shared_mem(
             if initialized:
                 raise RuntimeError("worker already initialized")
             i = 0
-            tensordict = data
+            if step_signal is not None:
+                buffers, buffer_id = data
+                tensordict = buffers[buffer_id.item()]
+            else:
+                tensordict = data
             if not (tensordict.is_shared() or tensordict.is_memmap()):
                 raise RuntimeError(
                     "tensordict must be placed in shared memory (share_memory_() or memmap_())"
@@ -994,7 +1250,10 @@ def _run_worker_pipe_shared_mem(
             if pin_memory:
                 _td.pin_memory()
             msg = "step_result"
-            if not is_cuda:
+            if step_signal is not None:
+                tensordict.update_(_td.select("next"))
+                step_signal.release()
+            elif not is_cuda:
                 tensordict.update_(_td.select("next"))
                 data = (msg, None)
                 child_pipe.send(data)
@@ -4,7 +4,7 @@
 # LICENSE file in the root directory of this source tree.
 
 import torch
-from tensordict.tensordict import TensorDict, TensorDictBase
+from tensordict.tensordict import TensorDictBase
 
 from torchrl.envs import EnvBase
 from torchrl.modules.planners.common import MPCPlannerBase
@@ -42,6 +42,9 @@ class CEMPlanner(MPCPlannerBase):
             retrieve the reward. Defaults to "reward".
         action_key (str, optional): The key in the TensorDict to use to store
             the action. Defaults to "action"
+        warm_start (bool, optional): if ``True``, the action means found at the
+            previous call, shifted by one time step, are used to initialize
+            the search. Defaults to ``False``.
 
     Examples:
         >>> from tensordict import TensorDict
@@ -118,8 +121,9 @@ class CEMPlanner(MPCPlannerBase):
         top_k: int,
         reward_key: str = ("next", "reward"),
         action_key: str = "action",
+        warm_start: bool = False,
     ):
-        super().__init__(env=env, action_key=action_key)
+        super().__init__(env=env, action_key=action_key, warm_start=warm_start)
         self.planning_horizon = planning_horizon
         self.optim_steps = optim_steps
         self.num_candidates = num_candidates
@@ -153,69 +157,45 @@ class CEMPlanner(MPCPlannerBase):
             .expand(*batch_size, self.num_candidates)
             .to_tensordict()
         )
-        _action_means = torch.zeros(
-            *action_stats_shape,
-            device=tensordict.device,
-            dtype=self.env.action_spec.dtype,
+        action_means, action_stds = self._init_action_stats(
+            action_stats_shape, tensordict.device
         )
-        _action_stds = torch.ones_like(_action_means)
-        container = TensorDict(
-            {
-                "tensordict": expanded_original_tensordict,
-                "stats": TensorDict(
-                    {
-                        "_action_means": _action_means,
-                        "_action_stds": _action_stds,
-                    },
-                    [*batch_size, 1, self.planning_horizon],
-                ),
-            },
-            batch_size,
+        # buffers are allocated once and re-used across optimization steps
+        actions = torch.empty(
+            action_shape, device=action_means.device, dtype=action_means.dtype
         )
+        noise = torch.empty_like(actions)
+        best_actions = torch.empty(
+            action_topk_shape, device=action_means.device, dtype=action_means.dtype
+        )
+        returns = None
 
         for _ in range(self.optim_steps):
-            actions_means = container.get(("stats", "_action_means"))
-            actions_stds = container.get(("stats", "_action_stds"))
-            actions = actions_means + actions_stds * torch.randn(
-                *action_shape,
-                device=actions_means.device,
-                dtype=actions_means.dtype,
-            )
-            actions = self.env.action_spec.project(actions)
-            optim_tensordict = container.get("tensordict").clone()
-            policy = _PrecomputedActionsSequentialSetter(actions)
-            optim_tensordict = self.env.rollout(
-                max_steps=self.planning_horizon,
-                policy=policy,
-                auto_reset=False,
-                tensordict=optim_tensordict,
-            )
-
-            sum_rewards = optim_tensordict.get(self.reward_key).sum(
-                dim=TIME_DIM, keepdim=True
-            )
+            actions = self._sample_candidates(action_means, action_stds, noise, actions)
+            if self.reward_key == ("next", "reward"):
+                if returns is None:
+                    returns = torch.zeros(
+                        *batch_size,
+                        self.num_candidates,
+                        *self.env.reward_spec.shape,
+                        device=action_means.device,
+                        dtype=self.env.reward_spec.dtype,
+                    )
+                self._rollout_candidates(
+                    expanded_original_tensordict, actions, returns=returns
+                )
+                sum_rewards = returns.unsqueeze(TIME_DIM)
+            else:
+                optim_tensordict = self._rollout_candidates(
+                    expanded_original_tensordict, actions
+                )
+                sum_rewards = optim_tensordict.get(self.reward_key).sum(
+                    dim=TIME_DIM, keepdim=True
+                )
             _, top_k = sum_rewards.topk(self.top_k, dim=K_DIM)
             top_k = top_k.expand(action_topk_shape)
-            best_actions = actions.gather(K_DIM, top_k)
-            container.set_(
-                ("stats", "_action_means"), best_actions.mean(dim=K_DIM, keepdim=True)
-            )
-            container.set_(
-                ("stats", "_action_stds"), best_actions.std(dim=K_DIM, keepdim=True)
-            )
-        action_means = container.get(("stats", "_action_means"))
+            torch.gather(actions, K_DIM, top_k, out=best_actions)
+            torch.mean(best_actions, dim=K_DIM, keepdim=True, out=action_means)
+            torch.std(best_actions, dim=K_DIM, keepdim=True, out=action_stds)
+        self._store_warm_start(action_means)
         return action_means[..., 0, 0, :]
-
-
-class _PrecomputedActionsSequentialSetter:
-    def __init__(self, actions):
-        self.actions = actions
-        self.cmpt = 0
-
-    def __call__(self, tensordict):
-        # checks that the step count is lower or equal to the horizon
-        if self.cmpt >= self.actions.shape[-2]:
-            raise ValueError("Precomputed actions sequence is too short")
-        tensordict = tensordict.set("action", self.actions[..., self.cmpt, :])
-        self.cmpt += 1
-        return tensordict
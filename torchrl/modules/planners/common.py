@@ -3,12 +3,13 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 import abc
-from typing import Optional
+from typing import Optional, Tuple
 
 import torch
 from tensordict.tensordict import TensorDictBase
 
 from torchrl.envs import EnvBase
+from torchrl.envs.common import _make_rollout_buffer
 from torchrl.modules import SafeModule
 
 
@@ -21,12 +22,24 @@ class MPCPlannerBase(SafeModule, metaclass=abc.ABCMeta):
     Args:
         env (EnvBase): The environment to perform the planning step on (Can be :obj:`ModelBasedEnvBase` or :obj:`EnvBase`).
         action_key (str, optional): The key that will point to the computed action.
+        warm_start (bool, optional): if ``True``, the mean of the action
+            distribution found at the previous call (shifted by one time step)
+            is used to initialize the next planning step, as long as the batch
+            size does not change. Defaults to ``False``.
+
+    The candidate actions, the sampling noise and the rollout buffers are
+    allocated once per :meth:`planning` call and re-used across optimization
+    steps. Candidate trajectories are simulated by calling the environment
+    ``_step`` method directly, bypassing the checks performed by
+    :meth:`EnvBase.step`: the environment is assumed to be a trusted
+    (world) model.
     """
 
     def __init__(
         self,
         env: EnvBase,
         action_key: str = "action",
+        warm_start: bool = False,
     ):
         # Check if env is stateless
         if env.batch_locked:
@@ -38,6 +51,9 @@ class MPCPlannerBase(SafeModule, metaclass=abc.ABCMeta):
         super().__init__(env, in_keys=in_keys, out_keys=out_keys)
         self.env = env
         self.action_spec = env.action_spec
+        self.action_key = action_key
+        self.warm_start = warm_start
+        self._warm_start_means = None
         self.to(env.device)
 
     @abc.abstractmethod
@@ -49,6 +65,122 @@ class MPCPlannerBase(SafeModule, metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    def _init_action_stats(
+        self, action_stats_shape: torch.Size, device: torch.device
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Creates the mean and standard deviation of the action distribution.
+
+        With ``warm_start=True``, the means are initialized with the plan
+        found at the previous call shifted by one time step.
+        """
+        action_means = torch.zeros(
+            action_stats_shape, device=device, dtype=self.env.action_spec.dtype
+        )
+        prev_means = self._warm_start_means
+        if (
+            self.warm_start
+            and prev_means is not None
+            and prev_means.shape == action_means.shape
+        ):
+            time_dim = len(action_stats_shape) - len(self.action_spec.shape) - 1
+            horizon = action_stats_shape[time_dim]
+            action_means.narrow(time_dim, 0, horizon - 1).copy_(
+                prev_means.narrow(time_dim, 1, horizon - 1)
+            )
+        action_stds = torch.ones_like(action_means)
+        return action_means, action_stds
+
+    def _sample_candidates(
+        self,
+        action_means: torch.Tensor,
+        action_stds: torch.Tensor,
+        noise: torch.Tensor,
+        actions: torch.Tensor,
+    ) -> torch.Tensor:
+        """Samples candidate action sequences in the pre-allocated ``actions`` tensor."""
+        torch.randn(noise.shape, out=noise, dtype=noise.dtype, device=noise.device)
+        torch.addcmul(action_means, action_stds, noise, out=actions)
+        projected = self.env.action_spec.project(actions)
+        if projected is not actions:
+            actions.copy_(projected)
+        return actions
+
+    def _step_candidates(self, tensordict: TensorDictBase) -> TensorDictBase:
+        """Lean, non-validating version of :meth:`EnvBase.step`.
+
+        Only the reward and done shapes are normalized, the tensordict is not
+        locked and no spec type-check is performed.
+        """
+        env = self.env
+        next_tensordict = env._step(tensordict).get("next")
+        dims = len(env.batch_size)
+        leading_batch_size = (
+            next_tensordict.batch_size[:-dims] if dims else next_tensordict.shape
+        )
+        for key, spec in (("reward", env.reward_spec), ("done", env.done_spec)):
+            value = next_tensordict.get(key)
+            expected_shape = torch.Size([*leading_batch_size, *spec.shape])
+            if value.shape != expected_shape:
+                next_tensordict.set(key, value.view(expected_shape))
+        return next_tensordict
+
+    def _rollout_candidates(
+        self,
+        tensordict: TensorDictBase,
+        actions: torch.Tensor,
+        returns: Optional[torch.Tensor] = None,
+        out: Optional[TensorDictBase] = None,
+    ) -> Optional[TensorDictBase]:
+        """Rolls out the candidate action sequences from the states in ``tensordict``.
+
+        Args:
+            tensordict (TensorDictBase): the initial states, expanded along
+                the candidate dimension. It is not modified.
+            actions (torch.Tensor): the candidate actions, with the time dimension
+                following the batch dimensions of ``tensordict``.
+            returns (torch.Tensor, optional): if provided, the rewards collected
+                along the trajectories are summed in-place in this tensor.
+                Rewards received after a trajectory is done are not counted.
+            out (TensorDictBase, optional): a rollout buffer where each step is
+                written. If ``None`` and ``returns`` is not provided, a buffer
+                is created and returned: it can be passed to subsequent calls.
+
+        Returns:
+            the rollout buffer, or ``None`` if only the returns were requested.
+        """
+        batch_dims = tensordict.batch_dims
+        time_dim = batch_dims
+        horizon = actions.shape[time_dim]
+        if returns is not None:
+            returns.zero_()
+        not_done = None
+        record = returns is None or out is not None
+        for t in range(horizon):
+            tensordict = tensordict.clone(False)
+            tensordict.set(self.action_key, actions.select(time_dim, t))
+            next_tensordict = self._step_candidates(tensordict)
+            if returns is not None:
+                reward = next_tensordict.get("reward")
+                if not_done is not None:
+                    reward = reward * not_done
+                returns.add_(reward)
+                if not_done is None:
+                    not_done = ~next_tensordict.get("done")
+                else:
+                    not_done = not_done & ~next_tensordict.get("done")
+            if record:
+                tensordict.set("next", next_tensordict)
+                if out is None:
+                    out = _make_rollout_buffer(tensordict, horizon)
+                out[(slice(None),) * batch_dims + (t,)] = tensordict
+                del tensordict["next"]
+            tensordict.update(next_tensordict.exclude("reward"))
+        return out
+
+    def _store_warm_start(self, action_means: torch.Tensor) -> None:
+        if self.warm_start:
+            self._warm_start_means = action_means
+
     def forward(
         self,
         tensordict: TensorDictBase,
@@ -4,7 +4,7 @@
 # LICENSE file in the root directory of this source tree.
 
 import torch
-from tensordict.tensordict import TensorDict, TensorDictBase
+from tensordict.tensordict import TensorDictBase
 from torch import nn
 
 from torchrl.envs import EnvBase
@@ -40,6 +40,9 @@ class MPPIPlanner(MPCPlannerBase):
             retrieve the reward. Defaults to "reward".
         action_key (str, optional): The key in the TensorDict to use to store
             the action. Defaults to "action"
+        warm_start (bool, optional): if ``True``, the action means found at the
+            previous call, shifted by one time step, are used to initialize
+            the search. Defaults to ``False``.
 
     Examples:
         >>> from tensordict import TensorDict
@@ -132,8 +135,9 @@ class MPPIPlanner(MPCPlannerBase):
         top_k: int,
         reward_key: str = ("next", "reward"),
         action_key: str = "action",
+        warm_start: bool = False,
     ):
-        super().__init__(env=env, action_key=action_key)
+        super().__init__(env=env, action_key=action_key, warm_start=warm_start)
         self.advantage_module = advantage_module
         self.planning_horizon = planning_horizon
         self.optim_steps = optim_steps
@@ -174,42 +178,23 @@ class MPPIPlanner(MPCPlannerBase):
             .expand(*batch_size, self.num_candidates)
             .to_tensordict()
         )
-        _action_means = torch.zeros(
-            *action_stats_shape,
-            device=tensordict.device,
-            dtype=self.env.action_spec.dtype,
+        action_means, action_stds = self._init_action_stats(
+            action_stats_shape, tensordict.device
         )
-        _action_stds = torch.ones_like(_action_means)
-        container = TensorDict(
-            {
-                "tensordict": expanded_original_tensordict,
-                "stats": TensorDict(
-                    {
-                        "_action_means": _action_means,
-                        "_action_stds": _action_stds,
-                    },
-                    [*batch_size, 1, self.planning_horizon],
-                ),
-            },
-            batch_size,
+        # buffers are allocated once and re-used across optimization steps
+        actions = torch.empty(
+            action_shape, device=action_means.device, dtype=action_means.dtype
         )
+        noise = torch.empty_like(actions)
+        best_actions = torch.empty(
+            action_topk_shape, device=action_means.device, dtype=action_means.dtype
+        )
+        optim_tensordict = None
 
         for _ in range(self.optim_steps):
-            actions_means = container.get(("stats", "_action_means"))
-            actions_stds = container.get(("stats", "_action_stds"))
-            actions = actions_means + actions_stds * torch.randn(
-                *action_shape,
-                device=actions_means.device,
-                dtype=actions_means.dtype,
-            )
-            actions = self.env.action_spec.project(actions)
-            optim_tensordict = container.get("tensordict").clone()
-            policy = _PrecomputedActionsSequentialSetter(actions)
-            optim_tensordict = self.env.rollout(
-                max_steps=self.planning_horizon,
-                policy=policy,
-                auto_reset=False,
-                tensordict=optim_tensordict,
+            actions = self._sample_candidates(action_means, action_stds, noise, actions)
+            optim_tensordict = self._rollout_candidates(
+                expanded_original_tensordict, actions, out=optim_tensordict
             )
             # compute advantage
             self.advantage_module(optim_tensordict)
@@ -222,33 +207,16 @@ class MPPIPlanner(MPCPlannerBase):
             Omegas = (self.temperature * vals).exp()
 
             # gather best actions
-            best_actions = actions.gather(K_DIM, top_k.expand(action_topk_shape))
+            torch.gather(
+                actions, K_DIM, top_k.expand(action_topk_shape), out=best_actions
+            )
 
             # compute weighted average
-            _action_means = (Omegas * best_actions).sum(
-                dim=K_DIM, keepdim=True
-            ) / Omegas.sum(K_DIM, True)
-            _action_stds = (
-                (Omegas * (best_actions - _action_means).pow(2)).sum(
-                    dim=K_DIM, keepdim=True
-                )
-                / Omegas.sum(K_DIM, True)
-            ).sqrt()
-            container.set_(("stats", "_action_means"), _action_means)
-            container.set_(("stats", "_action_stds"), _action_stds)
-        action_means = container.get(("stats", "_action_means"))
+            Omegas_sum = Omegas.sum(K_DIM, True)
+            torch.sum(Omegas * best_actions, dim=K_DIM, keepdim=True, out=action_means)
+            action_means.div_(Omegas_sum)
+            best_actions.sub_(action_means).pow_(2).mul_(Omegas)
+            torch.sum(best_actions, dim=K_DIM, keepdim=True, out=action_stds)
+            action_stds.div_(Omegas_sum).sqrt_()
+        self._store_warm_start(action_means)
         return action_means[..., 0, 0, :]
-
-
-class _PrecomputedActionsSequentialSetter:
-    def __init__(self, actions):
-        self.actions = actions
-        self.cmpt = 0
-
-    def __call__(self, tensordict):
-        # checks that the step count is lower or equal to the horizon
-        if self.cmpt >= self.actions.shape[-2]:
-            raise ValueError("Precomputed actions sequence is too short")
-        tensordict = tensordict.set("action", self.actions[..., self.cmpt, :])
-        self.cmpt += 1
-        return tensordict
@@ -17,7 +17,13 @@ from torchrl.objectives.utils import (
     distance_loss,
     ValueEstimators,
 )
-from torchrl.objectives.value import GAE, TD0Estimator, TD1Estimator, TDLambdaEstimator
+from torchrl.objectives.value import (
+    GAE,
+    TD0Estimator,
+    TD1Estimator,
+    TDLambdaEstimator,
+    VTrace,
+)
 
 
 class A2CLoss(LossModule):
@@ -168,6 +174,7 @@ class A2CLoss(LossModule):
                 tensordict,
                 params=self.critic_params.detach(),
                 target_params=self.target_critic_params,
+                **self._value_estimator_kwargs(),
             )
             advantage = tensordict.get(self.advantage_key)
         log_probs, dist = self._log_probs(tensordict)
@@ -207,5 +214,12 @@ class A2CLoss(LossModule):
             self._value_estimator = TDLambdaEstimator(
                 value_network=self.critic, value_key=value_key, **hp
             )
+        elif value_type == ValueEstimators.VTrace:
+            self._value_estimator = VTrace(
+                value_network=self.critic,
+                actor_network=self.actor,
+                value_key=value_key,
+                **hp,
+            )
         else:
             raise NotImplementedError(f"Unknown value type {value_type}")
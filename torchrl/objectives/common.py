@@ -7,7 +7,7 @@ from __future__ import annotations
 
 import warnings
 from copy import deepcopy
-from typing import Iterator, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 import torch
 
@@ -21,7 +21,7 @@ from torchrl._utils import RL_WARNINGS
 from torchrl.envs.utils import ExplorationType, set_exploration_type
 from torchrl.modules.utils import Buffer
 from torchrl.objectives.utils import ValueEstimators
-from torchrl.objectives.value import ValueEstimatorBase
+from torchrl.objectives.value import ValueEstimatorBase, VTrace
 
 _has_functorch = False
 try:
@@ -458,6 +458,13 @@ class LossModule(nn.Module):
     def value_estimator(self, value):
         self._value_estimator = value
 
+    def _value_estimator_kwargs(self) -> Dict[str, Any]:
+        """Extra keyword arguments passed by the loss when calling its value estimator."""
+        if isinstance(self.value_estimator, VTrace):
+            # V-trace computes importance weights with the current policy
+            return {"actor_params": self.actor_params.detach()}
+        return {}
+
     def _default_value_estimator(self):
         """A value-function constructor when none is provided.
 
@@ -518,5 +525,9 @@ class LossModule(nn.Module):
             raise NotImplementedError(
                 f"Value type {value_type} it not implemented for loss {type(self)}."
             )
+        elif value_type == ValueEstimators.VTrace:
+            raise NotImplementedError(
+                f"Value type {value_type} it not implemented for loss {type(self)}."
+            )
         else:
             raise NotImplementedError(f"Unknown value type {value_type}")
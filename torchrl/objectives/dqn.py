@@ -146,6 +146,10 @@ class DQNLoss(LossModule):
                 value_target_key="value_target",
                 value_key="chosen_action_value",
             )
+        elif value_type is ValueEstimators.VTrace:
+            raise NotImplementedError(
+                f"Value type {value_type} it not implemented for loss {type(self)}."
+            )
         else:
             raise NotImplementedError(f"Unknown value type {value_type}")
 
@@ -423,6 +427,10 @@ class DistributionalDQNLoss(LossModule):
             raise NotImplementedError(
                 f"value type {value_type} is not implemented for {self.__class__.__name__}."
             )
+        elif value_type is ValueEstimators.VTrace:
+            raise NotImplementedError(
+                f"value type {value_type} is not implemented for {self.__class__.__name__}."
+            )
         else:
             raise NotImplementedError(f"Unknown value type {value_type}")
 
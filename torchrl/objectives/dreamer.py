@@ -271,6 +271,10 @@ class DreamerActorLoss(LossModule):
                 value_target_key="value_target",
                 value_key=value_key,
             )
+        elif value_type is ValueEstimators.VTrace:
+            raise NotImplementedError(
+                f"Value type {value_type} it not implemented for loss {type(self)}."
+            )
         else:
             raise NotImplementedError(f"Unknown value type {value_type}")
 
@@ -19,7 +19,13 @@ from torchrl.objectives.utils import (
 )
 
 from .common import LossModule
-from .value import GAE, TD0Estimator, TD1Estimator, TDLambdaEstimator
+from .value import (
+    GAE,
+    TD0Estimator,
+    TD1Estimator,
+    TDLambdaEstimator,
+    VTrace,
+)
 
 
 class PPOLoss(LossModule):
@@ -236,6 +242,7 @@ class PPOLoss(LossModule):
                 tensordict,
                 params=self.critic_params.detach(),
                 target_params=self.target_critic_params,
+                **self._value_estimator_kwargs(),
             )
             advantage = tensordict.get(self.advantage_key)
         if self.normalize_advantage and advantage.numel() > 1:
@@ -280,6 +287,13 @@ class PPOLoss(LossModule):
             self._value_estimator = TDLambdaEstimator(
                 value_network=self.critic, value_key=value_key, **hp
             )
+        elif value_type == ValueEstimators.VTrace:
+            self._value_estimator = VTrace(
+                value_network=self.critic,
+                actor_network=self.actor,
+                value_key=value_key,
+                **hp,
+            )
         else:
             raise NotImplementedError(f"Unknown value type {value_type}")
 
@@ -417,6 +431,7 @@ class ClipPPOLoss(PPOLoss):
                 tensordict,
                 params=self.critic_params.detach(),
                 target_params=self.target_critic_params,
+                **self._value_estimator_kwargs(),
             )
             advantage = tensordict.get(self.advantage_key)
         if self.normalize_advantage and advantage.numel() > 1:
@@ -613,6 +628,7 @@ class KLPENPPOLoss(PPOLoss):
                 tensordict,
                 params=self.critic_params.detach(),
                 target_params=self.target_critic_params,
+                **self._value_estimator_kwargs(),
             )
             advantage = tensordict.get(self.advantage_key)
         if self.normalize_advantage and advantage.numel() > 1:
@@ -353,5 +353,9 @@ class REDQLoss(LossModule):
             self._value_estimator = TDLambdaEstimator(
                 value_network=None, value_key=value_key, **hp
             )
+        elif value_type == ValueEstimators.VTrace:
+            raise NotImplementedError(
+                f"Value type {value_type} it not implemented for loss {type(self)}."
+            )
         else:
             raise NotImplementedError(f"Unknown value type {value_type}")
@@ -6,7 +6,7 @@
 import functools
 import warnings
 from enum import Enum
-from typing import Iterable, Optional, Union
+from typing import Iterable, List, Optional, Tuple, Union
 
 import torch
 from tensordict.nn import TensorDictModule
@@ -39,6 +39,7 @@ class ValueEstimators(Enum):
     TD1 = "TD(1) (infinity-step return)"
     TDLambda = "TD(lambda)"
     GAE = "Generalized advantage estimate"
+    VTrace = "V-trace off-policy correction"
 
 
 def default_value_kwargs(value_type: ValueEstimators):
@@ -61,6 +62,8 @@ def default_value_kwargs(value_type: ValueEstimators):
         return {"gamma": 0.99, "lmbda": 0.95, "differentiable": True}
     elif value_type == ValueEstimators.TDLambda:
         return {"gamma": 0.99, "lmbda": 0.95, "differentiable": True}
+    elif value_type == ValueEstimators.VTrace:
+        return {"gamma": 0.99, "differentiable": True}
     else:
         raise NotImplementedError(f"Unknown value type {value_type}.")
 
@@ -187,6 +190,7 @@ class TargetNetUpdater:
             self._target_names = _target_names
             self._source_names = _source_names
             self.loss_module = loss_module
+            self._leaves_cache = None
             self.initialized = False
             self.init_()
             _has_update_associated = True
@@ -221,23 +225,62 @@ class TargetNetUpdater:
             target.data.copy_(source.data)
         self.initialized = True
 
-    def step(self) -> None:
-        if not self.initialized:
-            raise Exception(
-                f"{self.__class__.__name__} must be "
-                f"initialized (`{self.__class__.__name__}.init_()`) before calling step()"
-            )
+    def _leaves(self) -> Tuple[List[Tensor], List[Tensor], List[Tuple[Tensor, Tensor]]]:
+        # the (source, target) leaves are gathered once and cached. Casting the
+        # loss module (e.g. with .to()) re-creates the target buffers, which is
+        # detected by comparing the first target leaf with the cached one.
+        if self._leaves_cache is not None:
+            name, first_target, leaves = self._leaves_cache
+            if self.loss_module._buffers.get(name) is first_target:
+                return leaves
+        targets = self._targets
+        sources, leaf_targets, non_leaves = [], [], []
+        first_target = None
         for key, source in self._sources.items(True, True):
             if not isinstance(key, tuple):
                 key = (key,)
             key = ("target_" + key[0], *key[1:])
-            target = self._targets[key]
+            target = targets.get(key)
             if target.requires_grad:
                 raise RuntimeError("the target parameter is part of a graph.")
+            if first_target is None:
+                first_target = target
             if target.is_leaf:
-                self._step(source, target)
+                sources.append(source.data)
+                leaf_targets.append(target.data)
             else:
-                target.copy_(source)
+                non_leaves.append((source, target))
+        leaves = (sources, leaf_targets, non_leaves)
+        for name, buffer in self.loss_module._buffers.items():
+            if buffer is first_target:
+                self._leaves_cache = (name, first_target, leaves)
+                break
+        else:
+            # the targets are not buffers of the loss module: nothing tells
+            # when they are re-created, hence they are gathered at every step
+            self._leaves_cache = None
+        return leaves
+
+    def step(self) -> None:
+        if not self.initialized:
+            raise Exception(
+                f"{self.__class__.__name__} must be "
+                f"initialized (`{self.__class__.__name__}.init_()`) before calling step()"
+            )
+        sources, leaf_targets, non_leaves = self._leaves()
+        for source, target in non_leaves:
+            target.copy_(source)
+        if leaf_targets:
+            self._step_multi(sources, leaf_targets)
+
+    def _step_multi(self, p_sources: List[Tensor], p_targets: List[Tensor]) -> None:
+        """Updates a list of target tensors given their sources.
+
+        Subclasses can override this method to perform a fused update over all the
+        parameters. By default, :meth:`~._step` is called on each pair.
+        """
+        for p_source, p_target in zip(p_sources, p_targets):
+            self._step(p_source, p_target)
 
     def _step(self, p_source: Tensor, p_target: Tensor) -> None:
         raise NotImplementedError
@@ -286,6 +329,19 @@ class SoftUpdate(TargetNetUpdater):
     def _step(self, p_source: Tensor, p_target: Tensor) -> None:
         p_target.data.copy_(p_target.data * self.eps + p_source.data * (1 - self.eps))
 
+    def _step_multi(self, p_sources: List[Tensor], p_targets: List[Tensor]) -> None:
+        # floating-point tensors are updated in place with multi-tensor kernels,
+        # without temporaries
+        float_sources, float_targets = [], []
+        for p_source, p_target in zip(p_sources, p_targets):
+            if p_target.is_floating_point() and p_source.dtype == p_target.dtype:
+                float_sources.append(p_source)
+                float_targets.append(p_target)
+            else:
+                self._step(p_source, p_target)
+        if float_targets:
+            torch._foreach_lerp_(float_targets, float_sources, 1 - self.eps)
+
 
 class HardUpdate(TargetNetUpdater):
     """A hard-update class for target network update in Double DQN/DDPG (by contrast with soft updates).
@@ -312,6 +368,11 @@ class HardUpdate(TargetNetUpdater):
         if self.counter == self.value_network_update_interval:
             p_target.data.copy_(p_source.data)
 
+    def _step_multi(self, p_sources: List[Tensor], p_targets: List[Tensor]) -> None:
+        if self.counter == self.value_network_update_interval:
+            for p_source, p_target in zip(p_sources, p_targets):
+                p_target.copy_(p_source)
+
     def step(self) -> None:
         super().step()
         if self.counter == self.value_network_update_interval:
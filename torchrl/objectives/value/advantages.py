@@ -24,11 +24,14 @@ from torchrl.envs.utils import step_mdp
 from torchrl.objectives.utils import hold_out_net
 from torchrl.objectives.value.functional import (
     generalized_advantage_estimate,
+    scan_generalized_advantage_estimate,
+    scan_td_lambda_return_estimate,
     td0_return_estimate,
     td_lambda_return_estimate,
     vec_generalized_advantage_estimate,
     vec_td1_return_estimate,
     vec_td_lambda_return_estimate,
+    vtrace_advantage_estimate,
 )
 
 
@@ -542,8 +545,11 @@ class TDLambdaEstimator(ValueEstimatorBase):
               decorate it in a `torch.no_grad()` context manager/decorator or
               pass detached parameters for functional modules.
 
-        vectorized (bool, optional): whether to use the vectorized version of the
-            lambda return. Default is `True`.
+        vectorized (bool or str, optional): whether to use the vectorized version of the
+            lambda return. If ``"scan"``, the estimate is computed with a done-aware
+            parallel prefix scan, whose memory footprint is linear in the number of
+            time steps (as opposed to quadratic for the vectorized version).
+            This is recommended for long trajectories. Default is `True`.
         advantage_key (str or tuple of str, optional): the key of the advantage entry.
             Defaults to "advantage".
         value_target_key (str or tuple of str, optional): the key of the advantage entry.
@@ -565,7 +571,7 @@ class TDLambdaEstimator(ValueEstimatorBase):
         value_network: TensorDictModule,
         average_rewards: bool = False,
         differentiable: bool = False,
-        vectorized: bool = True,
+        vectorized: Union[bool, str] = True,
         advantage_key: Union[str, Tuple] = "advantage",
         value_target_key: Union[str, Tuple] = "value_target",
         value_key: Union[str, Tuple] = "state_value",
@@ -704,7 +710,11 @@ class TDLambdaEstimator(ValueEstimatorBase):
         next_value = step_td.get(self.value_key)
 
         done = tensordict.get(("next", "done"))
-        if self.vectorized:
+        if self.vectorized == "scan":
+            val = scan_td_lambda_return_estimate(
+                gamma, lmbda, next_value, reward, done, time_dim=tensordict.ndim - 1
+            )
+        elif self.vectorized:
             val = vec_td_lambda_return_estimate(
                 gamma, lmbda, next_value, reward, done, time_dim=tensordict.ndim - 1
             )
@@ -735,8 +745,11 @@ class GAE(ValueEstimatorBase):
               decorate it in a `torch.no_grad()` context manager/decorator or
               pass detached parameters for functional modules.
 
-        vectorized (bool, optional): whether to use the vectorized version of the
-            lambda return. Default is `True`.
+        vectorized (bool or str, optional): whether to use the vectorized version of the
+            lambda return. If ``"scan"``, the estimate is computed with a done-aware
+            parallel prefix scan, whose memory footprint is linear in the number of
+            time steps (as opposed to quadratic for the vectorized version).
+            This is recommended for long trajectories. Default is `True`.
         advantage_key (str or tuple of str, optional): the key of the advantage entry.
             Defaults to "advantage".
         value_target_key (str or tuple of str, optional): the key of the advantage entry.
@@ -770,7 +783,7 @@ class GAE(ValueEstimatorBase):
         value_network: TensorDictModule,
         average_gae: bool = False,
         differentiable: bool = False,
-        vectorized: bool = True,
+        vectorized: Union[bool, str] = True,
         advantage_key: Union[str, Tuple] = "advantage",
         value_target_key: Union[str, Tuple] = "value_target",
         value_key: Union[str, Tuple] = "state_value",
@@ -899,7 +912,17 @@ class GAE(ValueEstimatorBase):
                 self.value_network(step_td, **kwargs)
         next_value = step_td.get(self.value_key)
         done = tensordict.get(("next", "done"))
-        if self.vectorized:
+        if self.vectorized == "scan":
+            adv, value_target = scan_generalized_advantage_estimate(
+                gamma,
+                lmbda,
+                value,
+                next_value,
+                reward,
+                done,
+                time_dim=tensordict.ndim - 1,
+            )
+        elif self.vectorized:
             adv, value_target = vec_generalized_advantage_estimate(
                 gamma,
                 lmbda,
@@ -977,12 +1000,277 @@ class GAE(ValueEstimatorBase):
                 self.value_network(step_td, **kwargs)
         next_value = step_td.get(self.value_key)
         done = tensordict.get(("next", "done"))
-        _, value_target = vec_generalized_advantage_estimate(
+        if self.vectorized == "scan":
+            estimator = scan_generalized_advantage_estimate
+        else:
+            estimator = vec_generalized_advantage_estimate
+        _, value_target = estimator(
             gamma, lmbda, value, next_value, reward, done, time_dim=tensordict.ndim - 1
         )
         return value_target
 
 
+class VTrace(ValueEstimatorBase):
+    """A class wrapper around the V-Trace off-policy estimate functional.
+
+    Refer to "IMPALA: Scalable Distributed Deep-RL with Importance Weighted Actor-Learner Architectures"
+    https://arxiv.org/abs/1802.01561 for more context.
+
+    V-Trace corrects the value targets and advantages for the lag between the
+    policy that collected the data (the behaviour policy, whose log-probability
+    is stored by the collector under ``"sample_log_prob"``) and the policy being
+    trained, as it is the case with asynchronous collectors such as
+    :class:`~torchrl.collectors.MultiaSyncDataCollector`.
+
+    Args:
+        gamma (scalar): exponential mean discount.
+        value_network (TensorDictModule): value operator used to retrieve the value estimates.
+        actor_network (TensorDictModule, optional): the policy used to compute
+            the log-probability of the actions under the target policy. It must
+            implement a ``get_dist`` method (e.g.
+            :class:`~torchrl.modules.ProbabilisticActor`). If not provided, the
+            log-probability is read from the ``log_prob_key`` entry of the input
+            tensordict.
+        rho_thresh (scalar, optional): truncation level of the importance
+            weights. Defaults to 1.0.
+        c_thresh (scalar, optional): truncation level of the trace cutting
+            coefficients. Defaults to 1.0.
+        average_adv (bool): if ``True``, the resulting advantage values will be standardized.
+            Default is ``False``.
+        differentiable (bool, optional): if ``True``, gradients are propagated through
+            the computation of the value function. Default is ``False``.
+
+            .. note::
+              The proper way to make the function call non-differentiable is to
+              decorate it in a `torch.no_grad()` context manager/decorator or
+              pass detached parameters for functional modules.
+
+        advantage_key (str or tuple of str, optional): the key of the advantage entry.
+            Defaults to "advantage".
+        value_target_key (str or tuple of str, optional): the key of the advantage entry.
+            Defaults to "value_target".
+        value_key (str or tuple of str, optional): the value key to read from the input tensordict.
+            Defaults to "state_value".
+        log_prob_key (str or tuple of str, optional): the key of the log-probability
+            of the actions under the target policy. Defaults to "log_prob".
+        sample_log_prob_key (str or tuple of str, optional): the key of the
+            log-probability of the actions under the behaviour policy.
+            Defaults to "sample_log_prob".
+        skip_existing (bool, optional): if ``True``, the value network will skip
+            modules which outputs are already present in the tensordict.
+            Defaults to ``None``, ie. the value of :func:`tensordict.nn.skip_existing()`
+            is not affected.
+
+    Examples:
+        >>> from tensordict import TensorDict
+        >>> value_net = TensorDictModule(
+        ...     nn.Linear(3, 1), in_keys=["obs"], out_keys=["state_value"]
+        ... )
+        >>> module = VTrace(gamma=0.98, value_network=value_net)
+        >>> obs, next_obs = torch.randn(2, 1, 10, 3)
+        >>> reward = torch.randn(1, 10, 1)
+        >>> done = torch.zeros(1, 10, 1, dtype=torch.bool)
+        >>> log_prob, sample_log_prob = -torch.rand(2, 1, 10)
+        >>> tensordict = TensorDict({
+        ...     "obs": obs,
+        ...     "log_prob": log_prob,
+        ...     "sample_log_prob": sample_log_prob,
+        ...     "next": {"obs": next_obs, "done": done, "reward": reward},
+        ... }, [1, 10])
+        >>> _ = module(tensordict)
+        >>> assert "advantage" in tensordict.keys()
+
+    """
+
+    def __init__(
+        self,
+        *,
+        gamma: Union[float, torch.Tensor],
+        value_network: TensorDictModule,
+        actor_network: Optional[TensorDictModule] = None,
+        rho_thresh: Union[float, torch.Tensor] = 1.0,
+        c_thresh: Union[float, torch.Tensor] = 1.0,
+        average_adv: bool = False,
+        differentiable: bool = False,
+        advantage_key: Union[str, Tuple] = "advantage",
+        value_target_key: Union[str, Tuple] = "value_target",
+        value_key: Union[str, Tuple] = "state_value",
+        log_prob_key: Union[str, Tuple] = "log_prob",
+        sample_log_prob_key: Union[str, Tuple] = "sample_log_prob",
+        skip_existing: Optional[bool] = None,
+    ):
+        super().__init__(
+            value_network=value_network,
+            differentiable=differentiable,
+            advantage_key=advantage_key,
+            value_target_key=value_target_key,
+            value_key=value_key,
+            skip_existing=skip_existing,
+        )
+        try:
+            device = next(value_network.parameters()).device
+        except (AttributeError, StopIteration):
+            device = torch.device("cpu")
+        self.register_buffer("gamma", torch.tensor(gamma, device=device))
+        self.register_buffer("rho_thresh", torch.tensor(rho_thresh, device=device))
+        self.register_buffer("c_thresh", torch.tensor(c_thresh, device=device))
+        self.actor_network = actor_network
+        self.average_adv = average_adv
+        self.log_prob_key = log_prob_key
+        self.sample_log_prob_key = sample_log_prob_key
+        self.in_keys = self.in_keys + [sample_log_prob_key]
+        if actor_network is None:
+            self.in_keys = self.in_keys + [log_prob_key]
+
+    def _log_probs(
+        self,
+        tensordict: TensorDictBase,
+        reward: torch.Tensor,
+        actor_params: Optional[TensorDictBase] = None,
+    ):
+        log_mu = tensordict.get(self.sample_log_prob_key)
+        if self.actor_network is not None:
+            kwargs = {}
+            if actor_params is not None:
+                kwargs["params"] = actor_params
+            with torch.no_grad():
+                dist = self.actor_network.get_dist(tensordict.clone(False), **kwargs)
+                log_pi = dist.log_prob(tensordict.get("action"))
+        else:
+            log_pi = tensordict.get(self.log_prob_key)
+        log_pi, log_mu = log_pi.detach(), log_mu.detach()
+
+        def _expand(log_prob):
+            while log_prob.ndim < reward.ndim:
+                log_prob = log_prob.unsqueeze(-1)
+            return log_prob.expand_as(reward)
+
+        return _expand(log_pi), _expand(log_mu)
+
+    def _estimate(
+        self,
+        tensordict: TensorDictBase,
+        params: Optional[TensorDictBase] = None,
+        target_params: Optional[TensorDictBase] = None,
+        actor_params: Optional[TensorDictBase] = None,
+        **kwargs,
+    ):
+        if tensordict.batch_dims < 1:
+            raise RuntimeError(
+                "Expected input tensordict to have at least one dimensions, got "
+                f"tensordict.batch_size = {tensordict.batch_size}"
+            )
+        reward = tensordict.get(("next", "reward"))
+        device = reward.device
+        gamma = self.gamma.to(device)
+        steps_to_next_obs = tensordict.get("steps_to_next_obs", None)
+        if steps_to_next_obs is not None:
+            gamma = gamma ** steps_to_next_obs.view_as(reward)
+
+        if self.is_stateless and params is None:
+            raise RuntimeError(
+                "Expected params to be passed to advantage module but got none."
+            )
+        if params is not None:
+            kwargs["params"] = params
+        if self.value_network is not None:
+            with hold_out_net(self.value_network):
+                self.value_network(tensordict, **kwargs)
+        value = tensordict.get(self.value_key)
+
+        step_td = step_mdp(tensordict)
+        if target_params is not None:
+            # we assume that target parameters are not differentiable
+            kwargs["params"] = target_params
+        elif "params" in kwargs:
+            kwargs["params"] = kwargs["params"].detach()
+        if self.value_network is not None:
+            with hold_out_net(self.value_network):
+                self.value_network(step_td, **kwargs)
+        next_value = step_td.get(self.value_key)
+        done = tensordict.get(("next", "done"))
+        log_pi, log_mu = self._log_probs(tensordict, reward, actor_params)
+        return vtrace_advantage_estimate(
+            gamma,
+            log_pi,
+            log_mu,
+            value,
+            next_value,
+            reward,
+            done,
+            rho_thresh=self.rho_thresh.to(device),
+            c_thresh=self.c_thresh.to(device),
+            time_dim=tensordict.ndim - 1,
+        )
+
+    @_self_set_skip_existing
+    @_self_set_grad_enabled
+    @dispatch
+    def forward(
+        self,
+        tensordict: TensorDictBase,
+        *unused_args,
+        params: Optional[List[Tensor]] = None,
+        target_params: Optional[List[Tensor]] = None,
+        actor_params: Optional[List[Tensor]] = None,
+    ) -> TensorDictBase:
+        """Computes the V-Trace advantage and value target given the data in tensordict.
+
+        If a functional module is provided, a nested TensorDict containing the parameters
+        (and if relevant the target parameters) can be passed to the module.
+
+        Args:
+            tensordict (TensorDictBase): A TensorDict containing the data
+                (an observation key, "action", ("next", "reward"), ("next", "done"),
+                the behaviour and target log-probabilities and "next" tensordict state
+                as returned by the environment) necessary to compute the value estimates and the V-Trace.
+                The data passed to this module should be structured as :obj:`[*B, T, F]` where :obj:`B` are
+                the batch size, :obj:`T` the time dimension and :obj:`F` the feature dimension(s).
+            params (TensorDictBase, optional): A nested TensorDict containing the params
+                to be passed to the functional value network module.
+            target_params (TensorDictBase, optional): A nested TensorDict containing the
+                target params to be passed to the functional value network module.
+            actor_params (TensorDictBase, optional): A nested TensorDict containing the
+                params to be passed to the functional actor network module.
+
+        Returns:
+            An updated TensorDict with an advantage and a value_target keys as defined in the constructor.
+
+        """
+        adv, value_target = self._estimate(
+            tensordict,
+            params=params,
+            target_params=target_params,
+            actor_params=actor_params,
+        )
+        if self.average_adv:
+            loc = adv.mean()
+            scale = adv.std().clamp_min(1e-4)
+            adv = adv - loc
+            adv = adv / scale
+
+        tensordict.set(self.advantage_key, adv)
+        tensordict.set(self.value_target_key, value_target)
+        return tensordict
+
+    def value_estimate(
+        self,
+        tensordict,
+        params: Optional[TensorDictBase] = None,
+        target_params: Optional[TensorDictBase] = None,
+        actor_params: Optional[TensorDictBase] = None,
+        **kwargs,
+    ):
+        _, value_target = self._estimate(
+            tensordict,
+            params=params,
+            target_params=target_params,
+            actor_params=actor_params,
+            **kwargs,
+        )
+        return value_target
+
+
 def _deprecate_class(cls, new_cls):
     @wraps(cls.__init__)
     def new_init(self, *args, **kwargs):
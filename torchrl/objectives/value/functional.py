@@ -3,7 +3,7 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 from functools import wraps
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 
 import torch
 from tensordict import MemmapTensor, TensorDictBase
@@ -11,6 +11,7 @@ from tensordict import MemmapTensor, TensorDictBase
 __all__ = [
     "generalized_advantage_estimate",
     "vec_generalized_advantage_estimate",
+    "scan_generalized_advantage_estimate",
     "td0_advantage_estimate",
     "td0_return_estimate",
     "td1_return_estimate",
@@ -21,9 +22,16 @@ __all__ = [
     "vec_td_lambda_return_estimate",
     "td_lambda_advantage_estimate",
     "vec_td_lambda_advantage_estimate",
+    "scan_td_lambda_return_estimate",
+    "scan_td_lambda_advantage_estimate",
+    "vtrace_advantage_estimate",
 ]
 
-from torchrl.objectives.value.utils import _custom_conv1d, _make_gammas_tensor
+from torchrl.objectives.value.utils import (
+    _custom_conv1d,
+    _discounted_reverse_scan,
+    _make_gammas_tensor,
+)
 
 
 def _transpose_time(fun):
@@ -191,6 +199,51 @@ def vec_generalized_advantage_estimate(
     return advantage, value_target
 
 
+@_transpose_time
+def scan_generalized_advantage_estimate(
+    gamma: float,
+    lmbda: float,
+    state_value: torch.Tensor,
+    next_state_value: torch.Tensor,
+    reward: torch.Tensor,
+    done: torch.Tensor,
+    time_dim: int = -2,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Generalized advantage estimate of a trajectory computed with a parallel prefix scan.
+
+    This function returns the same result as :func:`generalized_advantage_estimate`
+    in ``ceil(log2(T))`` vectorized passes, with a memory footprint that is linear
+    in the number of time steps (unlike :func:`vec_generalized_advantage_estimate`,
+    which builds a ``[T, T]`` discount matrix). It is therefore suited for long
+    trajectories and large batches.
+
+    Refer to "HIGH-DIMENSIONAL CONTINUOUS CONTROL USING GENERALIZED ADVANTAGE ESTIMATION"
+    https://arxiv.org/pdf/1506.02438.pdf for more context.
+
+    Args:
+        gamma (scalar): exponential mean discount.
+        lmbda (scalar): trajectory discount.
+        state_value (Tensor): value function result with old_state input.
+        next_state_value (Tensor): value function result with new_state input.
+        reward (Tensor): reward of taking actions in the environment.
+        done (Tensor): boolean flag for end of episode.
+        time_dim (int): dimension where the time is unrolled. Defaults to -2.
+
+    All tensors (values, reward and done) must have shape
+    ``[*Batch x TimeSteps x *F]``, with ``*F`` feature dimensions.
+
+    """
+    if not (next_state_value.shape == state_value.shape == reward.shape == done.shape):
+        raise RuntimeError(
+            "All input tensors (value, reward and done states) must share a unique shape."
+        )
+    not_done = 1 - done.to(state_value.dtype)
+    td0 = reward + not_done * gamma * next_state_value - state_value
+    advantage = _discounted_reverse_scan(td0, not_done * gamma * lmbda)
+    value_target = advantage + state_value
+    return advantage, value_target
+
+
 ########################################################################
 # TD(0)
 # -----
@@ -895,6 +948,191 @@ def vec_td_lambda_advantage_estimate(
     )
 
 
+@_transpose_time
+def scan_td_lambda_return_estimate(
+    gamma,
+    lmbda,
+    next_state_value,
+    reward,
+    done,
+    rolling_gamma: Optional[bool] = None,
+    time_dim: int = -2,
+):
+    r"""TD(:math:`\lambda`) return estimate computed with a parallel prefix scan.
+
+    This function returns the same result as :func:`td_lambda_return_estimate`
+    in ``ceil(log2(T))`` vectorized passes, with a memory footprint that is linear
+    in the number of time steps (unlike :func:`vec_td_lambda_return_estimate`,
+    which builds a ``[T, T]`` discount matrix).
+
+    Args:
+        gamma (scalar, Tensor): exponential mean discount. If tensor-valued,
+            must be broadcastable to the reward shape.
+        lmbda (scalar, Tensor): trajectory discount. If tensor-valued,
+            must be broadcastable to the reward shape.
+        next_state_value (Tensor): value function result with new_state input.
+        reward (Tensor): reward of taking actions in the environment.
+        done (Tensor): boolean flag for end of episode.
+        rolling_gamma (bool, optional): only ``rolling_gamma=True`` (each gamma
+            is tied to a single event, see :func:`td_lambda_return_estimate`)
+            can be expressed as a scan. Defaults to ``None`` (i.e. ``True``).
+        time_dim (int): dimension where the time is unrolled. Defaults to -2.
+
+    All tensors (values, reward and done) must have shape
+    ``[*Batch x TimeSteps x *F]``, with ``*F`` feature dimensions.
+
+    """
+    if not (next_state_value.shape == reward.shape == done.shape):
+        raise RuntimeError(
+            "All input tensors (value, reward and done states) must share a unique shape."
+        )
+    if rolling_gamma is not None and not rolling_gamma:
+        raise NotImplementedError(
+            "rolling_gamma=False is not supported by the scan TD(lambda) estimator. "
+            "Consider using the non-vectorized version of the return computation."
+        )
+    gamma = gamma * (1 - done.to(next_state_value.dtype))
+    # g_t = r_t + gamma_t * ((1 - lambda_t) * v_t + lambda_t * g_{t+1}),
+    # the last return being bootstrapped with the last next value
+    bootstrap = torch.zeros_like(next_state_value)
+    bootstrap[..., -1, :] = 1
+    lmbda = lmbda + torch.zeros_like(next_state_value)
+    returns = reward + gamma * next_state_value * (1 - lmbda + lmbda * bootstrap)
+    return _discounted_reverse_scan(returns, gamma * lmbda)
+
+
+def scan_td_lambda_advantage_estimate(
+    gamma,
+    lmbda,
+    state_value,
+    next_state_value,
+    reward,
+    done,
+    rolling_gamma: bool = None,
+    time_dim: int = -2,
+):
+    r"""TD(:math:`\lambda`) advantage estimate computed with a parallel prefix scan.
+
+    See :func:`scan_td_lambda_return_estimate` for more information.
+
+    Args:
+        gamma (scalar, Tensor): exponential mean discount.
+        lmbda (scalar, Tensor): trajectory discount.
+        state_value (Tensor): value function result with old_state input.
+        next_state_value (Tensor): value function result with new_state input.
+        reward (Tensor): reward of taking actions in the environment.
+        done (Tensor): boolean flag for end of episode.
+        rolling_gamma (bool, optional): only ``rolling_gamma=True`` is supported.
+            Defaults to ``None`` (i.e. ``True``).
+        time_dim (int): dimension where the time is unrolled. Defaults to -2.
+
+    All tensors (values, reward and done) must have shape
+    ``[*Batch x TimeSteps x *F]``, with ``*F`` feature dimensions.
+
+    """
+    if not (next_state_value.shape == state_value.shape == reward.shape == done.shape):
+        raise RuntimeError(
+            "All input tensors (value, reward and done states) must share a unique shape."
+        )
+    return (
+        scan_td_lambda_return_estimate(
+            gamma,
+            lmbda,
+            next_state_value,
+            reward,
+            done,
+            rolling_gamma,
+            time_dim=time_dim,
+        )
+        - state_value
+    )
+
+
+########################################################################
+# V-Trace
+# -------
+
+
+@_transpose_time
+def vtrace_advantage_estimate(
+    gamma: float,
+    log_pi: torch.Tensor,
+    log_mu: torch.Tensor,
+    state_value: torch.Tensor,
+    next_state_value: torch.Tensor,
+    reward: torch.Tensor,
+    done: torch.Tensor,
+    rho_thresh: Union[float, torch.Tensor] = 1.0,
+    c_thresh: Union[float, torch.Tensor] = 1.0,
+    time_dim: int = -2,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    r"""Computes V-Trace off-policy actor critic targets.
+
+    Refer to "IMPALA: Scalable Distributed Deep-RL with Importance Weighted Actor-Learner Architectures"
+    https://arxiv.org/abs/1802.01561 for more context.
+
+    The value targets follow the recursion
+
+    .. math::
+        v_s = V(x_s) + \delta_s V + \gamma c_s (v_{s+1} - V(x_{s+1}))
+
+    with :math:`\delta_s V = \rho_s (r_s + \gamma V(x_{s+1}) - V(x_s))`,
+    which is solved with a parallel prefix scan over the time dimension
+    rather than with a loop over the time steps.
+
+    Args:
+        gamma (scalar): exponential mean discount.
+        log_pi (Tensor): log-probability of the actions under the target policy.
+        log_mu (Tensor): log-probability of the actions under the behaviour policy.
+        state_value (Tensor): value function result with old_state input.
+        next_state_value (Tensor): value function result with new_state input.
+        reward (Tensor): reward of taking actions in the environment.
+        done (Tensor): boolean flag for end of episode.
+        rho_thresh (scalar, optional): truncation level of the importance
+            weights :math:`\bar{\rho}`. Defaults to 1.0.
+        c_thresh (scalar, optional): truncation level of the trace cutting
+            coefficients :math:`\bar{c}`. Defaults to 1.0.
+        time_dim (int): dimension where the time is unrolled. Defaults to -2.
+
+    All tensors (values, reward, log-probabilities and done) must have shape
+    ``[*Batch x TimeSteps x *F]``, with ``*F`` feature dimensions.
+
+    Returns:
+        the policy-gradient advantage :math:`\rho_s (r_s + \gamma v_{s+1} - V(x_s))`
+        and the value target :math:`v_s`.
+
+    """
+    if not (
+        next_state_value.shape
+        == state_value.shape
+        == reward.shape
+        == done.shape
+        == log_pi.shape
+        == log_mu.shape
+    ):
+        raise RuntimeError(
+            "All input tensors (value, reward, log-probabilities and done states) "
+            "must share a unique shape."
+        )
+    not_done = 1 - done.to(state_value.dtype)
+    gamma = gamma * not_done
+    log_rho = log_pi - log_mu
+    rho = log_rho.exp().clamp_max(rho_thresh)
+    c = log_rho.exp().clamp_max(c_thresh)
+
+    td0 = rho * (reward + gamma * next_state_value - state_value)
+    # v_s - V(x_s)
+    vs_minus_v = _discounted_reverse_scan(td0, gamma * c)
+    value_target = state_value + vs_minus_v
+
+    # v_{s+1}, bootstrapped with the value of the last next state
+    next_vs = next_state_value + torch.cat(
+        [vs_minus_v[..., 1:, :], torch.zeros_like(vs_minus_v[..., :1, :])], -2
+    )
+    advantage = rho * (reward + gamma * next_vs - state_value)
+    return advantage, value_target
+
+
 ########################################################################
 # Reward to go
 # ------------
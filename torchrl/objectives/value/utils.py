@@ -183,3 +183,48 @@ def _make_gammas_tensor(gamma: torch.Tensor, T: int, rolling_gamma: bool):
         gammas = torch.ones(*gamma.shape, T + 1, 1, device=device, dtype=dtype)
         gammas[..., 1:, :] = gamma[..., None, None]
     return gammas
+
+
+def _discounted_reverse_scan(tensor: torch.Tensor, decay: torch.Tensor):
+    r"""Computes a discounted reverse cumulative sum with a parallel prefix scan.
+
+    The result follows the linear recurrence
+
+    .. math::
+        y_t = x_t + d_t y_{t+1}, \quad y_T = 0
+
+    along the time dimension (-2). Because the composition of two affine steps
+    is associative, the recurrence is solved in ``ceil(log2(T))`` vectorized
+    passes of the Hillis-Steele scan: after the pass with offset ``k``, every
+    element has accumulated the ``2k`` steps that follow it and ``decay`` holds
+    the product of the discounts over the same window. Episode boundaries are
+    handled by zeroing the decay at done steps, and the memory footprint is
+    linear in the number of time steps.
+
+    Args:
+        tensor (torch.Tensor): a [*Batch x Time x *F] tensor
+        decay (torch.Tensor): the per-step discount, broadcastable to ``tensor``.
+
+    Returns: a tensor of the same shape as the input tensor.
+
+    """
+    decay = decay.expand_as(tensor)
+    T = tensor.shape[-2]
+    offset = 1
+    while offset < T:
+        head = decay[..., :-offset, :]
+        tensor = torch.cat(
+            [
+                tensor[..., :-offset, :] + head * tensor[..., offset:, :],
+                tensor[..., -offset:, :],
+            ],
+            -2,
+        )
+        offset *= 2
+        if offset < T:
+            # the tail of decay is never read again, only the head needs updating
+            decay = torch.cat(
+                [head * decay[..., offset // 2 :, :], decay[..., -(offset // 2) :, :]],
+                -2,
+            )
+    return tensor
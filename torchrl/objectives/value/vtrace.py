@@ -8,6 +8,8 @@ from typing import Tuple, Union
 
 import torch
 
+from torchrl.objectives.value.utils import _discounted_reverse_scan
+
 
 def _c_val(
     log_pi: torch.Tensor,
@@ -40,19 +42,23 @@ def _vtrace(
     rho_bar: Union[float, torch.Tensor] = 1.0,
     c_bar: Union[float, torch.Tensor] = 1.0,
 ) -> Tuple[torch.Tensor, torch.Tensor]:
-    T = vals.shape[1]
     if not isinstance(gamma, torch.Tensor):
         gamma = torch.full_like(vals, gamma)
 
     dv, rho = _dv_val(rewards, vals, gamma, rho_bar, log_pi, log_mu)
     c = _c_val(log_pi, log_mu, c_bar)
 
-    v_out = []
-    v_out.append(vals[:, -1] + dv[:, -1])
-    for t in range(T - 2, -1, -1):
-        _v_out = (
-            vals[:, t] + dv[:, t] + gamma[:, t] * c[:, t] * (v_out[-1] - vals[:, t + 1])
-        )
-        v_out.append(_v_out)
-    v_out = torch.stack(list(reversed(v_out)), 1)
-    return v_out, rho
+    # v_t - V_t = dv_t + gamma_t c_t (v_{t+1} - V_{t+1}): the time dimension (1)
+    # is brought to -2 to be scanned
+    def _time_last(tensor):
+        tensor = tensor.expand_as(vals)
+        if tensor.ndim == 2:
+            return tensor.unsqueeze(-1)
+        return tensor.movedim(1, -2)
+
+    v_out = _discounted_reverse_scan(_time_last(dv), _time_last(gamma * c))
+    if vals.ndim == 2:
+        v_out = v_out.squeeze(-1)
+    else:
+        v_out = v_out.movedim(-2, 1)
+    return vals + v_out, rho